@@ -0,0 +1,170 @@
+"""
+Vectorised scoring of many positions at once with NumPy, for scoring every child of a search node, or a
+dataset of positions, in one call rather than one position at a time.
+
+Positions are given as a (K, 64) int8 array of piece codes, indexed by row * 8 + col: 0 for an empty
+square, the piece's index in PIECE_TYPES plus one for a white piece, and minus that for a black piece.
+A (K, 12, 64) array of 0/1 planes, one per piece type and colour (white pieces first), is also accepted.
+
+NumPy is an optional dependency, installed with `poetry install -E batch`.
+"""
+
+import numpy as np
+
+from chessington.engine.board import BLACK_PIECE_CODE, ENCODED_SIZE
+from chessington.engine.data import Player
+from chessington.engine.evaluation import SQUARE_SCORES
+from chessington.engine.pieces import PIECE_TYPES, Knight, Bishop, Rook, Queen, King
+from chessington.engine.pieces import KNIGHT_TARGETS, KING_TARGETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS, RAYS
+
+BOARD_SQUARES = 64
+CODE_OFFSET = len(PIECE_TYPES)
+
+# Each move a knight, bishop, rook, queen or king could make is worth this much
+MOBILITY_WEIGHT = 1
+
+
+def piece_code(piece_type, player):
+    code = PIECE_TYPES.index(piece_type) + 1
+    return code if player == Player.WHITE else -code
+
+
+def square_table(square_scores=SQUARE_SCORES):
+    """
+    The material plus piece-square score of each piece code on each square, from white's point of view,
+    taken from tables laid out as evaluation.SQUARE_SCORES. Indexed by code + CODE_OFFSET.
+    """
+    table = np.zeros((2 * CODE_OFFSET + 1, BOARD_SQUARES), dtype=np.int32)
+    for piece_type in PIECE_TYPES:
+        for player, sign in ((Player.WHITE, 1), (Player.BLACK, -1)):
+            table[piece_code(piece_type, player) + CODE_OFFSET] = sign * np.array(square_scores[(piece_type, player)])
+    return table
+
+
+def _target_matrix(targets):
+    matrix = np.zeros((BOARD_SQUARES, BOARD_SQUARES), dtype=np.int32)
+    for index, squares in enumerate(targets):
+        for square in squares:
+            matrix[index, square.index] = 1
+    return matrix
+
+
+def _ray_indices(direction):
+    """
+    A (64, 7) array of the squares along a ray from each square, padded with BOARD_SQUARES (an extra
+    always-occupied column) where the ray leaves the board.
+    """
+    indices = np.full((BOARD_SQUARES, 7), BOARD_SQUARES, dtype=np.intp)
+    for index, squares in enumerate(RAYS[direction]):
+        for step, square in enumerate(squares):
+            indices[index, step] = square.index
+    return indices
+
+
+def _byte_to_code():
+    """
+    Maps each square's 4-bit code in the Board.to_bytes encoding to a piece code.
+    """
+    table = np.zeros(16, dtype=np.int8)
+    for code in range(1, CODE_OFFSET + 1):
+        table[code] = code
+        table[code + BLACK_PIECE_CODE] = -code
+    return table
+
+
+SQUARE_TABLE = square_table()
+BYTE_TO_CODE = _byte_to_code()
+SQUARE_INDICES = np.arange(BOARD_SQUARES)
+KNIGHT_MATRIX = _target_matrix(KNIGHT_TARGETS)
+KING_MATRIX = _target_matrix(KING_TARGETS)
+ROOK_RAYS = [_ray_indices(direction) for direction in ROOK_DIRECTIONS]
+BISHOP_RAYS = [_ray_indices(direction) for direction in BISHOP_DIRECTIONS]
+
+
+def encode_board(board):
+    """
+    The piece codes of a board, as a list of 64 ints.
+    """
+    codes = [0] * BOARD_SQUARES
+    for player in (Player.WHITE, Player.BLACK):
+        for piece, square in board.piece_squares[player].items():
+            codes[square.index] = piece_code(type(piece), player)
+    return codes
+
+
+def codes_from_bytes(positions):
+    """
+    Converts a list of Board.to_bytes encodings to a (K, 64) array of piece codes.
+    """
+    data = np.frombuffer(b''.join(positions), dtype=np.uint8).reshape(len(positions), ENCODED_SIZE)[:, :32]
+    squares = np.empty((len(positions), BOARD_SQUARES), dtype=np.uint8)
+    squares[:, 0::2] = data & 0xF
+    squares[:, 1::2] = data >> 4
+    return BYTE_TO_CODE[squares]
+
+
+def as_codes(positions):
+    """
+    Converts positions given as piece codes or as planes to a (K, 64) array of piece codes.
+    """
+    positions = np.asarray(positions)
+    if positions.ndim == 3:
+        plane_codes = np.array([code for code in range(1, CODE_OFFSET + 1)] +
+                               [-code for code in range(1, CODE_OFFSET + 1)], dtype=np.int8)
+        return np.einsum('kps,p->ks', positions.astype(np.int8), plane_codes).astype(np.int8)
+    return positions.astype(np.int8, copy=False)
+
+
+def _slider_moves(occupied, blocked_for_white, blocked_for_black, rays):
+    """
+    For each square, how many squares a slider there could move to along the given rays, once for a
+    white slider and once for a black one.
+    """
+    white_moves = np.zeros(occupied.shape, dtype=np.int32)
+    black_moves = np.zeros(occupied.shape, dtype=np.int32)
+    padding = np.ones((occupied.shape[0], 1), dtype=bool)
+    occupied = np.concatenate([occupied, padding], axis=1)
+    blocked_for_white = np.concatenate([blocked_for_white, padding], axis=1)
+    blocked_for_black = np.concatenate([blocked_for_black, padding], axis=1)
+    for ray in rays:
+        ray_occupied = occupied[:, ray]
+        # A square on the ray can be reached if nothing stands on the squares before it
+        reached = np.cumsum(ray_occupied, axis=2) - ray_occupied == 0
+        white_moves += (reached & ~blocked_for_white[:, ray]).sum(axis=2)
+        black_moves += (reached & ~blocked_for_black[:, ray]).sum(axis=2)
+    return white_moves, black_moves
+
+
+def mobility(codes):
+    """
+    The difference between white's and black's knight, bishop, rook, queen and king moves.
+    """
+    white = codes > 0
+    black = codes < 0
+    occupied = white | black
+    score = np.zeros(codes.shape[0], dtype=np.int32)
+
+    for piece_type, matrix in ((Knight, KNIGHT_MATRIX), (King, KING_MATRIX)):
+        white_targets = (codes == piece_code(piece_type, Player.WHITE)).astype(np.int32) @ matrix
+        black_targets = (codes == piece_code(piece_type, Player.BLACK)).astype(np.int32) @ matrix
+        score += (white_targets * ~white).sum(axis=1) - (black_targets * ~black).sum(axis=1)
+
+    # Padding squares off the board count as blocked for both colours
+    rook_white, rook_black = _slider_moves(occupied, white, black, ROOK_RAYS)
+    bishop_white, bishop_black = _slider_moves(occupied, white, black, BISHOP_RAYS)
+    for piece_type, white_moves, black_moves in ((Rook, rook_white, rook_black),
+                                                 (Bishop, bishop_white, bishop_black),
+                                                 (Queen, rook_white + bishop_white, rook_black + bishop_black)):
+        score += (white_moves * (codes == piece_code(piece_type, Player.WHITE))).sum(axis=1)
+        score -= (black_moves * (codes == piece_code(piece_type, Player.BLACK))).sum(axis=1)
+    return score
+
+
+def evaluate_positions(positions, table=SQUARE_TABLE):
+    """
+    Scores each of a batch of positions from white's point of view, as material plus piece-square
+    values from the given square_table, plus mobility. Returns a (K,) array.
+    """
+    codes = as_codes(positions)
+    material = table[codes.astype(np.intp) + CODE_OFFSET, SQUARE_INDICES].sum(axis=1)
+    return material + MOBILITY_WEIGHT * mobility(codes)
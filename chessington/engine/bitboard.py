@@ -0,0 +1,270 @@
+"""
+A bitboard-backed chess board. The position is kept as one 64-bit integer per piece type and colour
+alongside the usual grid of pieces, so that moves can be generated from precomputed attack tables
+rather than by walking the board one square at a time.
+
+Squares are numbered 0-63 as row * 8 + col, so bit 0 is Square.at(0, 0) and bit 63 is Square.at(7, 7).
+"""
+
+from chessington.engine.board import Board, BOARD_SIZE
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import PIECE_TYPES
+from chessington.engine.pieces import KNIGHT_STEPS, KING_STEPS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS
+
+MASK_64 = (1 << 64) - 1
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(len(PIECE_TYPES))
+TYPE_INDEX = {piece_type: index for index, piece_type in enumerate(PIECE_TYPES)}
+
+WHITE, BLACK = 0, 1
+COLOUR_INDEX = {Player.WHITE: WHITE, Player.BLACK: BLACK}
+
+# Magic multipliers for the sliding piece lookups, found offline by random search. Each one maps every
+# blocker configuration on a square's relevant occupancy mask to a distinct slot (or to a slot with an
+# identical attack set) of that square's attack table.
+ROOK_MAGICS = (
+    0x0080002280400012, 0x0700108040002100, 0x2080200008801000, 0x9080048010020800,
+    0x1200081084201600, 0x8080020049040080, 0x010020840A004B00, 0x21000282210000C2,
+    0x4809800081400060, 0x0142400140201000, 0x00A1001060090040, 0x6005000910010020,
+    0x8405000411080100, 0x0001000649000400, 0x000A000948040200, 0x2001000042008500,
+    0x8440058000228A40, 0x0000828040082000, 0x0005010020001040, 0x2C801A0040120020,
+    0x0100710008008D00, 0x00E2880140200410, 0x0003040030080201, 0x1010020000409401,
+    0x6022C00180086080, 0x0020044040033000, 0x0004A00280100080, 0x0008008080100029,
+    0x0005001500180110, 0x00420002000C0810, 0x0008040101000200, 0x0000040200005181,
+    0x8020C00860800080, 0x0200400C84802000, 0x0008861000802000, 0x1110008010802801,
+    0x4018000880800400, 0x0810140080801200, 0x000002100C004508, 0x4200008042000904,
+    0x1080824000208005, 0x0108460981020020, 0x4121006001410050, 0x4026000860120040,
+    0x14820004600A0030, 0x408E000890060004, 0x00220E1041040088, 0x602002D184020001,
+    0x0000408000211100, 0x04C100C000802100, 0x48404020005D0100, 0x0002080080100080,
+    0x8080280080440080, 0x2009008248040100, 0x0412000801042200, 0x0000006884090200,
+    0x001A021880210242, 0x0052514001008027, 0x4540098010204202, 0x0009082010010501,
+    0x8401001002440801, 0x0001002A18840005, 0x4000100201280884, 0x01120B002C024082,
+)
+BISHOP_MAGICS = (
+    0x8011040301420200, 0x0809500902002900, 0x2011011403011000, 0x00080A0028040508,
+    0xA8D1104084000020, 0xC042082424084229, 0x4004020210140102, 0x0000210110032100,
+    0x0E011014C1080214, 0x0010040102020200, 0x0418040812104000, 0x0401022182000018,
+    0x0014420A10400440, 0x0C40020210450000, 0x0600008230100480, 0x040A060201040708,
+    0xB140001002020C04, 0x000400A025C20602, 0x9048001404240210, 0x0008000082014084,
+    0x0008800400A01090, 0x0000804100600213, 0x3808808108273001, 0x240040420200AC02,
+    0x1860084A22480101, 0x8803141121480204, 0x0020300148018060, 0x0820080081004028,
+    0x4001010008504000, 0x0402020020480240, 0x0801004002080420, 0x0084004000210400,
+    0x9088C2400010141A, 0x00C4251411200C20, 0x0C84020100080040, 0x8404040400080120,
+    0x4000420020020081, 0x8021080021420200, 0x0244080441008400, 0x00010C0280102600,
+    0x4684022010910400, 0x8201089005005020, 0x0102042024080800, 0x00A0002019000800,
+    0x0080400102102100, 0x0110A00480200101, 0x00900202040000C0, 0x44042481A1001A00,
+    0x421C020110080100, 0x800A048088080100, 0x0100410080B02040, 0x0030200142088101,
+    0x0210822420820208, 0x0030404244630000, 0x0020204C00808006, 0x0015500208410412,
+    0x0026050092100200, 0x8800282105101100, 0x8400400021841000, 0x00004003A0A0880D,
+    0x041383002004240A, 0x1000084008010D00, 0x0A0214A004210A00, 0x08202C0108010A10,
+)
+
+
+def iterate_bits(bitboard):
+    """
+    Yields the index of each set bit in the bitboard, lowest first.
+    """
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def _in_bounds(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _step_attacks(index, steps):
+    row, col = divmod(index, BOARD_SIZE)
+    attacks = 0
+    for vertical_dir, horizontal_dir in steps:
+        if _in_bounds(row + vertical_dir, col + horizontal_dir):
+            attacks |= 1 << ((row + vertical_dir) * BOARD_SIZE + col + horizontal_dir)
+    return attacks
+
+
+def _sliding_attacks(index, directions, occupied):
+    row, col = divmod(index, BOARD_SIZE)
+    attacks = 0
+    for vertical_dir, horizontal_dir in directions:
+        next_row, next_col = row + vertical_dir, col + horizontal_dir
+        while _in_bounds(next_row, next_col):
+            bit = 1 << (next_row * BOARD_SIZE + next_col)
+            attacks |= bit
+            if occupied & bit:
+                break
+            next_row, next_col = next_row + vertical_dir, next_col + horizontal_dir
+    return attacks
+
+
+def _relevant_mask(index, directions):
+    """
+    The squares whose occupancy can affect a slider on this square - every ray square except the last.
+    """
+    row, col = divmod(index, BOARD_SIZE)
+    mask = 0
+    for vertical_dir, horizontal_dir in directions:
+        next_row, next_col = row + vertical_dir, col + horizontal_dir
+        while _in_bounds(next_row + vertical_dir, next_col + horizontal_dir):
+            mask |= 1 << (next_row * BOARD_SIZE + next_col)
+            next_row, next_col = next_row + vertical_dir, next_col + horizontal_dir
+    return mask
+
+
+def _build_magic_tables(directions, magics):
+    masks, shifts, tables = [], [], []
+    for index in range(64):
+        mask = _relevant_mask(index, directions)
+        shift = 64 - bin(mask).count('1')
+        table = [0] * (1 << (64 - shift))
+        # Enumerate every subset of the mask (the "carry-rippler" trick)
+        subset = 0
+        while True:
+            table[((subset * magics[index]) & MASK_64) >> shift] = _sliding_attacks(index, directions, subset)
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        shifts.append(shift)
+        tables.append(table)
+    return tuple(masks), tuple(shifts), tuple(tables)
+
+
+KNIGHT_ATTACKS = tuple(_step_attacks(index, KNIGHT_STEPS) for index in range(64))
+KING_ATTACKS = tuple(_step_attacks(index, KING_STEPS) for index in range(64))
+PAWN_ATTACKS = (
+    tuple(_step_attacks(index, ((1, 1), (1, -1))) for index in range(64)),
+    tuple(_step_attacks(index, ((-1, 1), (-1, -1))) for index in range(64)),
+)
+ROOK_MASKS, ROOK_SHIFTS, ROOK_TABLES = _build_magic_tables(ROOK_DIRECTIONS, ROOK_MAGICS)
+BISHOP_MASKS, BISHOP_SHIFTS, BISHOP_TABLES = _build_magic_tables(BISHOP_DIRECTIONS, BISHOP_MAGICS)
+
+EDGE_ROWS = 0x00000000000000FF | 0xFF00000000000000
+PAWN_START_ROWS = (0x000000000000FF00, 0x00FF000000000000)
+
+
+def rook_attacks(index, occupied):
+    return ROOK_TABLES[index][((occupied & ROOK_MASKS[index]) * ROOK_MAGICS[index] & MASK_64) >> ROOK_SHIFTS[index]]
+
+
+def bishop_attacks(index, occupied):
+    return BISHOP_TABLES[index][((occupied & BISHOP_MASKS[index]) * BISHOP_MAGICS[index] & MASK_64) >> BISHOP_SHIFTS[index]]
+
+
+class BitBoard(Board):
+    """
+    A board that keeps a bitboard for each piece type and colour in step with the grid of pieces.
+
+    All changes to the position go through set_piece, so the inherited get_piece/set_piece/move_piece
+    API (and everything built on it) keeps working unchanged.
+    """
+
+    def __init__(self, player, board_state):
+        self.bitboards = [0] * (2 * len(PIECE_TYPES))
+        self.occupied = [0, 0]
+        super().__init__(player, board_state)
+        for index, piece in enumerate(board_state):
+            if piece is not None:
+                self._toggle(piece, 1 << index)
+
+    def _toggle(self, piece, bit):
+        colour = COLOUR_INDEX[piece.player]
+        self.bitboards[colour * len(PIECE_TYPES) + TYPE_INDEX[type(piece)]] ^= bit
+        self.occupied[colour] ^= bit
+
+    def copy(self):
+        board = super().copy()
+        board.bitboards = self.bitboards.copy()
+        board.occupied = self.occupied.copy()
+        return board
+
+    def set_piece(self, square, piece):
+        """
+        Places the piece at the given position on the board, keeping the bitboards up to date.
+        """
+        bit = 1 << square.index
+        previous_piece = self.get_piece(square)
+        if previous_piece is not None:
+            self._toggle(previous_piece, bit)
+        if piece is not None:
+            self._toggle(piece, bit)
+        super().set_piece(square, piece)
+
+    def pieces_of(self, player, piece_type):
+        """
+        Returns the bitboard of the given player's pieces of the given type.
+        """
+        return self.bitboards[COLOUR_INDEX[player] * len(PIECE_TYPES) + TYPE_INDEX[piece_type]]
+
+    def en_passant_target(self, player):
+        """
+        Returns the bitboard of the square the given player could capture onto en passant, if any.
+        """
+        if self.last_move_pawn is None:
+            return 0
+        row = self.last_move_pawn.row + (1 if player == Player.WHITE else -1)
+        if not 0 <= row < BOARD_SIZE:
+            return 0
+        return 1 << (row * BOARD_SIZE + self.last_move_pawn.col)
+
+    def targets_from(self, index):
+        """
+        Returns a bitboard of the squares the piece on the given square index can move to.
+        """
+        piece = self.board[index]
+        if piece is None:
+            return 0
+        colour = COLOUR_INDEX[piece.player]
+        return self._targets(TYPE_INDEX[type(piece)], colour, index, self.en_passant_target(piece.player))
+
+    def _targets(self, piece_type, colour, index, en_passant):
+        own = self.occupied[colour]
+        occupied = own | self.occupied[1 - colour]
+        if piece_type == PAWN:
+            return self._pawn_targets(colour, index, occupied, en_passant)
+        if piece_type == KNIGHT:
+            return KNIGHT_ATTACKS[index] & ~own
+        if piece_type == BISHOP:
+            return bishop_attacks(index, occupied) & ~own
+        if piece_type == ROOK:
+            return rook_attacks(index, occupied) & ~own
+        if piece_type == QUEEN:
+            return (rook_attacks(index, occupied) | bishop_attacks(index, occupied)) & ~own
+        return KING_ATTACKS[index] & ~own
+
+    def _pawn_targets(self, colour, index, occupied, en_passant):
+        bit = 1 << index
+        if bit & EDGE_ROWS:
+            return 0
+        targets = PAWN_ATTACKS[colour][index] & (self.occupied[1 - colour] | en_passant)
+        single_push = bit << 8 if colour == WHITE else bit >> 8
+        if not single_push & occupied:
+            targets |= single_push
+            if bit & PAWN_START_ROWS[colour]:
+                double_push = single_push << 8 if colour == WHITE else single_push >> 8
+                if not double_push & occupied:
+                    targets |= double_push
+        return targets
+
+    def get_available_moves(self, square):
+        """
+        Get all squares that the piece on the given square is allowed to move to.
+        """
+        return [Square.from_index(index) for index in iterate_bits(self.targets_from(square.index))]
+
+    def pseudo_legal_moves(self):
+        """
+        Returns a list of (from_index, to_index) pairs for every move available to the current player.
+        Like Piece.get_available_moves, this does not consider whether a move leaves the king in check.
+        """
+        colour = COLOUR_INDEX[self.current_player]
+        en_passant = self.en_passant_target(self.current_player)
+        moves = []
+        for piece_type in range(len(PIECE_TYPES)):
+            for from_index in iterate_bits(self.bitboards[colour * len(PIECE_TYPES) + piece_type]):
+                targets = self._targets(piece_type, colour, from_index, en_passant)
+                while targets:
+                    lowest = targets & -targets
+                    moves.append((from_index, lowest.bit_length() - 1))
+                    targets ^= lowest
+        return moves
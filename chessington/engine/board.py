@@ -3,67 +3,245 @@ A module providing a representation of a chess board. The rules of chess are not
 this is just a "dumb" board that will let you move pieces around as you like.
 """
 
+import copy
 from collections import namedtuple
 from enum import Enum, auto
 
-from chessington.engine.data import Player, Square
-from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.data import Player, Square, SQUARES
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PIECE_TYPES
+from chessington.engine.pieces import KNIGHT_TARGETS, KING_TARGETS, RAYS
+from chessington.engine.pieces import ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS
+from chessington.engine.evaluation import PIECE_VALUES, square_score
+from chessington.engine.zobrist import piece_key, side_key, en_passant_key
 
 BOARD_SIZE = 8
 
+# In the byte encoding of a board, each square has a 4-bit code: 0 if it is empty, or the piece's index in
+# PIECE_TYPES plus one, with BLACK_PIECE_CODE added for black pieces. Two squares are packed into each of
+# the first 32 bytes, lower square in the low bits, followed by a byte for the player to move and a byte
+# for the square of last_move_pawn.
+BLACK_PIECE_CODE = 8
+NO_EN_PASSANT = 255
+ENCODED_SIZE = 34
+
+FEN_PIECE_LETTERS = {Pawn: 'p', Knight: 'n', Bishop: 'b', Rook: 'r', Queen: 'q', King: 'k'}
+FEN_LETTER_PIECES = {letter: piece_type for piece_type, letter in FEN_PIECE_LETTERS.items()}
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+SLIDER_DIRECTIONS = {Bishop: BISHOP_DIRECTIONS, Rook: ROOK_DIRECTIONS, Queen: QUEEN_DIRECTIONS}
+
+MoveUndo = namedtuple('MoveUndo', 'from_square to_square moving_piece captured_piece en_passant_square '
+                                  'en_passant_piece last_move_pawn current_player')
+
 class Board:
     """
-    A representation of the chess board, and the pieces on it.
+    A representation of the chess board, and the pieces on it. The squares are kept in a flat list of
+    64, indexed by Square.index, and board_state is a list in the same layout.
     """
 
     def __init__(self, player, board_state):
+        self._zobrist_key = 0
+        self._attack_maps = {}
+        self._current_player = Player.WHITE
+        self._last_move_pawn = None
         self.current_player = player
         self.board = board_state
         self.next_move = None
         self.value = None
         self.total_value = None
         self.last_move_pawn = None
+        self.piece_squares = {Player.WHITE: {}, Player.BLACK: {}}
+        self.piece_scores = {Player.WHITE: 0, Player.BLACK: 0}
+        for square, piece in zip(SQUARES, board_state):
+            if piece is not None:
+                self.piece_squares[piece.player][piece] = square
+                self.piece_scores[piece.player] += square_score(piece, square)
+                self._zobrist_key ^= piece_key(piece, square)
 
-    @staticmethod
-    def empty():
-        return Board(Player.WHITE, Board._create_empty_board())
+    @property
+    def current_player(self):
+        return self._current_player
 
-    @staticmethod
-    def at_starting_position():
-        return Board(Player.WHITE, Board._create_starting_board())
+    @current_player.setter
+    def current_player(self, player):
+        self._zobrist_key ^= side_key(self._current_player) ^ side_key(player)
+        self._current_player = player
+
+    @property
+    def last_move_pawn(self):
+        return self._last_move_pawn
+
+    @last_move_pawn.setter
+    def last_move_pawn(self, square):
+        self._zobrist_key ^= en_passant_key(self._last_move_pawn) ^ en_passant_key(square)
+        self._last_move_pawn = square
+
+    @property
+    def zobrist_key(self):
+        """
+        A 64-bit key identifying the position, which is kept up to date as the board changes.
+        """
+        return self._zobrist_key
+
+    @classmethod
+    def empty(cls):
+        return cls(Player.WHITE, Board._create_empty_board())
+
+    @classmethod
+    def at_starting_position(cls):
+        return cls(Player.WHITE, Board._create_starting_board())
 
     @staticmethod
     def _create_empty_board():
-        return [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        return [None] * (BOARD_SIZE * BOARD_SIZE)
 
     @staticmethod
     def _create_starting_board():
 
         # Create an empty board
-        board = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        board = [None] * (BOARD_SIZE * BOARD_SIZE)
 
         # Setup the rows of pawns
-        board[1] = [Pawn(Player.WHITE) for _ in range(BOARD_SIZE)]
-        board[6] = [Pawn(Player.BLACK) for _ in range(BOARD_SIZE)]
+        board[BOARD_SIZE:2 * BOARD_SIZE] = [Pawn(Player.WHITE) for _ in range(BOARD_SIZE)]
+        board[6 * BOARD_SIZE:7 * BOARD_SIZE] = [Pawn(Player.BLACK) for _ in range(BOARD_SIZE)]
 
         # Setup the rows of pieces
         piece_row = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        board[0] = list(map(lambda piece: piece(Player.WHITE), piece_row))
-        board[7] = list(map(lambda piece: piece(Player.BLACK), piece_row))
+        board[:BOARD_SIZE] = list(map(lambda piece: piece(Player.WHITE), piece_row))
+        board[7 * BOARD_SIZE:] = list(map(lambda piece: piece(Player.BLACK), piece_row))
+
+        return board
+
+    def copy(self):
+        """
+        Makes an independent copy of the board. Pieces hold nothing but their player and are never
+        changed, so the copy shares them, and copying costs little more than copying the list of squares.
+        """
+        board = copy.copy(self)
+        board.board = self.board.copy()
+        board.piece_squares = {player: squares.copy() for player, squares in self.piece_squares.items()}
+        board.piece_scores = self.piece_scores.copy()
+        board._attack_maps = self._attack_maps.copy()
+        return board
 
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Creates a board from a FEN string. Castling rights and move counters are ignored, as the board
+        does not use them.
+        """
+        fields = fen.split()
+        board_state = Board._create_empty_board()
+        for rank_index, rank in enumerate(fields[0].split('/')):
+            row = BOARD_SIZE - 1 - rank_index
+            col = 0
+            for letter in rank:
+                if letter.isdigit():
+                    col += int(letter)
+                    continue
+                player = Player.WHITE if letter.isupper() else Player.BLACK
+                board_state[row * BOARD_SIZE + col] = FEN_LETTER_PIECES[letter.lower()](player)
+                col += 1
+        player = Player.BLACK if len(fields) > 1 and fields[1] == 'b' else Player.WHITE
+        board = cls(player, board_state)
+        if len(fields) > 3 and fields[3] != '-':
+            # FEN gives the square behind the pawn that has just moved two squares
+            target = Square.from_name(fields[3])
+            board.last_move_pawn = Square.at(target.row + (1 if target.row < BOARD_SIZE // 2 else -1), target.col)
+        return board
+
+    def to_fen(self):
+        """
+        Describes the board as a FEN string.
+        """
+        ranks = []
+        for row in range(BOARD_SIZE - 1, -1, -1):
+            rank, empty_squares = '', 0
+            for col in range(BOARD_SIZE):
+                piece = self.board[row * BOARD_SIZE + col]
+                if piece is None:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                letter = FEN_PIECE_LETTERS[type(piece)]
+                rank += letter.upper() if piece.player == Player.WHITE else letter
+            ranks.append(rank + (str(empty_squares) if empty_squares else ''))
+        en_passant = '-'
+        if self.last_move_pawn is not None:
+            direction = -1 if self.last_move_pawn.row < BOARD_SIZE // 2 else 1
+            en_passant = Square.at(self.last_move_pawn.row + direction, self.last_move_pawn.col).name()
+        side = 'w' if self.current_player == Player.WHITE else 'b'
+        return f"{'/'.join(ranks)} {side} - {en_passant} 0 1"
+
+    def to_bytes(self):
+        """
+        Encodes the position in ENCODED_SIZE bytes, covering the pieces, the player to move and the
+        en passant state. This is much cheaper to store or send to another process than a pickled board.
+        """
+        data = bytearray(ENCODED_SIZE)
+        for player in (Player.WHITE, Player.BLACK):
+            colour_code = 0 if player == Player.WHITE else BLACK_PIECE_CODE
+            for piece, square in self.piece_squares[player].items():
+                index = square.index
+                data[index >> 1] |= (PIECE_TYPES.index(type(piece)) + 1 + colour_code) << (4 * (index & 1))
+        data[32] = 0 if self.current_player == Player.WHITE else 1
+        data[33] = NO_EN_PASSANT if self.last_move_pawn is None \
+            else self.last_move_pawn.index
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """
+        Creates a board from the encoding made by to_bytes, starting at the given offset. The data can be
+        any buffer, such as a memoryview of a file of positions, and is read in place without copying.
+        """
+        board_state = Board._create_empty_board()
+        for byte_index in range(offset, offset + 32):
+            byte = data[byte_index]
+            if not byte:
+                continue
+            index = 2 * (byte_index - offset)
+            for code in (byte & 0xF, byte >> 4):
+                if code:
+                    player = Player.BLACK if code & BLACK_PIECE_CODE else Player.WHITE
+                    piece_type = PIECE_TYPES[(code & ~BLACK_PIECE_CODE) - 1]
+                    board_state[index] = piece_type(player)
+                index += 1
+        board = cls(Player.BLACK if data[offset + 32] else Player.WHITE, board_state)
+        if data[offset + 33] != NO_EN_PASSANT:
+            board.last_move_pawn = Square.from_index(data[offset + 33])
         return board
 
     def set_piece(self, square, piece):
         """
         Places the piece at the given position on the board.
         """
-        self.board[square.row][square.col] = piece
+        previous_piece = self.board[square.index]
+        if self._attack_maps:
+            self._attack_maps = {}
+        if previous_piece is not None:
+            self._zobrist_key ^= piece_key(previous_piece, square)
+            self.piece_scores[previous_piece.player] -= square_score(previous_piece, square)
+            locations = self.piece_squares[previous_piece.player]
+            # A moving piece is placed on its new square before its old square is cleared
+            if locations.get(previous_piece) == square:
+                del locations[previous_piece]
+        self.board[square.index] = piece
+        if piece is not None:
+            self._zobrist_key ^= piece_key(piece, square)
+            self.piece_scores[piece.player] += square_score(piece, square)
+            self.piece_squares[piece.player][piece] = square
 
     def get_piece(self, square):
         """
         Retrieves the piece from the given square of the board.
         """
-        return self.board[square.row][square.col]
+        return self.board[square.index]
 
     def in_bounds(self, square):
         return 0 <= square.row <= 7 and 0 <= square.col <= 7
@@ -81,13 +259,230 @@ class Board:
 
     def find_piece(self, piece_to_find):
         """
-        Searches for the given piece on the board and returns its square.
+        Looks up the square of the given piece in the board's piece index.
         """
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row][col] is piece_to_find:
-                    return Square.at(row, col)
-        raise Exception('The supplied piece is not on the board')
+        square = self.piece_squares[piece_to_find.player].get(piece_to_find)
+        if square is None:
+            raise Exception('The supplied piece is not on the board')
+        return square
+
+    def static_evaluation(self, player):
+        """
+        The material and piece-square score of the position from the given player's point of view.
+        The running totals behind this are kept up to date as pieces are placed, so it costs O(1).
+        """
+        return self.piece_scores[player] - self.piece_scores[player.opponent()]
+
+    def get_piece_squares(self, player):
+        """
+        Returns the squares of all of the given player's pieces.
+        """
+        return list(self.piece_squares[player].values())
+
+    def legal_moves(self):
+        """
+        Yields each (from_square, to_square) move available to the current player which does not leave
+        their king where it could be captured. Capturing the enemy king, which ends the game, is always
+        allowed. The board must not be changed while the moves are being read.
+        """
+        player = self.current_player
+        opponent = player.opponent()
+        king_square = self._king_square(player)
+        if king_square is None:
+            for piece, from_square in list(self.piece_squares[player].items()):
+                for to_square in piece.get_available_moves(self):
+                    yield from_square, to_square
+            return
+
+        checkers = self._attackers(king_square, opponent)
+        check_blocks = self._check_blocks(king_square, checkers[0]) if len(checkers) == 1 else set()
+        pins = self._pins(king_square, player)
+        for piece, from_square in list(self.piece_squares[player].items()):
+            is_king = from_square == king_square
+            for to_square in piece.get_available_moves(self):
+                target = self.get_piece(to_square)
+                if isinstance(target, King):
+                    yield from_square, to_square
+                elif is_king:
+                    if next(self._find_attackers(to_square, opponent, ignore=(king_square,)), None) is None:
+                        yield from_square, to_square
+                elif isinstance(piece, Pawn) and target is None and from_square.col != to_square.col:
+                    # En passant removes a second piece from the board, so it is simplest to try it
+                    undo = self.make_move(from_square, to_square)
+                    safe = not self.is_attacked(king_square, opponent)
+                    self.unmake_move(undo)
+                    if safe:
+                        yield from_square, to_square
+                elif (from_square not in pins or to_square in pins[from_square]) \
+                        and (not checkers or to_square in check_blocks):
+                    yield from_square, to_square
+
+    def _king_square(self, player):
+        for piece, square in self.piece_squares[player].items():
+            if isinstance(piece, King):
+                return square
+        return None
+
+    def is_attacked(self, square, by_player):
+        """
+        Whether any of the given player's pieces could capture on the square, found by looking outwards
+        from it, or from the player's attack map if one has been worked out since the pieces last changed.
+        """
+        counts = self._attack_maps.get(by_player)
+        if counts is not None:
+            return counts[square.index] > 0
+        return next(self._find_attackers(square, by_player), None) is not None
+
+    def attack_counts(self, player):
+        """
+        Returns how many of the player's pieces could capture on each square, indexed by Square.index. The
+        counts include squares holding the player's own pieces, which those pieces defend. They are worked
+        out when first asked for and kept until the pieces next change.
+        """
+        counts = self._attack_maps.get(player)
+        if counts is not None:
+            return counts
+        counts = [0] * (BOARD_SIZE * BOARD_SIZE)
+        pawn_row_step = 1 if player == Player.WHITE else -1
+        for piece, square in self.piece_squares[player].items():
+            piece_type = type(piece)
+            if piece_type is Pawn:
+                row = square.row + pawn_row_step
+                if 0 <= row < BOARD_SIZE:
+                    for col in (square.col - 1, square.col + 1):
+                        if 0 <= col < BOARD_SIZE:
+                            counts[row * BOARD_SIZE + col] += 1
+            elif piece_type is Knight or piece_type is King:
+                for target in (KNIGHT_TARGETS if piece_type is Knight else KING_TARGETS)[square.index]:
+                    counts[target.index] += 1
+            else:
+                for direction in SLIDER_DIRECTIONS[piece_type]:
+                    for target in RAYS[direction][square.index]:
+                        counts[target.index] += 1
+                        if self.board[target.index] is not None:
+                            break
+        counts = tuple(counts)
+        self._attack_maps[player] = counts
+        return counts
+
+    def _attackers(self, square, by_player, ignore=()):
+        """
+        Returns the squares of the given player's pieces which could capture on the square, found by
+        looking outwards from it. Pieces on the ignore squares are treated as if they were not there, so
+        sliding pieces can see through them.
+        """
+        return list(self._find_attackers(square, by_player, ignore))
+
+    def _find_attackers(self, square, by_player, ignore=()):
+        """
+        Yields the squares of the attackers that _attackers returns, so that a search for any attacker at
+        all can stop at the first.
+        """
+        index = square.index
+        for piece_type, sources in ((Knight, KNIGHT_TARGETS[index]), (King, KING_TARGETS[index])):
+            for source in sources:
+                piece = self.board[source.index]
+                if type(piece) is piece_type and piece.player == by_player and source not in ignore:
+                    yield source
+        pawn_row = square.row - 1 if by_player == Player.WHITE else square.row + 1
+        if 0 <= pawn_row < BOARD_SIZE:
+            for pawn_col in (square.col - 1, square.col + 1):
+                if 0 <= pawn_col < BOARD_SIZE:
+                    source = SQUARES[pawn_row * BOARD_SIZE + pawn_col]
+                    piece = self.board[source.index]
+                    if type(piece) is Pawn and piece.player == by_player and source not in ignore:
+                        yield source
+        for direction in QUEEN_DIRECTIONS:
+            slider_type = Rook if direction in ROOK_DIRECTIONS else Bishop
+            for source in RAYS[direction][index]:
+                piece = self.board[source.index]
+                if piece is None or source in ignore:
+                    continue
+                if piece.player == by_player and type(piece) in (slider_type, Queen):
+                    yield source
+                break
+
+    def see(self, square, attacker_square):
+        """
+        Static exchange evaluation: the material the piece on attacker_square wins by capturing on the
+        square, once both sides have recaptured there for as long as it pays them to, in the units of
+        evaluation.PIECE_VALUES. Each side recaptures with its least valuable piece first, and pieces
+        lined up behind a sliding piece join in once it has gone. No moves are made on the board.
+        """
+        piece = self.get_piece(attacker_square)
+        target = self.get_piece(square)
+        if target is not None:
+            captured_value = PIECE_VALUES[type(target)]
+        elif isinstance(piece, Pawn) and attacker_square.col != square.col:
+            captured_value = PIECE_VALUES[Pawn]  # En passant
+        else:
+            captured_value = 0
+        promotion_row = square.row in (0, BOARD_SIZE - 1)
+
+        # gains[n] is what the side making the nth capture has won if the exchange stops after it
+        gains = []
+        removed = [attacker_square]
+        player = piece.player
+        while True:
+            value = PIECE_VALUES[type(piece)]
+            if promotion_row and type(piece) is Pawn:
+                gain = captured_value + PIECE_VALUES[Queen] - value
+                value = PIECE_VALUES[Queen]
+            else:
+                gain = captured_value
+            gains.append(gain - gains[-1] if gains else gain)
+            captured_value = value
+            player = player.opponent()
+            attackers = self._attackers(square, player, ignore=removed)
+            if not attackers:
+                break
+            attacker_square = min(attackers, key=lambda source: PIECE_VALUES[type(self.board[source.index])])
+            piece = self.board[attacker_square.index]
+            removed.append(attacker_square)
+
+        # Either side can stop capturing when carrying on would lose them more
+        for number in range(len(gains) - 1, 0, -1):
+            gains[number - 1] = min(gains[number - 1], -gains[number])
+        return gains[0]
+
+    def _check_blocks(self, king_square, checker_square):
+        """
+        The squares a piece can move to in order to stop a check from a single piece: the checker's square,
+        and the squares between it and the king if it is a sliding piece.
+        """
+        blocks = {checker_square}
+        if type(self.get_piece(checker_square)) not in (Rook, Bishop, Queen):
+            return blocks
+        row_step = (checker_square.row > king_square.row) - (checker_square.row < king_square.row)
+        col_step = (checker_square.col > king_square.col) - (checker_square.col < king_square.col)
+        for square in RAYS[row_step, col_step][king_square.index]:
+            if square == checker_square:
+                break
+            blocks.add(square)
+        return blocks
+
+    def _pins(self, king_square, player):
+        """
+        Maps the square of each of the player's pieces which is pinned to their king to the squares it can
+        move to without exposing the king: those on the line between the king and the pinning piece.
+        """
+        index = king_square.index
+        pins = {}
+        for direction in QUEEN_DIRECTIONS:
+            slider_type = Rook if direction in ROOK_DIRECTIONS else Bishop
+            line, blocker = [], None
+            for square in RAYS[direction][index]:
+                line.append(square)
+                piece = self.board[square.index]
+                if piece is None:
+                    continue
+                if blocker is None and piece.player == player:
+                    blocker = square
+                    continue
+                if blocker is not None and piece.player != player and type(piece) in (slider_type, Queen):
+                    pins[blocker] = set(line)
+                break
+        return pins
 
     def move_piece(self, from_square, to_square):
         """
@@ -102,6 +497,32 @@ class Board:
             self.en_passant_check(from_square, to_square, moving_piece)
             self.current_player = self.current_player.opponent()
 
+    def make_move(self, from_square, to_square):
+        """
+        Moves a piece as move_piece does, and returns a record that unmake_move can use to restore
+        the board exactly as it was.
+        """
+        moving_piece = self.get_piece(from_square)
+        en_passant_square, en_passant_piece = None, None
+        if isinstance(moving_piece, Pawn) and moving_piece.en_passant_attack(self, to_square):
+            en_passant_square = self.last_move_pawn
+            en_passant_piece = self.get_piece(en_passant_square)
+        undo = MoveUndo(from_square, to_square, moving_piece, self.get_piece(to_square), en_passant_square,
+                        en_passant_piece, self.last_move_pawn, self.current_player)
+        self.move_piece(from_square, to_square)
+        return undo
+
+    def unmake_move(self, undo):
+        """
+        Takes back a move made with make_move, including any capture, promotion or en passant capture.
+        """
+        self.set_piece(undo.to_square, undo.captured_piece)
+        self.set_piece(undo.from_square, undo.moving_piece)
+        if undo.en_passant_square is not None:
+            self.set_piece(undo.en_passant_square, undo.en_passant_piece)
+        self.last_move_pawn = undo.last_move_pawn
+        self.current_player = undo.current_player
+
     def pawn_promotion_check(self, to_square):
         piece_to_promote = self.get_piece(to_square)
         if isinstance(piece_to_promote, Pawn):
@@ -113,7 +534,7 @@ class Board:
             self.last_move_pawn = None
             return
         if abs(to_square.row - from_square.row) == 2:
-            self.last_move_pawn = Square.at(to_square.row, to_square.col)
+            self.last_move_pawn = to_square
             return
         self.last_move_pawn = None
 
@@ -0,0 +1,146 @@
+"""
+An opening book: a file of known good moves for positions early in the game, so that the bots can play
+them straight away instead of searching.
+
+The file is a sorted array of fixed-size entries, each holding a position's Zobrist key, a move from
+it and the move's weight (how often it was played). The reader memory-maps the file and binary-searches
+it, so a book of any size opens instantly and only the pages that are looked at are read from disk.
+
+Build a book from a PGN file with `poetry run book games.pgn book.bin`.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+from collections import Counter, namedtuple
+
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.pgn import SanError, read_games, parse_san
+
+# Key, from square index, to square index, weight. Big-endian, so entries sort by key as bytes do.
+ENTRY_FORMAT = '>QBBH'
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+MAX_WEIGHT = 0xFFFF
+
+# How many moves into each game are added to a book by default
+DEFAULT_MAX_PLY = 20
+
+BookMove = namedtuple('BookMove', 'from_square to_square weight')
+
+
+def build_book(games, path, max_ply=DEFAULT_MAX_PLY):
+    """
+    Writes a book of the first max_ply moves of each game, weighting each move by how many games
+    played it from that position. Games are lists of moves in SAN from the starting position; a game
+    stops counting at its first move that cannot be played. Returns the number of entries written.
+    """
+    counts = Counter()
+    for moves in games:
+        board = Board.at_starting_position()
+        for san in moves[:max_ply]:
+            try:
+                from_square, to_square = parse_san(board, san)
+            except SanError:
+                break
+            counts[board.zobrist_key, from_square.index, to_square.index] += 1
+            board.move_piece(from_square, to_square)
+
+    with open(path, 'wb') as book_file:
+        for (key, from_index, to_index), count in sorted(counts.items()):
+            book_file.write(struct.pack(ENTRY_FORMAT, key, from_index, to_index, min(count, MAX_WEIGHT)))
+    return len(counts)
+
+
+def build_book_from_pgn(pgn_path, path, max_ply=DEFAULT_MAX_PLY):
+    """
+    Writes a book of the games in a PGN file, skipping those which do not start from the starting
+    position.
+    """
+    with open(pgn_path) as pgn_file:
+        games = (game.moves for game in read_games(pgn_file) if 'FEN' not in game.tags)
+        return build_book(games, path, max_ply)
+
+
+class OpeningBook:
+    """
+    Reads a book written by build_book, without loading it into memory.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        size = self.file.seek(0, 2)
+        # An empty file cannot be memory-mapped, and has nothing to look up anyway
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.entries = size // ENTRY_SIZE
+
+    def moves(self, zobrist_key):
+        """
+        Returns the book moves from the position with the given Zobrist key.
+        """
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from('>Q', self.data, middle * ENTRY_SIZE)[0] < zobrist_key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        for entry in range(low, self.entries):
+            key, from_index, to_index, weight = struct.unpack_from(ENTRY_FORMAT, self.data, entry * ENTRY_SIZE)
+            if key != zobrist_key:
+                break
+            moves.append(BookMove(Square.from_index(from_index), Square.from_index(to_index), weight))
+        return moves
+
+    def choose(self, board, fraction):
+        """
+        Picks a book move for the board, with a chance of each move proportional to its weight; fraction
+        is a number in [0, 1) which decides between them. Returns None if the position is not in the book.
+        Moves that are not available on the board, which can only happen if two positions share a key,
+        are ignored.
+        """
+        moves = [move for move in self.moves(board.zobrist_key) if self._available(board, move)]
+        if not moves:
+            return None
+        remaining = fraction * sum(move.weight for move in moves)
+        for move in moves:
+            remaining -= move.weight
+            if remaining < 0:
+                break
+        return move.from_square, move.to_square
+
+    @staticmethod
+    def _available(board, move):
+        piece = board.get_piece(move.from_square)
+        return piece is not None and piece.player == board.current_player \
+            and move.to_square in piece.get_available_moves(board)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an opening book from a PGN file.')
+    parser.add_argument('pgn', help='PGN file of games to learn openings from')
+    parser.add_argument('book', help='book file to write')
+    parser.add_argument('--max-ply', type=int, default=DEFAULT_MAX_PLY,
+                        help='how many moves into each game to add to the book')
+    args = parser.parse_args(argv)
+
+    entries = build_book_from_pgn(args.pgn, args.book, args.max_ply)
+    print(f"Wrote {entries} entries to {args.book}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
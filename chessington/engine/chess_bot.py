@@ -1,8 +1,25 @@
 import random
-import copy
 from abc import ABC, abstractmethod
-from chessington.engine.data import Player, Square
-from chessington.engine.pieces import Queen, King, Knight, Rook, Bishop, Pawn
+from collections import namedtuple
+from functools import partial
+from chessington.engine.book import OpeningBook
+from chessington.engine.data import Player
+from chessington.engine.evaluation import EvaluationConfig
+from chessington.engine.pieces import King
+from chessington.engine.search import Search, ParallelSearch, generate_moves
+from chessington.engine.tablebase import Tablebase
+
+# A candidate move for a bot, along with the value of the position it leads to
+BoardState = namedtuple('BoardState', 'next_move value')
+
+MASK_64 = (1 << 64) - 1
+
+
+def position_noise(zobrist_key, seed):
+    """
+    A number in [0, 1) which looks random but depends only on the position and the seed.
+    """
+    return (((zobrist_key ^ seed) * 0x9E3779B97F4A7C15) & MASK_64) / (1 << 64)
 
 
 class ChessBot(ABC):
@@ -12,6 +29,15 @@ class ChessBot(ABC):
 
     @abstractmethod
     def get_move(self, board):
+        """
+        Choose a move for the bot's player, returned as (from_square, to_square) without making it.
+        """
+        pass
+
+    def close(self):
+        """
+        Release anything the bot holds on to between moves, such as worker processes.
+        """
         pass
 
 
@@ -20,31 +46,11 @@ class ChessBotRandom(ChessBot):
         super().__init__(player, opponent)
 
     def get_move(self, board):
-        while True:
-            try:
-                selected_square = self.get_random_square()
-                while not self.valid_piece(board, selected_square):
-                    selected_square = self.get_random_square()
-                selected_move = self.random_move(board, selected_square)
-                board.get_piece(selected_square).move_to(board, selected_move)
-                return
-            except:
-                continue
-
-    def get_random_square(self):
-        random_col = random.choice(range(8))
-        random_row = random.choice(range(8))
-        return Square.at(random_row, random_col)
-
-    def valid_piece(self, board, selected_square):
-        if board.is_square_empty(selected_square):
-            return False
-        return board.get_piece(selected_square).player == Player.BLACK
-
-    def random_move(self, board, selected_square):
-        current_piece = board.get_piece(selected_square)
-        to_squares = current_piece.get_available_moves(board)
-        return random.choice(to_squares)
+        """
+        Pick a random legal move, or a random move of any kind if there are no legal ones
+        """
+        moves = list(board.legal_moves()) or generate_moves(board)
+        return random.choice(moves) if moves else None
 
 
 class ChessBotDefense(ChessBot):
@@ -53,68 +59,37 @@ class ChessBotDefense(ChessBot):
         pass
 
     def get_move(self, board):
-        enemy_pieces_squares = self.get_enemy_locations(board)
-        death_squares = self.get_death_squares(board, enemy_pieces_squares)
-        while True:
-            try:
-                selected_square = self.get_random_square()
-                while not self.check_valid_piece(board, selected_square):
-                    selected_square = self.get_random_square()
-                selected_move = self.random_move(board, selected_square)
-                if not self.check_death_square(death_squares, selected_move):
-                    board.get_piece(selected_square).move_to(board, selected_move)
-                    return
-            except:
-                continue
-
-    def get_random_square(self):
-        random_col = random.choice(range(8))
-        random_row = random.choice(range(8))
-        return Square.at(random_row, random_col)
-
-    def check_valid_piece(self, board, selected_square):
-        if board.is_square_empty(selected_square):
-            return False
-        return board.get_piece(selected_square).player == Player.BLACK
-
-    def check_enemy_piece(self, board, selected_square):
-        if board.is_square_empty(selected_square):
-            return False
-        return board.get_piece(selected_square).player == Player.WHITE
-
-    def random_move(self, board, selected_square):
-        current_piece = board.get_piece(selected_square)
-        to_squares = current_piece.get_available_moves(board)
-        return random.choice(to_squares)
-
-    def get_enemy_locations(self, board):
         """
-        Get all squares containing enemy pieces
+        Pick a random legal move to a square no enemy piece can reach, if there is one
         """
-        enemy_pieces_squares = []
-        for square_row in range(8):
-            for square_col in range(8):
-                selected_square = Square.at(square_row, square_col)
-                if self.check_enemy_piece(board, selected_square):
-                    enemy_pieces_squares.append(selected_square)
-        return enemy_pieces_squares
-
-    def get_death_squares(self, board, enemy_pieces_squares):
-        """
-        Get all squares enemy pieces can move into
-        """
-        death_squares = []
-        for square in enemy_pieces_squares:
-            death_squares += board.get_piece(square).get_available_moves(board)
-        return death_squares
-
-    def check_death_square(self, death_squares, selected_move):
-        return selected_move in death_squares
+        enemy_attacks = board.attack_counts(self.opponent)
+        moves = list(board.legal_moves()) or generate_moves(board)
+        safe_moves = [move for move in moves if not enemy_attacks[move[1].index]]
+        moves = safe_moves or moves
+        return random.choice(moves) if moves else None
 
 
 class ChessBotStronk(ChessBot):
-    def __init__(self, player, opponent):
+    def __init__(self, player, opponent, depth=1, time_limit=None, transposition_table=None,
+                 incremental_evaluation=False, batch_evaluation=False, opening_book=None, tablebase=None,
+                 quiescence=False, evaluation=None, stats=False):
+        """
+        With opening_book set to the path of a book file, book moves are played without searching. With
+        tablebase set to a directory of endgame tables, endings they cover are played perfectly. With
+        quiescence, captures are played out at the end of the search instead of guessed at. The
+        evaluation is an EvaluationConfig giving the piece values and noise to score positions with.
+        With stats, search.stats holds the statistics of the last move's search.
+        """
         super().__init__(player, opponent)
+        self.incremental_evaluation = incremental_evaluation
+        self.evaluation = EvaluationConfig() if evaluation is None else evaluation
+        self.quiescence = quiescence
+        self.book = None if opening_book is None else OpeningBook(opening_book)
+        self.tablebase = None if tablebase is None else Tablebase(tablebase)
+        self.search = Search(self.evaluate, depth=depth, time_limit=time_limit,
+                             transposition_table=transposition_table,
+                             evaluate_batch=self.evaluate_batch if batch_evaluation else None,
+                             quiescence=quiescence, stats=stats)
 
     def get_move(self, board):
         desired_board_state = self.get_desired_board_state(board)
@@ -126,30 +101,49 @@ class ChessBotStronk(ChessBot):
         return None
 
     def get_desired_board_state(self, board):
-        future_board_states = self.get_future_board_states(board)
-        # for future_board_state in future_board_states:
-        #     future_board_states_lvl2 = self.get_future_board_states(future_board_state)
-        #     future_board_state.value += max(future_board_states_lvl2, key=lambda f: f.value).value
-        if future_board_states is not None:
-            return max(future_board_states, key=lambda f: f.value)
+        """
+        Play a move from the opening book or endgame tables if there is one, or else search ahead for
+        the best move, looking as deep as the bot's depth and time limits allow
+        """
+        if self.book is not None:
+            move = self.book.choose(board, random.random())
+            if move is not None:
+                self.search.reset_counts()
+                return BoardState(next_move=list(move), value=None)
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(board)
+            if move is not None:
+                self.search.reset_counts()
+                return BoardState(next_move=list(move), value=None)
+        move, value = self.search.search(board)
+        if move is not None:
+            return BoardState(next_move=list(move), value=value)
         return None
 
-    def get_future_board_states(self, board):
-        future_board_state_list = []
-        # for every available move
-        bot_pieces_squares = self.get_bot_locations(board)
-        for from_square in bot_pieces_squares:
-            bot_piece_available_move_squares = self.get_bot_square_moves(board, from_square)
-            for to_square in bot_piece_available_move_squares:
-                future_board_state_list.append(self.get_new_board_state(board, from_square, to_square))
-        return future_board_state_list
-
-    def get_new_board_state(self, board, from_square, to_square):
-        new_board_state = copy.deepcopy(board)
-        new_board_state.next_move = [from_square, to_square]
-        new_board_state.get_piece(from_square).move_to(new_board_state, to_square)
-        new_board_state.value = self.value_assign(new_board_state) + random.random() / 2  # TODO
-        return new_board_state
+    def close(self):
+        self.search.close()
+
+    def evaluate(self, board):
+        """
+        Score a position at the edge of the search, from the point of view of the player to move.
+        With incremental evaluation, only the material and piece-square tables are used.
+        """
+        if self.incremental_evaluation:
+            value = self.evaluation.static_score(board, self.player)
+        else:
+            value = self.value_assign(board)
+        value += self.evaluation.next_noise()
+        return value if board.current_player == self.player else -value
+
+    def evaluate_batch(self, positions, keys, player):
+        """
+        Score a batch of positions at once with NumPy, from the point of view of the given player
+        """
+        from chessington.engine.batch_evaluation import codes_from_bytes, evaluate_positions
+        values = evaluate_positions(codes_from_bytes(positions), self.evaluation.batch_square_table())
+        values = values * (1 if self.player == Player.WHITE else -1)
+        values = values + [self.evaluation.next_noise() for _ in keys]
+        return values if player == self.player else -values
 
     def value_assign(self, new_board_state):
         """
@@ -158,31 +152,28 @@ class ChessBotStronk(ChessBot):
         """
         enemy_squares = self.get_enemy_locations(new_board_state)
         bot_squares = self.get_bot_locations(new_board_state)
+        living_pieces_value = - 2 * self.piece_ranking(new_board_state, enemy_squares, 135)
+        living_pieces_value += 4 * self.piece_ranking(new_board_state, bot_squares, 300)
+        if self.quiescence:
+            # The quiescence search has already played out whatever can be taken
+            return living_pieces_value
         bad_death_squares = self.get_death_squares(new_board_state, enemy_squares)
         good_death_squares = self.get_death_squares(new_board_state, bot_squares)
-        death_square_value = - 4 * self.piece_ranking(new_board_state, bad_death_squares, 30)
-        death_square_value += 2 * self.piece_ranking(new_board_state, good_death_squares, random.randint(10, 12))
-        living_pieces_value = - 2 * self.piece_ranking(new_board_state, enemy_squares, random.randint(12, 15))
-        living_pieces_value += 4 * self.piece_ranking(new_board_state, bot_squares, 30)
+        death_square_value = - 4 * self.piece_ranking(new_board_state, bad_death_squares, 300)
+        death_square_value += 2 * self.piece_ranking(new_board_state, good_death_squares, 110)
         value = living_pieces_value + death_square_value
         return value
 
     def piece_ranking(self, board, squares, check_rank):
+        """
+        Add up the values of the pieces on the squares, counting a king as check_rank
+        """
+        piece_values = self.evaluation.piece_values
         value = 0
         for square in squares:
             piece = board.get_piece(square)
-            if isinstance(piece, King):
-                value += check_rank
-            if isinstance(piece, Queen):
-                value += random.randint(8, 10)
-            if isinstance(piece, Bishop):
-                value += random.randint(3, 4)
-            if isinstance(piece, Knight):
-                value += random.randint(3, 4)
-            if isinstance(piece, Rook):
-                value += random.randint(4, 6)
-            if isinstance(piece, Pawn):
-                value += random.randint(1, 2)
+            if piece is not None:
+                value += check_rank if type(piece) is King else piece_values[type(piece)]
         return value
 
     def check_valid_piece(self, board, selected_square):
@@ -196,13 +187,7 @@ class ChessBotStronk(ChessBot):
         return board.get_piece(selected_square).player == self.opponent
 
     def get_bot_locations(self, board):
-        bot_pieces_squares = []
-        for square_row in range(8):
-            for square_col in range(8):
-                selected_square = Square.at(square_row, square_col)
-                if self.check_valid_piece(board, selected_square):
-                    bot_pieces_squares.append(selected_square)
-        return bot_pieces_squares
+        return board.get_piece_squares(self.player)
 
     def get_bot_square_moves(self, board, square):
         return board.get_piece(square).get_available_moves(board)
@@ -211,13 +196,7 @@ class ChessBotStronk(ChessBot):
         """
         Get all squares containing enemy pieces
         """
-        enemy_pieces_squares = []
-        for square_row in range(8):
-            for square_col in range(8):
-                selected_square = Square.at(square_row, square_col)
-                if self.check_enemy_piece(board, selected_square):
-                    enemy_pieces_squares.append(selected_square)
-        return enemy_pieces_squares
+        return board.get_piece_squares(self.opponent)
 
     def get_death_squares(self, board, enemy_pieces_squares):
         """
@@ -233,8 +212,37 @@ class ChessBotStronk(ChessBot):
 
 
 class NuChessBotStronk(ChessBot):
-    def __init__(self, player, opponent):
+    def __init__(self, player, opponent, depth=1, time_limit=None, transposition_table=None,
+                 incremental_evaluation=False, batch_evaluation=False, workers=None, seed=None,
+                 opening_book=None, tablebase=None, quiescence=False, evaluation=None, stats=False):
+        """
+        With workers set, root moves are searched in parallel by that many processes. With seed set, the
+        random tie-breaking noise depends only on the position, so the same move is found either way.
+        With opening_book set to the path of a book file, book moves are played without searching. With
+        tablebase set to a directory of endgame tables, endings they cover are played perfectly. With
+        quiescence, captures are played out at the end of the search instead of guessed at. The
+        evaluation is an EvaluationConfig giving the piece values and noise to score positions with.
+        With stats, search.stats holds the statistics of the last move's search.
+        """
         super().__init__(player, opponent)
+        self.incremental_evaluation = incremental_evaluation
+        self.evaluation = EvaluationConfig() if evaluation is None else evaluation
+        self.quiescence = quiescence
+        self.book = None if opening_book is None else OpeningBook(opening_book)
+        self.tablebase = None if tablebase is None else Tablebase(tablebase)
+        self.seed = seed
+        if workers is None:
+            self.search = Search(self.evaluate, depth=depth, time_limit=time_limit,
+                                 transposition_table=transposition_table,
+                                 evaluate_batch=self.evaluate_batch if batch_evaluation else None,
+                                 quiescence=quiescence, stats=stats)
+        else:
+            bot_factory = partial(NuChessBotStronk, player, opponent, depth=depth,
+                                  incremental_evaluation=incremental_evaluation,
+                                  batch_evaluation=batch_evaluation, seed=seed, quiescence=quiescence,
+                                  evaluation=evaluation)
+            self.search = ParallelSearch(bot_factory, workers=workers, depth=depth, time_limit=time_limit,
+                                         stats=stats)
 
     def get_move(self, board):
         desired_board_state = self.get_desired_board_state(board)
@@ -246,30 +254,56 @@ class NuChessBotStronk(ChessBot):
         return None
 
     def get_desired_board_state(self, board):
-        future_board_states = self.get_future_board_states(board)
-        # for future_board_state in future_board_states:
-        #     future_board_states_lvl2 = self.get_future_board_states(future_board_state)
-        #     future_board_state.value += max(future_board_states_lvl2, key=lambda f: f.value).value
-        if future_board_states is not None:
-            return max(future_board_states, key=lambda f: f.value)
+        """
+        Play a move from the opening book or endgame tables if there is one, or else search ahead for
+        the best move, looking as deep as the bot's depth and time limits allow
+        """
+        if self.book is not None:
+            fraction = random.random() if self.seed is None else position_noise(board.zobrist_key, self.seed)
+            move = self.book.choose(board, fraction)
+            if move is not None:
+                self.search.reset_counts()
+                return BoardState(next_move=list(move), value=None)
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(board)
+            if move is not None:
+                self.search.reset_counts()
+                return BoardState(next_move=list(move), value=None)
+        move, value = self.search.search(board)
+        if move is not None:
+            return BoardState(next_move=list(move), value=value)
         return None
 
-    def get_future_board_states(self, board):
-        future_board_state_list = []
-        # for every available move
-        bot_pieces_squares = self.get_bot_locations(board)
-        for from_square in bot_pieces_squares:
-            bot_piece_available_move_squares = self.get_bot_square_moves(board, from_square)
-            for to_square in bot_piece_available_move_squares:
-                future_board_state_list.append(self.get_new_board_state(board, from_square, to_square))
-        return future_board_state_list
-
-    def get_new_board_state(self, board, from_square, to_square):
-        new_board_state = copy.deepcopy(board)
-        new_board_state.next_move = [from_square, to_square]
-        new_board_state.get_piece(from_square).move_to(new_board_state, to_square)
-        new_board_state.value = self.value_assign(new_board_state) + random.random() / 2  # TODO
-        return new_board_state
+    def close(self):
+        self.search.close()
+
+    def evaluate(self, board):
+        """
+        Score a position at the edge of the search, from the point of view of the player to move.
+        With incremental evaluation, only the material and piece-square tables are used.
+        """
+        if self.incremental_evaluation:
+            value = self.evaluation.static_score(board, self.player)
+        else:
+            value = self.value_assign(board)
+        if self.seed is None:
+            value += self.evaluation.next_noise()
+        else:
+            value += position_noise(board.zobrist_key, self.seed) * self.evaluation.noise
+        return value if board.current_player == self.player else -value
+
+    def evaluate_batch(self, positions, keys, player):
+        """
+        Score a batch of positions at once with NumPy, from the point of view of the given player
+        """
+        from chessington.engine.batch_evaluation import codes_from_bytes, evaluate_positions
+        values = evaluate_positions(codes_from_bytes(positions), self.evaluation.batch_square_table())
+        values = values * (1 if self.player == Player.WHITE else -1)
+        if self.seed is None:
+            values = values + [self.evaluation.next_noise() for _ in keys]
+        else:
+            values = values + [position_noise(key, self.seed) * self.evaluation.noise for key in keys]
+        return values if player == self.player else -values
 
     def value_assign(self, new_board_state):
         """
@@ -278,31 +312,28 @@ class NuChessBotStronk(ChessBot):
         """
         enemy_squares = self.get_enemy_locations(new_board_state)
         bot_squares = self.get_bot_locations(new_board_state)
+        living_pieces_value = - self.piece_ranking(new_board_state, enemy_squares, 900)
+        living_pieces_value += self.piece_ranking(new_board_state, bot_squares, 900)
+        if self.quiescence:
+            # The quiescence search has already played out whatever can be taken
+            return living_pieces_value
         bad_death_squares = self.get_death_squares(new_board_state, enemy_squares)
         good_death_squares = self.get_death_squares(new_board_state, bot_squares)
         death_square_value = - self.piece_ranking(new_board_state, bad_death_squares, 900)
         death_square_value += self.piece_ranking(new_board_state, good_death_squares, 90)
-        living_pieces_value = - self.piece_ranking(new_board_state, enemy_squares, 900)
-        living_pieces_value += self.piece_ranking(new_board_state, bot_squares, 900)
         value = living_pieces_value + death_square_value
         return value
 
     def piece_ranking(self, board, squares, check_rank):
+        """
+        Add up the values of the pieces on the squares, counting a king as check_rank
+        """
+        piece_values = self.evaluation.piece_values
         value = 0
         for square in squares:
             piece = board.get_piece(square)
-            if isinstance(piece, King):
-                value += check_rank
-            if isinstance(piece, Queen):
-                value += 90
-            if isinstance(piece, Bishop):
-                value += 30
-            if isinstance(piece, Knight):
-                value += 30
-            if isinstance(piece, Rook):
-                value += 50
-            if isinstance(piece, Pawn):
-                value += 10
+            if piece is not None:
+                value += check_rank if type(piece) is King else piece_values[type(piece)]
         return value
 
     def check_valid_piece(self, board, selected_square):
@@ -316,13 +347,7 @@ class NuChessBotStronk(ChessBot):
         return board.get_piece(selected_square).player == self.opponent
 
     def get_bot_locations(self, board):
-        bot_pieces_squares = []
-        for square_row in range(8):
-            for square_col in range(8):
-                selected_square = Square.at(square_row, square_col)
-                if self.check_valid_piece(board, selected_square):
-                    bot_pieces_squares.append(selected_square)
-        return bot_pieces_squares
+        return board.get_piece_squares(self.player)
 
     def get_bot_square_moves(self, board, square):
         return board.get_piece(square).get_available_moves(board)
@@ -331,13 +356,7 @@ class NuChessBotStronk(ChessBot):
         """
         Get all squares containing enemy pieces
         """
-        enemy_pieces_squares = []
-        for square_row in range(8):
-            for square_col in range(8):
-                selected_square = Square.at(square_row, square_col)
-                if self.check_enemy_piece(board, selected_square):
-                    enemy_pieces_squares.append(selected_square)
-        return enemy_pieces_squares
+        return board.get_piece_squares(self.opponent)
 
     def get_death_squares(self, board, enemy_pieces_squares):
         """
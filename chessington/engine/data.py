@@ -5,6 +5,9 @@ Data classes for easy representation of concepts such as a square on the board o
 from collections import namedtuple
 from enum import Enum, auto
 
+BOARD_SIZE = 8
+FILE_NAMES = 'abcdefgh'
+
 class Player(Enum):
     """
     The two players in a game of chess.
@@ -19,12 +22,52 @@ class Player(Enum):
 
 class Square(namedtuple('Square', 'row col')):
     """
-    An immutable pair (row, col) representing the coordinates of a square.
+    An immutable pair (row, col) representing the coordinates of a square. Each square also has an
+    index from 0 to 63, row * 8 + col, for looking it up in tables.
+
+    The 64 squares of the board are made once and shared, so Square.at and Square.from_index never
+    allocate for a square on the board.
     """
 
+    def __new__(cls, row, col):
+        square = super().__new__(cls, row, col)
+        square.index = row * BOARD_SIZE + col
+        return square
+
+    @classmethod
+    def _make(cls, iterable):
+        # The namedtuple version skips __new__, and so would leave index as the inherited tuple.index
+        return cls(*iterable)
+
     @staticmethod
     def at(row, col):
         """
-        Creates a square at the given row and column.
+        Gets the square at the given row and column.
         """
-        return Square(row=row, col=col)
\ No newline at end of file
+        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+            return SQUARES[row * BOARD_SIZE + col]
+        return Square(row, col)
+
+    @staticmethod
+    def from_index(index):
+        """
+        Gets the square with the given index, row * 8 + col.
+        """
+        return SQUARES[index]
+
+    @staticmethod
+    def from_name(name):
+        """
+        Gets a square from its algebraic name, such as 'e4'.
+        """
+        return SQUARES[(int(name[1]) - 1) * BOARD_SIZE + FILE_NAMES.index(name[0])]
+
+    def name(self):
+        """
+        The algebraic name of the square, such as 'e4'. Row 0 is white's back row.
+        """
+        return FILE_NAMES[self.col] + str(self.row + 1)
+
+
+# Every square on the board, in index order
+SQUARES = tuple(Square(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE))
@@ -0,0 +1,187 @@
+"""
+Material and piece-square values for scoring positions. Values are in the same units as the bots'
+piece rankings, where a pawn is worth 10.
+"""
+
+import random
+
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+PIECE_VALUES = {Pawn: 10, Knight: 30, Bishop: 30, Rook: 50, Queen: 90, King: 900}
+
+# Bonuses for each piece type standing on each square, from white's point of view. These are laid out
+# as the board is drawn, with black's back row at the top and white's back row at the bottom.
+PIECE_SQUARE_DIAGRAMS = {
+    Pawn: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 5, 5, 5, 5, 5, 5, 5,
+        1, 1, 2, 3, 3, 2, 1, 1,
+        0, 0, 1, 2, 2, 1, 0, 0,
+        0, 0, 0, 2, 2, 0, 0, 0,
+        0, 0, -1, 0, 0, -1, 0, 0,
+        0, 1, 1, -2, -2, 1, 1, 0,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    Knight: (
+        -5, -4, -3, -3, -3, -3, -4, -5,
+        -4, -2, 0, 0, 0, 0, -2, -4,
+        -3, 0, 1, 2, 2, 1, 0, -3,
+        -3, 1, 2, 2, 2, 2, 1, -3,
+        -3, 0, 2, 2, 2, 2, 0, -3,
+        -3, 1, 1, 2, 2, 1, 1, -3,
+        -4, -2, 0, 1, 1, 0, -2, -4,
+        -5, -4, -3, -3, -3, -3, -4, -5,
+    ),
+    Bishop: (
+        -2, -1, -1, -1, -1, -1, -1, -2,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 1, 1, 1, 1, 0, -1,
+        -1, 1, 1, 1, 1, 1, 1, -1,
+        -1, 0, 1, 1, 1, 1, 0, -1,
+        -1, 1, 1, 1, 1, 1, 1, -1,
+        -1, 1, 0, 0, 0, 0, 1, -1,
+        -2, -1, -1, -1, -1, -1, -1, -2,
+    ),
+    Rook: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        1, 1, 1, 1, 1, 1, 1, 1,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        0, 0, 0, 1, 1, 0, 0, 0,
+    ),
+    Queen: (
+        -2, -1, -1, -1, -1, -1, -1, -2,
+        -1, 0, 0, 0, 0, 0, 0, -1,
+        -1, 0, 1, 1, 1, 1, 0, -1,
+        -1, 0, 1, 1, 1, 1, 0, -1,
+        0, 0, 1, 1, 1, 1, 0, -1,
+        -1, 1, 1, 1, 1, 1, 0, -1,
+        -1, 0, 1, 0, 0, 0, 0, -1,
+        -2, -1, -1, -1, -1, -1, -1, -2,
+    ),
+    King: (
+        -3, -4, -4, -5, -5, -4, -4, -3,
+        -3, -4, -4, -5, -5, -4, -4, -3,
+        -3, -4, -4, -5, -5, -4, -4, -3,
+        -3, -4, -4, -5, -5, -4, -4, -3,
+        -2, -3, -3, -4, -4, -3, -3, -2,
+        -1, -2, -2, -2, -2, -2, -2, -1,
+        2, 2, 0, 0, 0, 0, 2, 2,
+        2, 3, 1, 0, 0, 1, 3, 2,
+    ),
+}
+
+
+def _square_scores(piece_type, player, piece_values):
+    """
+    The material plus piece-square value of the piece on each square, indexed by row * 8 + col.
+    """
+    diagram = PIECE_SQUARE_DIAGRAMS[piece_type]
+    scores = []
+    for row in range(8):
+        # White's rows count up from the bottom of the diagram, and black's down from the top
+        diagram_row = 7 - row if player == Player.WHITE else row
+        for col in range(8):
+            scores.append(piece_values[piece_type] + diagram[diagram_row * 8 + col])
+    return tuple(scores)
+
+
+def square_score_tables(piece_values):
+    """
+    The tables of _square_scores for each type of piece and player, using the given material values.
+    """
+    return {
+        (piece_type, player): _square_scores(piece_type, player, piece_values)
+        for player in (Player.WHITE, Player.BLACK)
+        for piece_type in PIECE_SQUARE_DIAGRAMS
+    }
+
+
+SQUARE_SCORES = square_score_tables(PIECE_VALUES)
+
+
+def square_score(piece, square):
+    """
+    The material plus piece-square value of the given piece standing on the given square.
+    """
+    return SQUARE_SCORES[(type(piece), piece.player)][square.index]
+
+
+def score_board(board, player):
+    """
+    Calculates the material and piece-square score of a board from scratch, from the given player's point
+    of view. The board keeps this score up to date itself, so this is only needed to check it.
+    """
+    score = 0
+    for owner in (Player.WHITE, Player.BLACK):
+        sign = 1 if owner == player else -1
+        for square in board.get_piece_squares(owner):
+            score += sign * square_score(board.get_piece(square), square)
+    return score
+
+
+class EvaluationConfig:
+    """
+    The numbers a bot scores positions with, worked out once rather than on every evaluation: a value
+    for each type of piece, the material plus piece-square tables built from them, and the size of the
+    random noise added to each score to break ties.
+
+    With a seed, the noise comes from a generator of its own, so a game replays exactly however often
+    other code draws random numbers. Otherwise it comes from the random module, which tournaments seed
+    at the start of each game. With noise=0, scores are fully determined by the position.
+
+    Every way a bot scores material reads these tables: piece rankings, static_score and the NumPy table
+    of batch_square_table.
+    """
+
+    def __init__(self, piece_values=None, noise=0.5, seed=None):
+        self.piece_values = dict(PIECE_VALUES if piece_values is None else piece_values)
+        self.square_scores = square_score_tables(self.piece_values)
+        # Boards keep running totals from the default tables, which static_score can use directly
+        self.board_tables = self.piece_values == PIECE_VALUES
+        self.batch_table = None
+        self.noise = noise
+        self.seed = seed
+        self.random = None if seed is None else random.Random(seed)
+
+    def next_noise(self):
+        """
+        The next draw from the noise stream, in [0, noise).
+        """
+        if not self.noise:
+            return 0
+        return (random if self.random is None else self.random).random() * self.noise
+
+    def score_board(self, board, player):
+        """
+        The material and piece-square score of a board from the given player's point of view, using
+        this configuration's tables.
+        """
+        score = 0
+        for owner in (Player.WHITE, Player.BLACK):
+            sign = 1 if owner == player else -1
+            for piece, square in board.piece_squares[owner].items():
+                score += sign * self.square_scores[(type(piece), owner)][square.index]
+        return score
+
+    def static_score(self, board, player):
+        """
+        The same score as score_board, read from the board's running totals in O(1) when this
+        configuration uses the default piece values.
+        """
+        if self.board_tables:
+            return board.static_evaluation(player)
+        return self.score_board(board, player)
+
+    def batch_square_table(self):
+        """
+        This configuration's tables laid out for batch_evaluation.evaluate_positions. Needs NumPy.
+        """
+        if self.batch_table is None:
+            from chessington.engine.batch_evaluation import square_table
+            self.batch_table = square_table(self.square_scores)
+        return self.batch_table
@@ -0,0 +1,93 @@
+"""
+Move ordering for the search. Alpha-beta pruning cuts off the most when the best move is searched
+first, so moves are tried in order of how likely they are to be good:
+
+1. the best move found by an earlier search of the position, from the transposition table;
+2. captures which do not lose material in the exchange that follows, most valuable victim first and
+   then least valuable attacker first (MVV-LVA);
+3. killer moves, the quiet moves which last caused a cutoff at the same ply in another position;
+4. captures which lose material, by how much the static exchange evaluation says they lose;
+5. other quiet moves, by how often they have caused cutoffs anywhere (the history table).
+"""
+
+from chessington.engine.data import Player
+from chessington.engine.evaluation import PIECE_VALUES
+from chessington.engine.pieces import Pawn
+
+KILLER_SLOTS = 2
+
+TABLE_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORE = 1 << 26
+LOSING_CAPTURE_SCORE = 1 << 25
+HISTORY_LIMIT = 1 << 24
+
+
+class MoveOrdering:
+    """
+    Sorts moves for the search, learning killer moves and history scores from the cutoffs it is told
+    about. One is needed per search, as what it learns is specific to the positions being searched.
+    """
+
+    def __init__(self):
+        self.killers = []
+        self.history = {Player.WHITE: [0] * 64 * 64, Player.BLACK: [0] * 64 * 64}
+
+    def new_search(self):
+        """
+        Forgets the killer moves, which belong to one search tree, and ages the history scores so that
+        recent cutoffs count for more.
+        """
+        self.killers = []
+        for scores in self.history.values():
+            for number, score in enumerate(scores):
+                if score:
+                    scores[number] = score >> 1
+
+    def order(self, board, moves, ply, table_move=None):
+        """
+        Returns the moves sorted best first.
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[board.current_player]
+
+        def move_score(move):
+            if move == table_move:
+                return TABLE_MOVE_SCORE
+            from_square, to_square = move
+            victim = board.get_piece(to_square)
+            attacker = board.get_piece(from_square)
+            if victim is None and isinstance(attacker, Pawn) and from_square.col != to_square.col:
+                # An en passant capture takes a pawn
+                victim = attacker
+            if victim is not None:
+                victim_value, attacker_value = PIECE_VALUES[type(victim)], PIECE_VALUES[type(attacker)]
+                # Taking a piece worth at least as much as the attacker cannot lose material
+                if victim_value < attacker_value:
+                    exchange = board.see(to_square, from_square)
+                    if exchange < 0:
+                        return LOSING_CAPTURE_SCORE + exchange
+                return CAPTURE_SCORE + 16 * victim_value - attacker_value // 10
+            if move in killers:
+                return KILLER_SCORE - killers.index(move)
+            return history[from_square.index * 64 + to_square.index]
+
+        return sorted(moves, key=move_score, reverse=True)
+
+    def record_cutoff(self, board, move, ply, depth):
+        """
+        Records that the move caused a beta cutoff at the given ply, searched to the given depth. Only
+        quiet moves are remembered, as captures are already tried early.
+        """
+        from_square, to_square = move
+        if board.get_piece(to_square) is not None:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        history = self.history[board.current_player]
+        index = from_square.index * 64 + to_square.index
+        history[index] = min(history[index] + depth * depth, HISTORY_LIMIT)
@@ -0,0 +1,135 @@
+"""
+Perft ("performance test") counts the positions reachable from a board in a given number of moves. The
+counts are a check that move generation is correct, and the time taken measures how fast it is.
+
+Counts follow this engine's rules: every move returned by Piece.get_available_moves is counted, with
+no check detection or castling, and pawns always promote to queens.
+
+Run it from the command line with `poetry run perft`, or `python -m chessington.engine.perft`.
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+from chessington.engine.bitboard import BitBoard
+from chessington.engine.board import Board, STARTING_FEN
+from chessington.engine.data import Square
+from chessington.engine.search import generate_moves
+
+PerftPosition = namedtuple('PerftPosition', 'fen expected_nodes')
+
+# Standard test positions, with the node counts this engine's rules give at depths 1, 2, 3, ...
+PERFT_POSITIONS = {
+    'start': PerftPosition(STARTING_FEN, (20, 400, 8902)),
+    'kiwipete': PerftPosition('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                              (46, 1871, 87310)),
+    'endgame': PerftPosition('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', (16, 278, 4867)),
+    'promotions': PerftPosition('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                                (38, 1549, 61015)),
+    'middlegame': PerftPosition('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                                (40, 1394, 58458)),
+}
+
+PerftResult = namedtuple('PerftResult', 'nodes seconds')
+
+
+def board_moves(board):
+    """
+    Get every move available to the current player, using the fast generator on a BitBoard.
+    """
+    if isinstance(board, BitBoard):
+        return [(Square.from_index(from_index), Square.from_index(to_index))
+                for from_index, to_index in board.pseudo_legal_moves()]
+    return generate_moves(board)
+
+
+def perft(board, depth):
+    """
+    Counts the leaf nodes of the move tree to the given depth.
+    """
+    if depth == 0:
+        return 1
+    moves = board_moves(board)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for from_square, to_square in moves:
+        undo = board.make_move(from_square, to_square)
+        nodes += perft(board, depth - 1)
+        board.unmake_move(undo)
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Splits the perft count by root move, returning a list of (from_square, to_square, nodes).
+    """
+    counts = []
+    for from_square, to_square in board_moves(board):
+        undo = board.make_move(from_square, to_square)
+        counts.append((from_square, to_square, perft(board, depth - 1)))
+        board.unmake_move(undo)
+    return counts
+
+
+def timed_perft(board, depth):
+    start = time.perf_counter()
+    nodes = perft(board, depth)
+    return PerftResult(nodes, time.perf_counter() - start)
+
+
+def nodes_per_second(result):
+    return result.nodes / result.seconds if result.seconds > 0 else float('inf')
+
+
+def run_suite(depth, board_type=Board, out=sys.stdout):
+    """
+    Runs every standard position up to the given depth, checking the node counts. Returns whether they
+    all matched.
+    """
+    all_passed = True
+    for name, position in PERFT_POSITIONS.items():
+        for current_depth, expected in enumerate(position.expected_nodes[:depth], start=1):
+            board = board_type.from_fen(position.fen)
+            result = timed_perft(board, current_depth)
+            passed = result.nodes == expected
+            all_passed = all_passed and passed
+            print(f"{name:<12} depth {current_depth}: {result.nodes:>9} nodes "
+                  f"{'ok' if passed else f'FAILED (expected {expected})':<24} "
+                  f"{result.seconds:8.3f}s {nodes_per_second(result):>12,.0f} nps", file=out)
+    return all_passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count move tree leaf nodes to measure move generation.')
+    parser.add_argument('--depth', type=int, default=3, help='number of moves to search')
+    parser.add_argument('--position', default='start', choices=sorted(PERFT_POSITIONS),
+                        help='standard position to start from')
+    parser.add_argument('--fen', help='FEN of a position to start from instead')
+    parser.add_argument('--divide', action='store_true', help='show the node count for each root move')
+    parser.add_argument('--suite', action='store_true', help='check every standard position')
+    parser.add_argument('--bitboard', action='store_true', help='use the bitboard move generator')
+    args = parser.parse_args(argv)
+
+    board_type = BitBoard if args.bitboard else Board
+    if args.suite:
+        return 0 if run_suite(args.depth, board_type) else 1
+
+    board = board_type.from_fen(args.fen if args.fen is not None else PERFT_POSITIONS[args.position].fen)
+
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(board, args.depth)
+        for from_square, to_square, nodes in counts:
+            print(f"{from_square.name()}{to_square.name()}: {nodes}")
+        result = PerftResult(sum(nodes for _, _, nodes in counts), time.perf_counter() - start)
+    else:
+        result = timed_perft(board, args.depth)
+    print(f"Nodes: {result.nodes}  Time: {result.seconds:.3f}s  NPS: {nodes_per_second(result):,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Reading and writing games in Portable Game Notation (PGN).
+
+Games are read one at a time from a stream, so archives of any size can be processed without loading
+them into memory. Moves are kept in Standard Algebraic Notation (SAN) until they are replayed onto a
+board, which is only done for the games that need it.
+
+Moves follow this engine's rules, so castling and promotion to anything but a queen are not supported.
+"""
+
+import re
+from collections import namedtuple
+
+from chessington.engine.board import Board, STARTING_FEN, FEN_PIECE_LETTERS, FEN_LETTER_PIECES
+from chessington.engine.data import Player, Square, FILE_NAMES
+from chessington.engine.pieces import Pawn, King
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+
+# Comments, variation brackets, annotation glyphs, move numbers and moves or results
+TOKEN_PATTERN = re.compile(r'\{[^}]*\}?|;.*|\(|\)|\$\d+|\d+\.+|[^\s(){};]+')
+
+SAN_PATTERN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+
+
+class SanError(Exception):
+    """
+    Raised when a move in SAN does not match exactly one available move.
+    """
+    pass
+
+
+class PgnGame(namedtuple('PgnGame', 'tags moves result')):
+    """
+    A game read from a PGN file: a dict of its tags, a list of its moves in SAN, and its result.
+    """
+
+    def starting_board(self, board_type=Board):
+        """
+        Creates the board the game starts from, which is given by the FEN tag if there is one.
+        """
+        fen = self.tags.get('FEN')
+        return board_type.at_starting_position() if fen is None else board_type.from_fen(fen)
+
+    def replay(self, board_type=Board):
+        """
+        Plays every move of the game and returns the final board.
+        """
+        board = self.starting_board(board_type)
+        for _ in play_moves(board, self.moves):
+            pass
+        return board
+
+
+def read_games(stream):
+    """
+    Reads the games in a PGN stream, such as an open file, one at a time. Comments, variations and
+    annotation glyphs are skipped.
+    """
+    tags, moves = {}, []
+    in_movetext = False
+    comment_open = False
+    variation_depth = 0
+    for line in stream:
+        if comment_open:
+            comment_end = line.find('}')
+            if comment_end < 0:
+                continue
+            line = line[comment_end + 1:]
+            comment_open = False
+        stripped = line.strip()
+        if not stripped or stripped[0] == '%':
+            continue
+        if stripped[0] == '[' and variation_depth == 0:
+            if in_movetext:
+                # A game without a result ends where the tags of the next game start
+                yield PgnGame(tags, moves, '*')
+                tags, moves, in_movetext = {}, [], False
+            match = TAG_PATTERN.match(stripped)
+            if match is not None:
+                tags[match.group(1)] = re.sub(r'\\(.)', r'\1', match.group(2))
+            continue
+
+        in_movetext = True
+        for token in TOKEN_PATTERN.findall(line):
+            first = token[0]
+            if first == '{':
+                comment_open = not token.endswith('}')
+            elif first == '(':
+                variation_depth += 1
+            elif first == ')':
+                variation_depth -= 1
+            elif variation_depth or first == ';' or first == '$' or token[-1] == '.':
+                continue
+            elif token in RESULTS:
+                yield PgnGame(tags, moves, token)
+                tags, moves, in_movetext = {}, [], False
+            else:
+                moves.append(token)
+    if in_movetext or tags:
+        yield PgnGame(tags, moves, '*')
+
+
+def play_moves(board, sans):
+    """
+    Plays each move in SAN on the board in turn, yielding the (from_square, to_square) of each move
+    once it has been played.
+    """
+    for san in sans:
+        from_square, to_square = parse_san(board, san)
+        board.move_piece(from_square, to_square)
+        yield from_square, to_square
+
+
+def parse_san(board, san):
+    """
+    Finds the (from_square, to_square) of a move in SAN for the player whose turn it is.
+    """
+    match = SAN_PATTERN.match(san.rstrip('+#!?'))
+    if match is None:
+        if san.startswith(('O-O', '0-0')):
+            raise SanError(f'Castling is not supported: {san}')
+        raise SanError(f'Not a move: {san}')
+    letter, from_file, from_rank, to_name, promotion = match.groups()
+    if promotion is not None and promotion != 'Q':
+        raise SanError(f'Pawns can only promote to queens: {san}')
+    piece_type = Pawn if letter is None else FEN_LETTER_PIECES[letter.lower()]
+    to_square = Square.from_name(to_name)
+
+    candidates = [square for piece, square in board.piece_squares[board.current_player].items()
+                  if type(piece) is piece_type
+                  and (from_file is None or square.col == FILE_NAMES.index(from_file))
+                  and (from_rank is None or square.row == int(from_rank) - 1)
+                  and to_square in piece.get_available_moves(board)]
+    if not candidates:
+        raise SanError(f'Illegal move: {san}')
+    if len(candidates) > 1:
+        # SAN only tells apart the pieces which could make the move legally, so a pinned piece does not count
+        legal_moves = set(board.legal_moves())
+        candidates = [square for square in candidates if (square, to_square) in legal_moves]
+        if len(candidates) != 1:
+            raise SanError(f'Ambiguous move: {san}')
+    return candidates[0], to_square
+
+
+def move_to_san(board, from_square, to_square):
+    """
+    Writes a move in SAN. The move must be available on the board, and not yet have been made.
+    """
+    piece = board.get_piece(from_square)
+    captured = board.get_piece(to_square)
+    if isinstance(piece, Pawn):
+        if from_square.col != to_square.col:
+            san = f'{FILE_NAMES[from_square.col]}x{to_square.name()}'
+        else:
+            san = to_square.name()
+        if piece.edge_check_row(to_square):
+            san += '=Q'
+    else:
+        san = FEN_PIECE_LETTERS[type(piece)].upper() + _disambiguation(board, piece, from_square, to_square)
+        san += ('x' if captured is not None else '') + to_square.name()
+    if not isinstance(captured, King) and _gives_check(board, from_square, to_square):
+        san += '+'
+    return san
+
+
+def _disambiguation(board, piece, from_square, to_square):
+    rivals = [square for other, square in board.piece_squares[piece.player].items()
+              if other is not piece and type(other) is type(piece)
+              and to_square in other.get_available_moves(board)]
+    if not rivals:
+        return ''
+    legal_moves = set(board.legal_moves())
+    if (from_square, to_square) in legal_moves:
+        # Pieces which could only make the move by exposing their king need not be told apart
+        rivals = [square for square in rivals if (square, to_square) in legal_moves]
+        if not rivals:
+            return ''
+    if all(square.col != from_square.col for square in rivals):
+        return FILE_NAMES[from_square.col]
+    if all(square.row != from_square.row for square in rivals):
+        return str(from_square.row + 1)
+    return from_square.name()
+
+
+def _gives_check(board, from_square, to_square):
+    """
+    Whether the player making the move could capture the enemy king with their next move.
+    """
+    undo = board.make_move(from_square, to_square)
+    try:
+        player = undo.current_player
+        king_square = next((square for piece, square in board.piece_squares[player.opponent()].items()
+                            if isinstance(piece, King)), None)
+        return king_square is not None and any(king_square in piece.get_available_moves(board)
+                                               for piece in board.piece_squares[player])
+    finally:
+        board.unmake_move(undo)
+
+
+class PgnWriter:
+    """
+    Writes games to a PGN stream as they are played: the tags when a game begins, each move as it is
+    made, and the result when it ends. An interrupted run loses only the game in progress.
+    """
+
+    def __init__(self, stream, line_length=79):
+        self.stream = stream
+        self.line_length = line_length
+        self.column = 0
+        self.move_number = 1
+
+    def begin_game(self, board, tags=None):
+        """
+        Writes the tags of a game starting from the given board, adding a FEN tag if it is not the
+        standard starting position.
+        """
+        tags = dict(tags or {})
+        fen = board.to_fen()
+        if fen != STARTING_FEN:
+            tags.setdefault('SetUp', '1')
+            tags.setdefault('FEN', fen)
+        for name, value in tags.items():
+            escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            self.stream.write(f'[{name} "{escaped}"]\n')
+        self.stream.write('\n')
+        self.column = 0
+        self.move_number = 1
+        if board.current_player == Player.BLACK:
+            self._write_token(f'{self.move_number}...')
+
+    def play_move(self, board, from_square, to_square):
+        """
+        Writes the move and then makes it on the board with Board.move_piece.
+        """
+        san = move_to_san(board, from_square, to_square)
+        player = board.current_player
+        if player == Player.WHITE:
+            self._write_token(f'{self.move_number}.')
+        board.move_piece(from_square, to_square)
+        self._write_token(san)
+        if player == Player.BLACK:
+            self.move_number += 1
+
+    def end_game(self, result='*'):
+        """
+        Writes the result, which ends the game.
+        """
+        self._write_token(result)
+        self.stream.write('\n\n')
+        self.column = 0
+        self.stream.flush()
+
+    def _write_token(self, token):
+        if self.column and self.column + 1 + len(token) > self.line_length:
+            self.stream.write('\n')
+            self.column = 0
+        if self.column:
+            self.stream.write(' ')
+            self.column += 1
+        self.stream.write(token)
+        self.column += len(token)
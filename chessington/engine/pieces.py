@@ -5,17 +5,101 @@ Definitions of each of the different chess pieces.
 from abc import ABC, abstractmethod
 import logging
 from chessington.engine.data import Player, Square
-logging.basicConfig(filename="pieces.log", filemode="w", level=logging.DEBUG)
+logging.basicConfig(filename="pieces.log", filemode="w", level=logging.INFO)
+
+BOARD_SIZE = 8
+
+KNIGHT_STEPS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+KING_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def _on_board(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _step_targets(steps):
+    """
+    For each square, the squares a single step in each of the given directions reaches.
+    """
+    targets = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            targets.append(tuple(Square.at(row + vertical_dir, col + horizontal_dir)
+                                 for vertical_dir, horizontal_dir in steps
+                                 if _on_board(row + vertical_dir, col + horizontal_dir)))
+    return tuple(targets)
+
+
+def _ray(row, col, vertical_dir, horizontal_dir):
+    squares = []
+    row, col = row + vertical_dir, col + horizontal_dir
+    while _on_board(row, col):
+        squares.append(Square.at(row, col))
+        row, col = row + vertical_dir, col + horizontal_dir
+    return tuple(squares)
+
+
+def _pawn_pushes(player):
+    direction = 1 if player == Player.WHITE else -1
+    start_row = 1 if player == Player.WHITE else 6
+    pushes = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if row == 0 or row == BOARD_SIZE - 1:
+                pushes.append(())
+            elif row == start_row:
+                pushes.append((Square.at(row + direction, col), Square.at(row + 2 * direction, col)))
+            else:
+                pushes.append((Square.at(row + direction, col),))
+    return tuple(pushes)
+
+
+def _pawn_attacks(player):
+    direction = 1 if player == Player.WHITE else -1
+    attacks = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if row == 0 or row == BOARD_SIZE - 1:
+                attacks.append(())
+            else:
+                attacks.append(tuple(Square.at(row + direction, col + horizontal_dir)
+                                     for horizontal_dir in (1, -1) if _on_board(row, col + horizontal_dir)))
+    return tuple(attacks)
+
+
+# The geometry of piece moves never changes, so it is worked out once here. Each table is indexed by
+# row * 8 + col of the square a piece stands on.
+KNIGHT_TARGETS = _step_targets(KNIGHT_STEPS)
+KING_TARGETS = _step_targets(KING_STEPS)
+PAWN_PUSHES = {player: _pawn_pushes(player) for player in (Player.WHITE, Player.BLACK)}
+PAWN_ATTACKS = {player: _pawn_attacks(player) for player in (Player.WHITE, Player.BLACK)}
+RAYS = {
+    direction: tuple(_ray(row, col, *direction) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE))
+    for direction in QUEEN_DIRECTIONS
+}
 
 
 class Piece(ABC):
     """
     An abstract base class from which all pieces inherit.
+
+    A piece holds only its player, and is never changed once made, so copies of a board can share
+    their pieces. Each piece still has its own identity, which is how the board keeps track of its square.
     """
+    __slots__ = ('player',)
 
     def __init__(self, player):
         self.player = player
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     @abstractmethod
     def get_available_moves(self, board):
         """
@@ -47,69 +131,61 @@ class Piece(ABC):
         return False
 
     def move_continuous(self, board, vertical_dir, horizontal_dir):
-        current_square = self.position(board)
-        next_square = Square.at(current_square.row, current_square.col)
-        valid_moves = []
-        while True:
-            next_square = Square.at(next_square.row + vertical_dir, next_square.col + horizontal_dir)
-            if not board.in_bounds(next_square):
-                return valid_moves
-            if board.is_square_empty(next_square):
-                valid_moves.append(next_square)
-            elif board.is_square_attackable(next_square, self.player):
-                valid_moves.append(next_square)
-                return valid_moves
-            else:
-                return valid_moves
+        return self.slide(board, self.position(board), ((vertical_dir, horizontal_dir),))
 
     def move_single(self, board, vertical_dir, horizontal_dir):
         current_square = self.position(board)
-        valid_moves = []
         next_square = Square.at(current_square.row + vertical_dir, current_square.col + horizontal_dir)
         if not board.in_bounds(next_square):
-            return valid_moves
-        if board.is_square_empty(next_square) or board.is_square_attackable(next_square, self.player):
-            valid_moves.append(next_square)
-            return valid_moves
-        else:
-            return valid_moves
+            return []
+        return self.step(board, (next_square,))
+
+    def slide(self, board, current_square, directions):
+        """
+        Get the squares reachable by sliding from the current square in each of the given directions,
+        up to and including the first enemy piece in the way.
+        """
+        index = current_square.index
+        valid_moves = []
+        for direction in directions:
+            for next_square in RAYS[direction][index]:
+                piece = board.get_piece(next_square)
+                if piece is None:
+                    valid_moves.append(next_square)
+                    continue
+                if piece.player != self.player:
+                    valid_moves.append(next_square)
+                break
+        return valid_moves
+
+    def step(self, board, target_squares):
+        """
+        Get those of the given squares which are empty or hold an enemy piece.
+        """
+        valid_moves = []
+        for next_square in target_squares:
+            piece = board.get_piece(next_square)
+            if piece is None or piece.player != self.player:
+                valid_moves.append(next_square)
+        return valid_moves
 
 
 class Pawn(Piece):
     """
     A class representing a chess pawn.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
         current_square = self.position(board)
-        valid_moves = []
-        is_on_edge = self.edge_check_row(current_square)
-        ranges = []
-        if not is_on_edge:
-            ranges = self.on_start_row(current_square)
-            valid_moves = self.kill_opponent(current_square, board)
-            logging.info(f"{self.player} has {valid_moves} as valid moves for attacking")
-        else:
-            logging.info(f"{self.player} is on edge at {current_square}")
-        for location in ranges:
-            next_square = Square.at(current_square.row + location, current_square.col)
-            if board.is_square_empty(next_square):
-                valid_moves.append(next_square)
-            else:
-                logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
-                return valid_moves
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        valid_moves = self.kill_opponent(current_square, board)
+        for next_square in PAWN_PUSHES[self.player][current_square.index]:
+            if not board.is_square_empty(next_square):
+                break
+            valid_moves.append(next_square)
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
 
-    def on_start_row(self, current_square):
-        if current_square.row == 1 and self.player == Player.WHITE:
-            direction = [1, 2]
-        elif current_square.row == 6 and self.player == Player.BLACK:
-            direction = [-1, -2]
-        else:
-            direction = [1] if self.player == Player.WHITE else [-1]
-        return direction
-
     def en_passant_attack(self, board, attack_square):
         if board.last_move_pawn is not None:
             colour_check = -1 if self.player == Player.WHITE else 1
@@ -119,19 +195,8 @@ class Pawn(Piece):
         return False
 
     def kill_opponent(self, current_square, board):
-        direction_row = 1 if self.player == Player.WHITE else -1
-        directions_col = []
-        if current_square.col == 0:
-            directions_col = [1]
-        if current_square.col == 7:
-            directions_col = [-1]
-        if not self.edge_check_col(current_square):
-            directions_col = [1, -1]
-        attack_squares = []
         valid_attack_squares = []
-        for direction_col in directions_col:
-            attack_squares.append(Square.at(current_square.row + direction_row, current_square.col + direction_col))
-        for attack_square in attack_squares:
+        for attack_square in PAWN_ATTACKS[self.player][current_square.index]:
             if board.is_square_attackable(attack_square, self.player):
                 valid_attack_squares.append(attack_square)
             elif self.en_passant_attack(board, attack_square):
@@ -143,17 +208,12 @@ class Knight(Piece):
     """
     A class representing a chess knight.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
-        valid_moves = self.move_single(board, 2, 1)
-        valid_moves += self.move_single(board, 2, -1)
-        valid_moves += self.move_single(board, -2, 1)
-        valid_moves += self.move_single(board, -2, -1)
-        valid_moves += self.move_single(board, 1, 2)
-        valid_moves += self.move_single(board, 1, -2)
-        valid_moves += self.move_single(board, -1, 2)
-        valid_moves += self.move_single(board, -1, -2)
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        current_square = self.position(board)
+        valid_moves = self.step(board, KNIGHT_TARGETS[current_square.index])
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
 
 
@@ -161,13 +221,11 @@ class Bishop(Piece):
     """
     A class representing a chess bishop.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
-        valid_moves = self.move_continuous(board, 1, 1)
-        valid_moves += self.move_continuous(board, -1, 1)
-        valid_moves += self.move_continuous(board, 1, -1)
-        valid_moves += self.move_continuous(board, -1, -1)
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        valid_moves = self.slide(board, self.position(board), BISHOP_DIRECTIONS)
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
 
 
@@ -175,13 +233,11 @@ class Rook(Piece):
     """
     A class representing a chess rook.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
-        valid_moves = self.move_continuous(board, 1, 0)
-        valid_moves += self.move_continuous(board, -1, 0)
-        valid_moves += self.move_continuous(board, 0, 1)
-        valid_moves += self.move_continuous(board, 0, -1)
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        valid_moves = self.slide(board, self.position(board), ROOK_DIRECTIONS)
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
 
 
@@ -189,17 +245,11 @@ class Queen(Piece):
     """
     A class representing a chess queen.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
-        valid_moves = self.move_continuous(board, 1, 0)
-        valid_moves += self.move_continuous(board, -1, 0)
-        valid_moves += self.move_continuous(board, 0, 1)
-        valid_moves += self.move_continuous(board, 0, -1)
-        valid_moves += self.move_continuous(board, 1, 1)
-        valid_moves += self.move_continuous(board, -1, 1)
-        valid_moves += self.move_continuous(board, 1, -1)
-        valid_moves += self.move_continuous(board, -1, -1)
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        valid_moves = self.slide(board, self.position(board), QUEEN_DIRECTIONS)
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
 
 
@@ -207,15 +257,14 @@ class King(Piece):
     """
     A class representing a chess king.
     """
+    __slots__ = ()
 
     def get_available_moves(self, board):
-        valid_moves = self.move_single(board, 1, 0)
-        valid_moves += self.move_single(board, -1, 0)
-        valid_moves += self.move_single(board, 0, 1)
-        valid_moves += self.move_single(board, 0, -1)
-        valid_moves += self.move_single(board, 1, 1)
-        valid_moves += self.move_single(board, 1, -1)
-        valid_moves += self.move_single(board, -1, 1)
-        valid_moves += self.move_single(board, -1, -1)
-        logging.info(f"{self.player} has {valid_moves} as valid moves for moving into")
+        current_square = self.position(board)
+        valid_moves = self.step(board, KING_TARGETS[current_square.index])
+        logging.debug("%s has %s as valid moves for moving into", self.player, valid_moves)
         return valid_moves
+
+
+# Every type of piece, in order of value. A piece's position in this tuple is used as its type code.
+PIECE_TYPES = (Pawn, Knight, Bishop, Rook, Queen, King)
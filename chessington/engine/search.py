@@ -0,0 +1,519 @@
+"""
+A negamax search with alpha-beta pruning and iterative deepening, used by the bots to look further
+ahead than the moves immediately available to them.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chessington.engine.board import Board
+from chessington.engine.data import BOARD_SIZE
+from chessington.engine.evaluation import PIECE_VALUES
+from chessington.engine.ordering import MoveOrdering
+from chessington.engine.pieces import Pawn, Queen, King
+from chessington.engine.stats import SearchStats
+from chessington.engine.transposition import Bound
+
+# The score for capturing the enemy king, which ends the game
+KING_CAPTURE_SCORE = 100000
+
+# Scores beyond this are king captures, which are stored in the transposition table relative to the
+# position rather than the root so that they stay correct wherever the position is reached
+KING_CAPTURE_THRESHOLD = KING_CAPTURE_SCORE - 1000
+
+# How many nodes to search between checks of the clock
+TIME_CHECK_INTERVAL = 256
+
+# The quiescence search skips a capture if even winning the captured piece outright, plus this margin,
+# would leave the position short of alpha. In the units of evaluation.PIECE_VALUES.
+DELTA_MARGIN = 20
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time limit has been used up.
+    """
+    pass
+
+
+def _ignore(*args):
+    """
+    Stands in for the statistics recorders of a search without statistics.
+    """
+    pass
+
+
+def generate_moves(board):
+    """
+    Get every (from_square, to_square) move available to the player whose turn it is.
+    """
+    moves = []
+    for from_square in board.get_piece_squares(board.current_player):
+        for to_square in board.get_piece(from_square).get_available_moves(board):
+            moves.append((from_square, to_square))
+    return moves
+
+
+def generate_captures(board):
+    """
+    Get the moves available to the player whose turn it is which capture a piece or promote a pawn.
+    """
+    moves = []
+    for from_square in board.get_piece_squares(board.current_player):
+        piece = board.get_piece(from_square)
+        is_pawn = isinstance(piece, Pawn)
+        for to_square in piece.get_available_moves(board):
+            # A pawn moving sideways is capturing, even if the square is empty (en passant)
+            if board.get_piece(to_square) is not None or is_pawn and (
+                    from_square.col != to_square.col or to_square.row in (0, BOARD_SIZE - 1)):
+                moves.append((from_square, to_square))
+    return moves
+
+
+def capture_gain(board, move):
+    """
+    The most material a capture or promotion can win: the value of the captured piece, plus the
+    difference between a queen and a pawn for a promotion.
+    """
+    from_square, to_square = move
+    victim = board.get_piece(to_square)
+    gain = 0 if victim is None else PIECE_VALUES[type(victim)]
+    if isinstance(board.get_piece(from_square), Pawn):
+        if victim is None and from_square.col != to_square.col:
+            gain = PIECE_VALUES[Pawn]
+        if to_square.row in (0, BOARD_SIZE - 1):
+            gain += PIECE_VALUES[Queen] - PIECE_VALUES[Pawn]
+    return gain
+
+
+class Search:
+    """
+    Searches for the best move on a board. Positions at the search horizon are scored by the evaluate
+    function, which must return a score from the point of view of the player whose turn it is.
+
+    Searches can share a TranspositionTable. Only searches with the same evaluate function read each
+    other's results, as the table salts the keys of each evaluate function differently.
+
+    If evaluate_batch is given, the positions one move from the search horizon are scored together by a
+    single call of evaluate_batch(positions, keys, player), where positions are Board.to_bytes encodings,
+    keys their Zobrist keys and player the player to move in all of them. It must return their scores
+    from that player's point of view. The few other positions the search scores, such as those with no
+    moves, are then scored by evaluate_batch too, one at a time, so that every score is on its scale.
+
+    With move_ordering, moves are searched in the order given by a MoveOrdering, which finds the same
+    scores with far fewer nodes. Otherwise they are searched in the order they are generated, apart from
+    the transposition table's best move.
+
+    With quiescence, positions at the search horizon are not scored as they stand but searched further,
+    through captures and promotions only, until they are quiet. At each of these nodes the player to move
+    may instead stand pat on the evaluate score. Captures which could not bring the score up to alpha
+    even by winning their piece for free are skipped (delta pruning), as are captures which lose
+    material in the exchange that follows, according to Board.see. This stops the search from misjudging
+    a position in the middle of an exchange. Horizon positions are then searched one by one, so
+    evaluate_batch is not used.
+
+    With stats, each search fills in a SearchStats, left in the stats attribute until the next search.
+    The search calls move generation, make/unmake and evaluation through attributes, which are bound
+    once to the plain functions or, with stats, to versions which time them, so that a search without
+    stats does no extra work at each node.
+    """
+
+    def __init__(self, evaluate, depth=1, time_limit=None, transposition_table=None, evaluate_batch=None,
+                 move_ordering=True, quiescence=False, stats=False):
+        self.evaluate = evaluate
+        self.ordering = MoveOrdering() if move_ordering else None
+        self.quiescence = quiescence
+        self.evaluate_batch = None if quiescence else evaluate_batch
+        self.depth = depth
+        self.time_limit = time_limit
+        self.transposition_table = transposition_table
+        self.table_salt = None if transposition_table is None else transposition_table.salt(evaluate)
+        self.nodes = 0
+        self.deadline = None
+        self.root_best = None
+        self.stats = None
+        self.evaluate_leaf = evaluate if self.evaluate_batch is None else self.evaluate_alone
+        self.generate_moves, self.generate_captures = generate_moves, generate_captures
+        self.make_move, self.unmake_move = Board.make_move, Board.unmake_move
+        self.record_branching = self.record_cutoff = _ignore
+        if stats:
+            self._collect_stats()
+
+    def _collect_stats(self):
+        """
+        Binds the phases of the search to versions which count and time them into a new SearchStats.
+        """
+        stats = self.stats = SearchStats()
+        self.record_branching, self.record_cutoff = stats.record_branching, stats.record_cutoff
+
+        def timed_generator(generator):
+            def generate(board):
+                start = time.perf_counter()
+                moves = generator(board)
+                stats.movegen_seconds += time.perf_counter() - start
+                return moves
+            return generate
+        self.generate_moves = timed_generator(generate_moves)
+        self.generate_captures = timed_generator(generate_captures)
+
+        def make_move(board, from_square, to_square):
+            start = time.perf_counter()
+            undo = board.make_move(from_square, to_square)
+            stats.make_unmake_seconds += time.perf_counter() - start
+            return undo
+
+        def unmake_move(board, undo):
+            start = time.perf_counter()
+            board.unmake_move(undo)
+            stats.make_unmake_seconds += time.perf_counter() - start
+        self.make_move, self.unmake_move = make_move, unmake_move
+
+        evaluate, evaluate_batch = self.evaluate, self.evaluate_batch
+        if evaluate_batch is None:
+            def evaluate_leaf(board):
+                start = time.perf_counter()
+                score = evaluate(board)
+                stats.evaluation_seconds += time.perf_counter() - start
+                stats.leaf_evaluations += 1
+                return score
+            self.evaluate_leaf = evaluate_leaf
+        else:
+            # evaluate_alone goes through evaluate_batch, so is counted with it
+            def evaluate_positions(positions, keys, player):
+                start = time.perf_counter()
+                scores = evaluate_batch(positions, keys, player)
+                stats.evaluation_seconds += time.perf_counter() - start
+                stats.leaf_evaluations += len(positions)
+                return scores
+            self.evaluate_batch = evaluate_positions
+
+    def evaluate_alone(self, board):
+        """
+        Scores a single position with evaluate_batch, from the point of view of the player to move.
+        """
+        return float(self.evaluate_batch([board.to_bytes()], [board.zobrist_key], board.current_player)[0])
+
+    def search(self, board):
+        """
+        Searches the board to increasing depths, up to the depth limit or until the time limit runs out,
+        and returns the best move found along with its score. Returns (None, None) if there are no moves.
+        """
+        self.reset_counts()
+        table = self.transposition_table
+        table_hits = 0 if table is None else table.hits
+        start = time.perf_counter()
+        # The deadline is on the monotonic clock, which is the same in every process, so that a
+        # ParallelSearch can hand it on to its workers
+        self.deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        moves = self.generate_moves(board)
+        best_move, best_score, completed_depth = None, None, 0
+        if moves and self.ordering is not None:
+            self.ordering.new_search()
+            moves = self.ordering.order(board, moves, 0)
+        for depth in range(1, self.depth + 1 if moves else 1):
+            try:
+                best_move, best_score = self.search_root(board, moves, depth)
+            except SearchTimeout:
+                # Fall back on the partial result if not even the first iteration finished
+                if best_move is None:
+                    best_move, best_score = self.root_best
+                break
+            completed_depth = depth
+            # Search the best move first in the next iteration, so that it prunes the most
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        stats = self.stats
+        if stats is not None:
+            stats.depth = completed_depth
+            stats.nodes = self.nodes
+            stats.seconds = time.perf_counter() - start
+            # The table counts its own hits, so the search does not have to
+            stats.table_hits = 0 if table is None else table.hits - table_hits
+        return best_move, best_score
+
+    def close(self):
+        """
+        Releases anything the search keeps between moves. Only a ParallelSearch has anything to release.
+        """
+        pass
+
+    def reset_counts(self):
+        """
+        Clears the node count and statistics, as at the start of a search. Bots call this when they
+        play a move without searching.
+        """
+        self.nodes = 0
+        if self.stats is not None:
+            self.stats.reset()
+
+    def search_root(self, board, moves, depth):
+        self.root_best = (moves[0], None)
+        best_move, alpha = None, -KING_CAPTURE_SCORE - 1
+        batch_scores = None
+        if depth == 1 and self.evaluate_batch is not None:
+            batch_scores = self.score_children(board, moves, 0)
+        for move_number, move in enumerate(moves):
+            if batch_scores is not None:
+                score = batch_scores[move_number]
+            else:
+                score = self.score_move(board, move, depth, alpha, KING_CAPTURE_SCORE + 1, 0)
+            if best_move is None or score > alpha:
+                best_move, alpha = move, score
+                self.root_best = (best_move, alpha)
+        self.record_branching(0, len(moves))
+        if self.transposition_table is not None:
+            self.transposition_table.store(board.zobrist_key ^ self.table_salt, depth, alpha, Bound.EXACT,
+                                           best_move)
+        return best_move, alpha
+
+    def score_children(self, board, moves, ply):
+        """
+        Scores the position after each move with one call to evaluate_batch, from the point of view of
+        the player making the moves.
+        """
+        scores = [None] * len(moves)
+        positions, keys, batch_indices = [], [], []
+        for move_number, (from_square, to_square) in enumerate(moves):
+            if isinstance(board.get_piece(to_square), King):
+                scores[move_number] = KING_CAPTURE_SCORE - ply
+                continue
+            undo = self.make_move(board, from_square, to_square)
+            positions.append(board.to_bytes())
+            keys.append(board.zobrist_key)
+            self.unmake_move(board, undo)
+            batch_indices.append(move_number)
+        if positions:
+            self.nodes += len(positions)
+            child_scores = self.evaluate_batch(positions, keys, board.current_player.opponent())
+            for move_number, score in zip(batch_indices, child_scores):
+                scores[move_number] = -float(score)
+        return scores
+
+    def score_move(self, board, move, depth, alpha, beta, ply):
+        """
+        Makes the move, searches the resulting position and takes the move back again. The score is
+        from the point of view of the player making the move.
+        """
+        from_square, to_square = move
+        if isinstance(board.get_piece(to_square), King):
+            return KING_CAPTURE_SCORE - ply
+        undo = self.make_move(board, from_square, to_square)
+        try:
+            return -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            self.unmake_move(board, undo)
+
+    def count_node(self):
+        """
+        Counts a node searched, and checks the clock every so often.
+        """
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % TIME_CHECK_INTERVAL == 0 \
+                and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        if depth == 0 and self.quiescence:
+            return self.quiesce(board, alpha, beta, ply)
+        self.count_node()
+
+        table = self.transposition_table
+        table_move = None
+        if table is not None:
+            key = board.zobrist_key ^ self.table_salt
+            entry = table.probe(key)
+            if entry is not None:
+                table_move = entry.best_move
+                if entry.depth >= depth:
+                    score = from_table_score(entry.score, ply)
+                    if entry.bound == Bound.EXACT \
+                            or (entry.bound == Bound.LOWER and score >= beta) \
+                            or (entry.bound == Bound.UPPER and score <= alpha):
+                        return score
+
+        if depth == 0:
+            score = self.evaluate_leaf(board)
+            if table is not None:
+                table.store(key, 0, score, Bound.EXACT, None)
+            return score
+        moves = self.generate_moves(board)
+        if not moves:
+            return self.evaluate_leaf(board)
+        if depth == 1 and self.evaluate_batch is not None:
+            self.record_branching(ply, len(moves))
+            return max(self.score_children(board, moves, ply))
+        if self.ordering is not None:
+            moves = self.ordering.order(board, moves, ply, table_move)
+        elif table_move is not None and table_move in moves:
+            # Try the best move from an earlier search of this position first
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        original_alpha = alpha
+        best_move, best_score = None, None
+        for searched, move in enumerate(moves, 1):
+            score = self.score_move(board, move, depth, alpha, beta, ply)
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+                if score > alpha:
+                    alpha = score
+                    if score >= beta:
+                        if self.ordering is not None:
+                            self.ordering.record_cutoff(board, move, ply, depth)
+                        self.record_cutoff()
+                        break
+        self.record_branching(ply, searched)
+
+        if table is not None:
+            if best_score >= beta:
+                bound = Bound.LOWER
+            elif best_score > original_alpha:
+                bound = Bound.EXACT
+            else:
+                bound = Bound.UPPER
+            table.store(key, depth, to_table_score(best_score, ply), bound, best_move)
+        return best_score
+
+    def quiesce(self, board, alpha, beta, ply):
+        """
+        Searches only the captures and promotions from a position, until none are worth making. The
+        score is from the point of view of the player to move.
+        """
+        self.count_node()
+        stand_pat = self.evaluate_leaf(board)
+        if stand_pat >= beta:
+            self.record_cutoff()
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        moves = self.generate_captures(board)
+        if self.ordering is not None:
+            moves = self.ordering.order(board, moves, ply)
+        best_score = stand_pat
+        for move in moves:
+            from_square, to_square = move
+            if isinstance(board.get_piece(to_square), King):
+                return KING_CAPTURE_SCORE - ply
+            if stand_pat + capture_gain(board, move) + DELTA_MARGIN <= alpha:
+                continue
+            if board.see(to_square, from_square) < 0:
+                continue
+            undo = self.make_move(board, from_square, to_square)
+            try:
+                score = -self.quiesce(board, -beta, -alpha, ply + 1)
+            finally:
+                self.unmake_move(board, undo)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if score >= beta:
+                        self.record_cutoff()
+                        break
+        return best_score
+
+
+def to_table_score(score, ply):
+    """
+    Converts a score to be relative to the position being stored, rather than to the root.
+    """
+    if score > KING_CAPTURE_THRESHOLD:
+        return score + ply
+    if score < -KING_CAPTURE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def from_table_score(score, ply):
+    """
+    Converts a score from the transposition table to be relative to the root of the search.
+    """
+    if score > KING_CAPTURE_THRESHOLD:
+        return score - ply
+    if score < -KING_CAPTURE_THRESHOLD:
+        return score + ply
+    return score
+
+
+# The bot used to search root moves in each worker process of a ParallelSearch
+_worker_bot = None
+
+
+def _start_worker(bot_factory):
+    global _worker_bot
+    _worker_bot = bot_factory()
+
+
+def _score_root_move(task):
+    """
+    Scores one root move in a worker process. Returns (score, nodes), with a score of None if the
+    deadline passed, which may be before the task was even started.
+    """
+    position, move, depth, deadline = task
+    if deadline is not None and time.monotonic() > deadline:
+        return None, 0
+    search = _worker_bot.search
+    search.nodes = 0
+    search.deadline = deadline
+    board = Board.from_bytes(position)
+    try:
+        score = search.score_move(board, move, depth, -KING_CAPTURE_SCORE - 1, KING_CAPTURE_SCORE + 1, 0)
+    except SearchTimeout:
+        score = None
+    return score, search.nodes
+
+
+class ParallelSearch(Search):
+    """
+    A search which scores each root move in a separate task on a pool of worker processes. Each task is
+    sent the board encoded with Board.to_bytes, and searched by a bot made in the worker by bot_factory,
+    which must be picklable (such as a functools.partial of a bot class).
+
+    Each root move is searched with a full window, so as long as the bot's evaluation depends only on
+    the position and it has no transposition table, this finds the same move as a serial search.
+
+    Every task is sent the search's deadline, so a task which waited in the queue does not get a fresh
+    time limit of its own, and tasks still running when the time runs out stop at the same moment. The
+    worker processes are kept between searches until close is called.
+
+    With stats, only the depth, node count and time are collected, as the rest of the search happens in
+    the workers.
+    """
+
+    def __init__(self, bot_factory, workers=None, depth=1, time_limit=None, stats=False):
+        super().__init__(None, depth=depth, time_limit=time_limit, stats=stats)
+        self.bot_factory = bot_factory
+        self.workers = workers
+        self.executor = None
+
+    def search_root(self, board, moves, depth):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_start_worker,
+                                                initargs=(self.bot_factory,))
+        self.root_best = (moves[0], None)
+        position = board.to_bytes()
+        futures = [self.executor.submit(_score_root_move, (position, move, depth, self.deadline))
+                   for move in moves]
+        best_move, best_score = None, None
+        try:
+            for move, future in zip(moves, futures):
+                score, nodes = future.result()
+                self.nodes += nodes
+                if score is None:
+                    raise SearchTimeout()
+                if best_move is None or score > best_score:
+                    best_move, best_score = move, score
+                    self.root_best = (best_move, best_score)
+        finally:
+            # Drop the tasks that have not started, so the next search does not queue behind them
+            for future in futures:
+                future.cancel()
+        return best_move, best_score
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,75 @@
+"""
+Statistics about a search, to show where a bot's thinking time goes. A Search made with stats=True
+fills in a SearchStats as it runs, which can be read after each move and written out as JSON lines.
+"""
+
+import json
+
+
+class SearchStats:
+    """
+    The counts and timings of one search. Times are wall-clock seconds, and the phase times are
+    cumulative over the whole search, so they add up to a little less than the total.
+
+    branching maps each ply from the root to [nodes, moves]: how many positions at that ply had their
+    moves searched, and how many moves were searched from them in all, cutoffs included.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.depth = 0
+        self.nodes = 0
+        self.leaf_evaluations = 0
+        self.table_hits = 0
+        self.cutoffs = 0
+        self.branching = {}
+        self.seconds = 0.0
+        self.movegen_seconds = 0.0
+        self.make_unmake_seconds = 0.0
+        self.evaluation_seconds = 0.0
+
+    def record_branching(self, ply, moves):
+        counts = self.branching.get(ply)
+        if counts is None:
+            self.branching[ply] = [1, moves]
+        else:
+            counts[0] += 1
+            counts[1] += moves
+
+    def record_cutoff(self):
+        self.cutoffs += 1
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def branching_factors(self):
+        """
+        The average number of moves searched from each position, by ply from the root.
+        """
+        return [moves / nodes for nodes, moves in (self.branching[ply] for ply in sorted(self.branching))]
+
+    def to_dict(self):
+        return {
+            'depth': self.depth,
+            'nodes': self.nodes,
+            'leaf_evaluations': self.leaf_evaluations,
+            'table_hits': self.table_hits,
+            'cutoffs': self.cutoffs,
+            'branching_factors': self.branching_factors,
+            'seconds': self.seconds,
+            'nodes_per_second': self.nodes_per_second,
+            'movegen_seconds': self.movegen_seconds,
+            'make_unmake_seconds': self.make_unmake_seconds,
+            'evaluation_seconds': self.evaluation_seconds,
+        }
+
+    def write_json_line(self, stream, **fields):
+        """
+        Writes the statistics to the stream as one line of JSON, along with any extra fields given, such
+        as the bot or move number they belong to.
+        """
+        stream.write(json.dumps({**fields, **self.to_dict()}) + '\n')
@@ -0,0 +1,489 @@
+"""
+Endgame tablebases: the result of perfect play from every position with a few pieces on the board,
+worked out in advance so that the bots can play those endings perfectly without searching.
+
+Tables follow this engine's rules. A game is won by capturing the enemy king, so a player who has only
+moves that walk into capture loses, and pawns always promote to queens.
+
+Each table covers one set of material, such as 'KQK' for a white king and queen against a black king.
+Positions with the colours the other way round are looked up by mirroring the board. A table is an
+array of one byte per position. The byte is 0 if the position is drawn (or cannot occur), and otherwise
+the number of moves (plies) until the king is captured with perfect play: odd if the player to move
+wins, even if they lose.
+
+Positions are indexed by the player to move and the squares of their pieces, in a way that keeps the
+tables small. Turning or reflecting the board does not change the result of a position, as there is no
+castling, so the board is first turned so that the white king is in the a1-d1-d4 triangle, leaving 10
+squares for it. Pawns only move one way, so with pawns on the board it is only reflected, leaving the
+white king the 32 squares of the a-d files. Each other piece is then numbered among the squares not
+taken by the pieces before it. KBNK takes 2 * 10 * 63 * 62 * 61 bytes, about 4.8 MB.
+
+Tables are solved by retrograde analysis. Positions won by capturing the king straight away are found
+first, and results are then passed back to the positions one move earlier, one distance at a time.
+Build tables with `poetry run tablebase KQK KRK KPK --directory tables`. Generating tables of four pieces,
+such as KBNK, takes a long time in Python.
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict, namedtuple
+
+from chessington.engine.board import BOARD_SIZE
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import (Pawn, Knight, Bishop, Rook, Queen, King, KNIGHT_TARGETS, KING_TARGETS,
+                                       RAYS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS)
+
+STANDARD_MATERIALS = ('KQK', 'KRK', 'KPK', 'KBNK')
+
+# The order pieces are listed in within a material set, which is also their order in the table index
+PIECE_ORDER = 'KQRBNP'
+LETTER_TYPES = {'K': King, 'Q': Queen, 'R': Rook, 'B': Bishop, 'N': Knight, 'P': Pawn}
+TYPE_LETTERS = {piece_type: letter for letter, piece_type in LETTER_TYPES.items()}
+
+MAX_DISTANCE = 255
+
+ProbeResult = namedtuple('ProbeResult', 'wins loses distance')
+
+
+# The move tables from pieces.py, with squares replaced by their indices
+_KNIGHT = tuple(tuple(square.index for square in targets) for targets in KNIGHT_TARGETS)
+_KING = tuple(tuple(square.index for square in targets) for targets in KING_TARGETS)
+_RAYS = {direction: tuple(tuple(square.index for square in ray) for ray in rays)
+         for direction, rays in RAYS.items()}
+_SLIDER_DIRECTIONS = {'Q': QUEEN_DIRECTIONS, 'R': ROOK_DIRECTIONS, 'B': BISHOP_DIRECTIONS}
+
+# The eight ways of turning and reflecting the board, each mapping square indices to their images. The
+# first is the identity and the second reflects the board left to right, which are all that pawns allow.
+_SYMMETRIES = tuple(
+    tuple(transform(square // BOARD_SIZE, square % BOARD_SIZE) for square in range(BOARD_SIZE * BOARD_SIZE))
+    for transform in (
+        lambda row, col: row * BOARD_SIZE + col,
+        lambda row, col: row * BOARD_SIZE + 7 - col,
+        lambda row, col: (7 - row) * BOARD_SIZE + col,
+        lambda row, col: (7 - row) * BOARD_SIZE + 7 - col,
+        lambda row, col: col * BOARD_SIZE + row,
+        lambda row, col: col * BOARD_SIZE + 7 - row,
+        lambda row, col: (7 - col) * BOARD_SIZE + row,
+        lambda row, col: (7 - col) * BOARD_SIZE + 7 - row,
+    ))
+_TRIANGLE = tuple(row * BOARD_SIZE + col for row in range(4) for col in range(row, 4))
+_LEFT_HALF = tuple(square for square in range(BOARD_SIZE * BOARD_SIZE) if square % BOARD_SIZE < 4)
+
+
+def split_material(material):
+    """
+    Splits a material set such as 'KBNK' into its white and black pieces, such as ('KBN', 'K').
+    """
+    black_king = material.index('K', 1)
+    return material[:black_king], material[black_king:]
+
+
+def material_name(white_letters, black_letters):
+    """
+    The name of the material set of the given pieces of each player, with the pieces put in order.
+    """
+    return ''.join(sorted(white_letters, key=PIECE_ORDER.index)) \
+        + ''.join(sorted(black_letters, key=PIECE_ORDER.index))
+
+
+class _Layout:
+    """
+    How the positions of a material set are numbered in its table index.
+    """
+
+    def __init__(self, material):
+        white, black = split_material(material)
+        if len(set(white)) != len(white) or len(set(black)) != len(black):
+            raise ValueError(f'Material sets with two pieces of the same type are not supported: {material}')
+        self.material = material
+        self.pieces = tuple((letter, Player.WHITE) for letter in white) \
+            + tuple((letter, Player.BLACK) for letter in black)
+        self.count = len(self.pieces)
+        if 'P' in material:
+            symmetries, self.king_squares = _SYMMETRIES[:2], _LEFT_HALF
+        else:
+            symmetries, self.king_squares = _SYMMETRIES, _TRIANGLE
+        self.king_numbers = {square: number for number, square in enumerate(self.king_squares)}
+        # The symmetries that take the white king from each square to one of king_squares: just one,
+        # except on a diagonal, where the reflection along it does as well
+        self.king_symmetries = tuple(
+            tuple(symmetry for symmetry in symmetries if symmetry[square] in self.king_numbers)
+            for square in range(BOARD_SIZE * BOARD_SIZE))
+        # The squares left where they are by each symmetry other than the identity, where there are any
+        self.fixed_squares = [fixed for fixed in (
+            {square for square in range(BOARD_SIZE * BOARD_SIZE) if symmetry[square] == square}
+            for symmetry in symmetries[1:]) if fixed]
+        self.size = 2 * len(self.king_squares)
+        for number in range(1, self.count):
+            self.size *= BOARD_SIZE * BOARD_SIZE - number
+
+    def index(self, squares, player):
+        """
+        The index of the position. Positions that are turns or reflections of each other share an index.
+        """
+        symmetries = self.king_symmetries[squares[0]]
+        if len(symmetries) == 1:
+            return self._number([symmetries[0][square] for square in squares], player)
+        return min(self._number([symmetry[square] for square in squares], player) for symmetry in symmetries)
+
+    def _number(self, squares, player):
+        index = (0 if player == Player.WHITE else 1) * len(self.king_squares) + self.king_numbers[squares[0]]
+        for number in range(1, self.count):
+            square = squares[number]
+            # Numbered among the squares not taken by the pieces before it
+            square_number = square
+            for other in squares[:number]:
+                if other < square:
+                    square_number -= 1
+            index = index * (BOARD_SIZE * BOARD_SIZE - number) + square_number
+        return index
+
+    def position(self, index):
+        """
+        The squares of the pieces and the player to move at the index, the reverse of index for the
+        positions it returns.
+        """
+        numbers = []
+        for number in range(self.count - 1, 0, -1):
+            index, square_number = divmod(index, BOARD_SIZE * BOARD_SIZE - number)
+            numbers.append(square_number)
+        index, king_number = divmod(index, len(self.king_squares))
+        squares = [self.king_squares[king_number]]
+        for square in reversed(numbers):
+            for other in sorted(squares):
+                if other <= square:
+                    square += 1
+            squares.append(square)
+        return squares, Player.WHITE if index == 0 else Player.BLACK
+
+    def is_valid(self, squares):
+        return all(letter != 'P' or 0 < square // BOARD_SIZE < BOARD_SIZE - 1
+                   for (letter, _), square in zip(self.pieces, squares))
+
+    def has_symmetric_moves(self, squares):
+        """
+        Whether two different moves from the position might lead to positions that are turns or
+        reflections of each other. That needs a symmetry which leaves all but two of the pieces where they
+        are, so it can only happen when most of the pieces are on a diagonal.
+        """
+        return any(sum(1 for square in squares if square in fixed) >= self.count - 2
+                   for fixed in self.fixed_squares)
+
+
+def _piece_targets(letter, player, square, occupant):
+    """
+    Yields the squares the piece can move to, following the same rules as Piece.get_available_moves.
+    occupant maps occupied squares to the player whose piece is there.
+    """
+    if letter == 'K' or letter == 'N':
+        for target in (_KING if letter == 'K' else _KNIGHT)[square]:
+            if occupant.get(target) != player:
+                yield target
+    elif letter == 'P':
+        direction = BOARD_SIZE if player == Player.WHITE else -BOARD_SIZE
+        start_row = 1 if player == Player.WHITE else BOARD_SIZE - 2
+        col = square % BOARD_SIZE
+        for attack_col in (col + 1, col - 1):
+            if 0 <= attack_col < BOARD_SIZE:
+                target = square + direction - col + attack_col
+                if occupant.get(target, player) != player:
+                    yield target
+        target = square + direction
+        if target not in occupant:
+            yield target
+            if square // BOARD_SIZE == start_row and target + direction not in occupant:
+                yield target + direction
+    else:
+        for direction in _SLIDER_DIRECTIONS[letter]:
+            for target in _RAYS[direction][square]:
+                owner = occupant.get(target)
+                if owner != player:
+                    yield target
+                if owner is not None:
+                    break
+
+
+def _piece_origins(letter, player, square, occupant):
+    """
+    Yields the squares the piece could have moved to this square from without capturing or promoting.
+    """
+    if letter == 'K' or letter == 'N':
+        for origin in (_KING if letter == 'K' else _KNIGHT)[square]:
+            if origin not in occupant:
+                yield origin
+    elif letter == 'P':
+        direction = BOARD_SIZE if player == Player.WHITE else -BOARD_SIZE
+        start_row = 1 if player == Player.WHITE else BOARD_SIZE - 2
+        origin = square - direction
+        if origin in occupant or not 0 < origin // BOARD_SIZE < BOARD_SIZE - 1:
+            return
+        yield origin
+        if origin // BOARD_SIZE == start_row + (1 if player == Player.WHITE else -1) \
+                and origin - direction not in occupant:
+            yield origin - direction
+    else:
+        for direction in _SLIDER_DIRECTIONS[letter]:
+            for origin in _RAYS[direction][square]:
+                if origin in occupant:
+                    break
+                yield origin
+
+
+class TablebaseGenerator:
+    """
+    Solves the tables for material sets, along with the smaller tables they lead to by captures and
+    promotions. Solved tables are kept in memory, keyed by material.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.layouts = {}
+
+    def _layout(self, material):
+        if material not in self.layouts:
+            self.layouts[material] = _Layout(material)
+        return self.layouts[material]
+
+    def solve(self, material):
+        """
+        Returns the table of the given material, solving it first if need be.
+        """
+        if material not in self.tables:
+            self.tables[material] = self._solve(self._layout(material))
+        return self.tables[material]
+
+    def save(self, directory):
+        """
+        Writes every solved table to the directory, one file per material set.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for material, table in self.tables.items():
+            with open(os.path.join(directory, f'{material}.tb'), 'wb') as table_file:
+                table_file.write(table)
+
+    def _solve(self, layout):
+        table = bytearray(layout.size)
+        remaining = bytearray(layout.size)
+        longest_loss = bytearray(layout.size)
+        pending = defaultdict(list)
+
+        for index in range(layout.size):
+            squares, player = layout.position(index)
+            # Positions turned or reflected from another in the table are left out, as they have no index
+            if not layout.is_valid(squares) or layout.index(squares, player) != index:
+                continue
+            unresolved, wins_in, loses_in = self._classify_moves(layout, squares, player)
+            if wins_in is not None:
+                pending[wins_in].append(index)
+            remaining[index] = unresolved
+            longest_loss[index] = loses_in
+            if unresolved == 0 and loses_in:
+                # Every move leads to a lost position in a smaller table
+                pending[loses_in].append(index)
+
+        distance = 1
+        while distance <= max(pending, default=0):
+            for index in pending.pop(distance, ()):
+                if table[index]:
+                    continue
+                if distance > MAX_DISTANCE:
+                    raise ValueError(f'{layout.material} has wins longer than {MAX_DISTANCE} moves')
+                table[index] = distance
+                for previous in set(self._previous_positions(layout, index)):
+                    if table[previous]:
+                        continue
+                    if distance % 2 == 0:
+                        pending[distance + 1].append(previous)
+                        continue
+                    remaining[previous] -= 1
+                    longest_loss[previous] = max(longest_loss[previous], distance + 1)
+                    if remaining[previous] == 0:
+                        pending[longest_loss[previous]].append(previous)
+            distance += 1
+        return table
+
+    def _classify_moves(self, layout, squares, player):
+        """
+        Looks at each move from a position. Returns how many positions in the table the moves lead to,
+        which are yet to be resolved as losses, how soon the player to move wins through a capture or
+        promotion if they can (1 if they can capture the king), and how long the longest loss through a
+        capture or promotion is.
+        """
+        occupant = {square: piece_player for square, (_, piece_player) in zip(squares, layout.pieces)}
+        piece_at = {square: number for number, square in enumerate(squares)}
+        # Positions are resolved once each, however many moves lead to them, so moves that lead to the
+        # same index are counted once
+        children = set() if layout.has_symmetric_moves(squares) else None
+        moves = 0
+        wins_in, loses_in = None, 0
+        draws = False
+        for number, (letter, piece_player) in enumerate(layout.pieces):
+            if piece_player != player:
+                continue
+            for target in _piece_targets(letter, player, squares[number], occupant):
+                captured = piece_at.get(target)
+                promotes = letter == 'P' and target // BOARD_SIZE in (0, BOARD_SIZE - 1)
+                if captured is None and not promotes:
+                    if children is None:
+                        moves += 1
+                    else:
+                        child_squares = list(squares)
+                        child_squares[number] = target
+                        children.add(layout.index(child_squares, player.opponent()))
+                    continue
+                if captured is not None and layout.pieces[captured][0] == 'K':
+                    # Other positions won in one move may be resolved first and count moves from this
+                    # one as losing, so the count must stay above zero whatever happens
+                    return MAX_DISTANCE, 1, 0
+                result = self._smaller_table_result(layout, squares, number, target, captured)
+                if result % 2 == 0 and result:
+                    wins_in = result + 1 if wins_in is None else min(wins_in, result + 1)
+                elif result:
+                    loses_in = max(loses_in, result + 1)
+                else:
+                    draws = True
+        if children is not None:
+            moves = len(children)
+        # A move that wins or draws means the position cannot be lost, so it is counted as a move which is
+        # never resolved as a loss
+        return moves + (draws or wins_in is not None), wins_in, loses_in
+
+    def _smaller_table_result(self, layout, squares, number, target, captured):
+        """
+        The table entry, for the opponent to move, of the position after a capture or promotion.
+        """
+        pieces = []
+        for other, ((letter, player), square) in enumerate(zip(layout.pieces, squares)):
+            if other == captured:
+                continue
+            if other == number:
+                letter = 'Q' if letter == 'P' and target // BOARD_SIZE in (0, BOARD_SIZE - 1) else letter
+                square = target
+            pieces.append((letter, player, square))
+        material = material_name([letter for letter, player, _ in pieces if player == Player.WHITE],
+                                 [letter for letter, player, _ in pieces if player == Player.BLACK])
+        child_layout = self._layout(material)
+        child_squares = [square for _, _, square in sorted(
+            pieces, key=lambda piece: (piece[1] != Player.WHITE, PIECE_ORDER.index(piece[0])))]
+        mover = layout.pieces[number][1]
+        return self.solve(material)[child_layout.index(child_squares, mover.opponent())]
+
+    def _previous_positions(self, layout, index):
+        """
+        Yields the positions in the table from which a move leads to this one. A position may be
+        yielded more than once.
+        """
+        squares, player = layout.position(index)
+        mover = player.opponent()
+        occupant = {square: piece_player for square, (_, piece_player) in zip(squares, layout.pieces)}
+        for number, (letter, piece_player) in enumerate(layout.pieces):
+            if piece_player != mover:
+                continue
+            previous_squares = list(squares)
+            for origin in _piece_origins(letter, mover, squares[number], occupant):
+                previous_squares[number] = origin
+                yield layout.index(previous_squares, mover)
+
+
+class Tablebase:
+    """
+    Looks up positions in tables saved by TablebaseGenerator.save.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        self.layouts = {}
+        self.max_pieces = max((len(name[:-3]) for name in os.listdir(directory) if name.endswith('.tb')),
+                              default=0)
+
+    def _table(self, material):
+        if material not in self.tables:
+            path = os.path.join(self.directory, f'{material}.tb')
+            if os.path.exists(path):
+                with open(path, 'rb') as table_file:
+                    self.tables[material] = table_file.read()
+                self.layouts[material] = _Layout(material)
+            else:
+                self.tables[material] = None
+        return self.tables[material]
+
+    def probe(self, board):
+        """
+        Looks up the board, returning None if its material is not covered. The result is from the point
+        of view of the player to move.
+        """
+        if len(board.piece_squares[Player.WHITE]) + len(board.piece_squares[Player.BLACK]) > self.max_pieces:
+            return None
+        pieces = {player: sorted(((TYPE_LETTERS[type(piece)], square)
+                                  for piece, square in board.piece_squares[player].items()),
+                                 key=lambda piece: PIECE_ORDER.index(piece[0]))
+                  for player in (Player.WHITE, Player.BLACK)}
+        white = ''.join(letter for letter, _ in pieces[Player.WHITE])
+        black = ''.join(letter for letter, _ in pieces[Player.BLACK])
+        if not white.startswith('K') or not black.startswith('K'):
+            return None
+        player = board.current_player
+        material = white + black
+        table = self._table(material)
+        if table is not None:
+            squares = [square.index for _, square in pieces[Player.WHITE] + pieces[Player.BLACK]]
+        else:
+            # Swap the colours, mirroring the board so that pawns still move the right way
+            material = black + white
+            table = self._table(material)
+            if table is None:
+                return None
+            squares = [Square.at(BOARD_SIZE - 1 - square.row, square.col).index
+                       for _, square in pieces[Player.BLACK] + pieces[Player.WHITE]]
+            player = player.opponent()
+        distance = table[self.layouts[material].index(squares, player)]
+        return ProbeResult(wins=distance % 2 == 1, loses=distance > 0 and distance % 2 == 0, distance=distance)
+
+    def best_move(self, board):
+        """
+        Finds the move with the best result for the player to move: the quickest win, a draw, or else
+        the slowest loss. Returns None if the board or any position after a move is not covered.
+        """
+        if self.probe(board) is None:
+            return None
+        best_move, best_rank = None, None
+        for from_square in board.get_piece_squares(board.current_player):
+            for to_square in board.get_piece(from_square).get_available_moves(board):
+                if isinstance(board.get_piece(to_square), King):
+                    return from_square, to_square
+                undo = board.make_move(from_square, to_square)
+                result = self.probe(board)
+                board.unmake_move(undo)
+                if result is None:
+                    return None
+                # The result is for the opponent, so their loss is our win
+                if result.loses:
+                    rank = (2, -result.distance)
+                elif result.wins:
+                    rank = (0, result.distance)
+                else:
+                    rank = (1, 0)
+                if best_rank is None or rank > best_rank:
+                    best_move, best_rank = (from_square, to_square), rank
+        return best_move
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate endgame tablebases.')
+    parser.add_argument('materials', nargs='*', default=STANDARD_MATERIALS,
+                        help='material sets to solve, such as KQK (default: %(default)s)')
+    parser.add_argument('--directory', default='tables', help='directory to write the tables to')
+    args = parser.parse_args(argv)
+
+    generator = TablebaseGenerator()
+    for material in args.materials:
+        table = generator.solve(material)
+        print(f"{material}: {sum(1 for value in table if value % 2 == 1)} won positions")
+    generator.save(args.directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
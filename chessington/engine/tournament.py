@@ -0,0 +1,165 @@
+"""
+A headless tournament runner, which plays bots against each other without the GUI, spreading the games
+across a pool of processes.
+
+A game ends when a king is captured, when the player to move has no moves, or when the move limit is
+reached; the last two are scored as draws.
+
+Run it from the command line with `poetry run tournament NuChessBotStronk ChessBotRandom --games 20`.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from chessington.engine import chess_bot
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.pieces import King
+from chessington.engine.search import generate_moves
+
+GameResult = namedtuple('GameResult', 'winner reason moves move_seconds move_counts nodes')
+TournamentResult = namedtuple('TournamentResult', 'games wins draws losses average_move_seconds nodes')
+
+KING_CAPTURED = 'king captured'
+NO_MOVES = 'no moves'
+MOVE_LIMIT = 'move limit'
+
+
+def play_game(white_bot_type, black_bot_type, max_moves=200, seed=None, white_options=None, black_options=None):
+    """
+    Plays one game between two ChessBot subclasses. Timings and node counts in the result are keyed by
+    player.
+    """
+    random.seed(seed)
+    board = Board.at_starting_position()
+    bots = {
+        Player.WHITE: white_bot_type(Player.WHITE, Player.BLACK, **(white_options or {})),
+        Player.BLACK: black_bot_type(Player.BLACK, Player.WHITE, **(black_options or {})),
+    }
+    move_seconds = {Player.WHITE: 0.0, Player.BLACK: 0.0}
+    move_counts = {Player.WHITE: 0, Player.BLACK: 0}
+    nodes = {Player.WHITE: 0, Player.BLACK: 0}
+
+    try:
+        for move_number in range(max_moves):
+            player = board.current_player
+            if not generate_moves(board):
+                return GameResult(None, NO_MOVES, move_number, move_seconds, move_counts, nodes)
+
+            bot = bots[player]
+            start = time.perf_counter()
+            move = bot.get_move(board)
+            move_seconds[player] += time.perf_counter() - start
+            move_counts[player] += 1
+            search = getattr(bot, 'search', None)
+            if search is not None:
+                nodes[player] += search.nodes
+            if move is None:
+                return GameResult(None, NO_MOVES, move_number, move_seconds, move_counts, nodes)
+
+            from_square, to_square = move
+            captured_piece = board.get_piece(to_square)
+            board.move_piece(from_square, to_square)
+            if isinstance(captured_piece, King):
+                return GameResult(player, KING_CAPTURED, move_number + 1, move_seconds, move_counts, nodes)
+
+        return GameResult(None, MOVE_LIMIT, max_moves, move_seconds, move_counts, nodes)
+    finally:
+        for bot in bots.values():
+            bot.close()
+
+
+def _play_numbered_game(arguments):
+    game_number, bot_a, bot_b, max_moves, seed, bot_a_options, bot_b_options = arguments
+    game_seed = None if seed is None else seed + game_number
+    # Swap colours every game, so that neither bot always has the first move
+    if game_number % 2 == 0:
+        return play_game(bot_a, bot_b, max_moves, game_seed, bot_a_options, bot_b_options), Player.WHITE
+    return play_game(bot_b, bot_a, max_moves, game_seed, bot_b_options, bot_a_options), Player.BLACK
+
+
+def run_tournament(bot_a, bot_b, games, max_moves=200, seed=None, workers=None, bot_a_options=None,
+                   bot_b_options=None):
+    """
+    Plays a number of games between two ChessBot subclasses, alternating colours, and returns the totals
+    from bot_a's point of view. The latencies and node counts are (bot_a, bot_b) pairs.
+
+    With workers=1 the games are played in this process; otherwise they are shared across a process pool.
+    """
+    arguments = [(game_number, bot_a, bot_b, max_moves, seed, bot_a_options, bot_b_options)
+                 for game_number in range(games)]
+    if workers == 1:
+        results = list(map(_play_numbered_game, arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_play_numbered_game, arguments))
+    return summarise(results)
+
+
+def summarise(results):
+    """
+    Totals up a list of (GameResult, bot_a_player) pairs.
+    """
+    wins = draws = losses = 0
+    seconds, counts, nodes = [0.0, 0.0], [0, 0], [0, 0]
+    for result, bot_a_player in results:
+        if result.winner is None:
+            draws += 1
+        elif result.winner == bot_a_player:
+            wins += 1
+        else:
+            losses += 1
+        for bot_index, player in enumerate((bot_a_player, bot_a_player.opponent())):
+            seconds[bot_index] += result.move_seconds[player]
+            counts[bot_index] += result.move_counts[player]
+            nodes[bot_index] += result.nodes[player]
+    average_move_seconds = tuple(total / count if count else 0.0 for total, count in zip(seconds, counts))
+    return TournamentResult(len(results), wins, draws, losses, average_move_seconds, tuple(nodes))
+
+
+def _bot_type(name):
+    bot_type = getattr(chess_bot, name, None)
+    if not isinstance(bot_type, type) or not issubclass(bot_type, chess_bot.ChessBot):
+        raise argparse.ArgumentTypeError(f'{name} is not a bot in chessington.engine.chess_bot')
+    return bot_type
+
+
+def _bot_options(depth, opening_book):
+    options = {}
+    if depth is not None:
+        options['depth'] = depth
+    if opening_book is not None:
+        options['opening_book'] = opening_book
+    return options or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play bots against each other without the GUI.')
+    parser.add_argument('bot_a', type=_bot_type, help='name of a bot class, such as NuChessBotStronk')
+    parser.add_argument('bot_b', type=_bot_type, help='name of the opposing bot class')
+    parser.add_argument('--games', type=int, default=10, help='number of games to play')
+    parser.add_argument('--max-moves', type=int, default=200, help='moves before a game is drawn')
+    parser.add_argument('--seed', type=int, help='seed for random choices, so that runs can be repeated')
+    parser.add_argument('--workers', type=int, help='number of processes to use (default: one per CPU)')
+    parser.add_argument('--depth-a', type=int, help='search depth for bot_a, if it searches')
+    parser.add_argument('--depth-b', type=int, help='search depth for bot_b, if it searches')
+    parser.add_argument('--book-a', help='opening book file for bot_a, if it searches')
+    parser.add_argument('--book-b', help='opening book file for bot_b, if it searches')
+    args = parser.parse_args(argv)
+
+    result = run_tournament(args.bot_a, args.bot_b, args.games, args.max_moves, args.seed, args.workers,
+                            _bot_options(args.depth_a, args.book_a), _bot_options(args.depth_b, args.book_b))
+    print(f"{args.bot_a.__name__} vs {args.bot_b.__name__}: "
+          f"+{result.wins} ={result.draws} -{result.losses} in {result.games} games")
+    for name, seconds, nodes in zip((args.bot_a.__name__, args.bot_b.__name__),
+                                    result.average_move_seconds, result.nodes):
+        print(f"{name}: {seconds * 1000:.1f} ms per move, {nodes} nodes searched")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
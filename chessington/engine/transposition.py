@@ -0,0 +1,104 @@
+"""
+A transposition table, which remembers the results of searching positions so that a position reached
+again by a different order of moves does not have to be searched again.
+"""
+
+import random
+from collections import namedtuple
+from enum import Enum, auto
+
+
+class Bound(Enum):
+    """
+    How a stored score relates to the true score of the position.
+    """
+    EXACT = auto()
+    LOWER = auto()
+    UPPER = auto()
+
+
+TableEntry = namedtuple('TableEntry', 'key depth score bound best_move')
+
+# Rough number of bytes used by one stored entry, including the Python objects it refers to
+ENTRY_SIZE = 200
+
+# Each bucket has one slot which keeps the deepest result, and one which always takes the newest
+BUCKET_SLOTS = 2
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of search results, indexed by the Zobrist key of a position.
+
+    Each bucket holds two entries. The depth-preferred slot is only overwritten by a search at least as
+    deep (or of the same position), so expensive results survive; anything else goes in the
+    always-replace slot, so recent results are still kept.
+
+    Searches which score positions differently can share a table without reading each other's results:
+    each XORs the salt of its evaluate function into its keys, so their entries never match.
+    """
+
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+        self.bucket_count = max(1, size_mb * 1024 * 1024 // (BUCKET_SLOTS * ENTRY_SIZE))
+        self.salts = {}
+        self.salt_random = random.Random(0)
+        self.clear()
+
+    def salt(self, evaluator):
+        """
+        The number to XOR into the keys of positions scored by the given evaluator, which is the same
+        each time it is asked for and different for every other evaluator.
+        """
+        if evaluator not in self.salts:
+            self.salts[evaluator] = self.salt_random.getrandbits(64)
+        return self.salts[evaluator]
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        self.depth_preferred = [None] * self.bucket_count
+        self.always_replace = [None] * self.bucket_count
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        """
+        Returns the entry stored for the position with the given key, or None.
+        """
+        bucket = key % self.bucket_count
+        entry = self.depth_preferred[bucket]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        other_entry = self.always_replace[bucket]
+        if other_entry is not None and other_entry.key == key:
+            self.hits += 1
+            return other_entry
+        self.misses += 1
+        if entry is not None or other_entry is not None:
+            # The bucket is in use, but by other positions
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Records the result of searching the position with the given key to the given depth.
+        """
+        bucket = key % self.bucket_count
+        new_entry = TableEntry(key, depth, score, bound, best_move)
+        entry = self.depth_preferred[bucket]
+        if entry is None or entry.key == key or depth >= entry.depth:
+            self.depth_preferred[bucket] = new_entry
+        else:
+            self.always_replace[bucket] = new_entry
+
+    def usage(self):
+        """
+        The fraction of slots in the table which hold an entry.
+        """
+        used = sum(entry is not None for entry in self.depth_preferred)
+        used += sum(entry is not None for entry in self.always_replace)
+        return used / (BUCKET_SLOTS * self.bucket_count)
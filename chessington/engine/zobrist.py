@@ -0,0 +1,64 @@
+"""
+Random keys for Zobrist hashing, which identifies a position by a single 64-bit integer. The key of a
+position is the XOR of a key for each piece on each square, plus keys for the side to move and the
+en passant state, so it can be updated with a couple of XORs whenever the board changes.
+"""
+
+import random
+
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+BOARD_SQUARES = 64
+
+# The keys are drawn from a fixed seed so that they are the same in every process, and in any files
+# which store position keys.
+_key_source = random.Random(0x2C3A5F1B)
+
+
+def _random_keys(count):
+    return tuple(_key_source.getrandbits(64) for _ in range(count))
+
+
+PIECE_KEYS = {
+    (piece_type, player): _random_keys(BOARD_SQUARES)
+    for player in (Player.WHITE, Player.BLACK)
+    for piece_type in (Pawn, Knight, Bishop, Rook, Queen, King)
+}
+BLACK_TO_MOVE_KEY = _random_keys(1)[0]
+EN_PASSANT_KEYS = _random_keys(BOARD_SQUARES)
+
+
+def piece_key(piece, square):
+    """
+    The key for the given piece standing on the given square.
+    """
+    return PIECE_KEYS[(type(piece), piece.player)][square.index]
+
+
+def en_passant_key(last_move_pawn):
+    """
+    The key for the en passant state, given the square of a pawn that has just moved two squares.
+    """
+    if last_move_pawn is None:
+        return 0
+    return EN_PASSANT_KEYS[last_move_pawn.index]
+
+
+def side_key(player):
+    """
+    The key for the given player being the one to move.
+    """
+    return BLACK_TO_MOVE_KEY if player == Player.BLACK else 0
+
+
+def hash_board(board):
+    """
+    Calculates the key of a board from scratch. The board maintains its own key incrementally, so this
+    is only needed to check that it has done so correctly.
+    """
+    key = side_key(board.current_player) ^ en_passant_key(board.last_move_pawn)
+    for player in (Player.WHITE, Player.BLACK):
+        for square in board.get_piece_squares(player):
+            key ^= piece_key(board.get_piece(square), square)
+    return key
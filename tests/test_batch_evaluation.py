@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from chessington.engine.batch_evaluation import (encode_board, evaluate_positions, mobility, codes_from_bytes,
+                                                 MOBILITY_WEIGHT)
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.evaluation import score_board
+from chessington.engine.pieces import Pawn
+from chessington.engine.search import Search, generate_moves
+
+
+def random_positions(count, seed):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = Board.at_starting_position()
+        for _ in range(rng.randrange(40)):
+            moves = generate_moves(board)
+            if not moves:
+                break
+            board.move_piece(*rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+def piece_mobility(board):
+    score = 0
+    for player in (Player.WHITE, Player.BLACK):
+        sign = 1 if player == Player.WHITE else -1
+        for square in board.get_piece_squares(player):
+            piece = board.get_piece(square)
+            if not isinstance(piece, Pawn):
+                score += sign * len(piece.get_available_moves(board))
+    return score
+
+
+def scalar_evaluation(board):
+    score = score_board(board, Player.WHITE) + MOBILITY_WEIGHT * piece_mobility(board)
+    return score if board.current_player == Player.WHITE else -score
+
+
+def batch_evaluation(positions, keys, player):
+    scores = evaluate_positions(codes_from_bytes(positions))
+    return scores if player == Player.WHITE else -scores
+
+
+class TestBatchEvaluation:
+
+    @staticmethod
+    def test_scores_match_material_and_mobility_counted_one_board_at_a_time():
+
+        # Arrange
+        boards = random_positions(20, seed=8)
+        codes = np.array([encode_board(board) for board in boards], dtype=np.int8)
+
+        # Act
+        scores = evaluate_positions(codes)
+
+        # Assert
+        assert list(mobility(codes)) == [piece_mobility(board) for board in boards]
+        assert list(scores) == [score_board(board, Player.WHITE) + MOBILITY_WEIGHT * piece_mobility(board)
+                                for board in boards]
+
+    @staticmethod
+    def test_planes_and_bytes_give_the_same_scores_as_piece_codes():
+
+        # Arrange
+        boards = random_positions(5, seed=2)
+        codes = np.array([encode_board(board) for board in boards], dtype=np.int8)
+        planes = np.zeros((len(boards), 12, 64), dtype=np.int8)
+        for plane, code in enumerate(list(range(1, 7)) + list(range(-1, -7, -1))):
+            planes[:, plane] = codes == code
+
+        # Act
+        from_planes = evaluate_positions(planes)
+        from_bytes = evaluate_positions(codes_from_bytes([board.to_bytes() for board in boards]))
+
+        # Assert
+        assert list(from_planes) == list(evaluate_positions(codes))
+        assert list(from_bytes) == list(evaluate_positions(codes))
+
+    @staticmethod
+    def test_starting_position_scores_level():
+
+        # Act
+        scores = evaluate_positions([encode_board(Board.at_starting_position())])
+
+        # Assert
+        assert list(scores) == [0]
+
+
+class TestBatchSearch:
+
+    @staticmethod
+    def test_batch_and_scalar_search_pick_the_same_move():
+
+        # Arrange
+        boards = random_positions(4, seed=5)
+        # Black's pieces are all blocked in, so the search meets positions with no moves
+        boards.append(Board.from_fen('kb6/ppp5/ppp5/ppp5/ppp4Q/ppp5/ppp5/ppp4K w - - 0 1'))
+
+        # Act
+        scalar_results = [Search(scalar_evaluation, depth=2).search(board) for board in boards]
+        # The evaluate function is on another scale, and should not be used for any position
+        batch_results = [Search(lambda board: 1000 * scalar_evaluation(board), depth=2,
+                                evaluate_batch=batch_evaluation).search(board) for board in boards]
+
+        # Assert
+        assert batch_results == scalar_results
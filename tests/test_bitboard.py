@@ -0,0 +1,161 @@
+import random
+
+from chessington.engine.bitboard import BitBoard
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Queen, Rook
+
+
+def all_piece_moves(board):
+    moves = set()
+    for row in range(8):
+        for col in range(8):
+            piece = board.get_piece(Square.at(row, col))
+            if piece is not None and piece.player == board.current_player:
+                for to_square in piece.get_available_moves(board):
+                    moves.add((Square.at(row, col).index, to_square.index))
+    return moves
+
+
+class TestBitBoard:
+
+    @staticmethod
+    def test_starting_position_has_twenty_moves():
+
+        # Arrange
+        board = BitBoard.at_starting_position()
+
+        # Act
+        moves = board.pseudo_legal_moves()
+
+        # Assert
+        assert len(moves) == 20
+
+    @staticmethod
+    def test_set_piece_keeps_bitboards_in_step():
+
+        # Arrange
+        board = BitBoard.empty()
+        rook = Rook(Player.WHITE)
+
+        # Act
+        board.set_piece(Square.at(3, 3), rook)
+        board.set_piece(Square.at(3, 3), Pawn(Player.BLACK))
+
+        # Assert
+        assert board.pieces_of(Player.WHITE, Rook) == 0
+        assert board.pieces_of(Player.BLACK, Pawn) == 1 << 27
+        assert board.occupied == [0, 1 << 27]
+
+    @staticmethod
+    def test_sliding_moves_stop_at_blockers():
+
+        # Arrange
+        board = BitBoard.empty()
+        queen = Queen(Player.WHITE)
+        board.set_piece(Square.at(3, 3), queen)
+        board.set_piece(Square.at(5, 3), Pawn(Player.BLACK))
+        board.set_piece(Square.at(3, 1), Pawn(Player.WHITE))
+
+        # Act
+        moves = board.get_available_moves(Square.at(3, 3))
+
+        # Assert
+        assert sorted(moves) == sorted(queen.get_available_moves(board))
+        assert Square.at(5, 3) in moves
+        assert Square.at(6, 3) not in moves
+        assert Square.at(3, 1) not in moves
+
+    @staticmethod
+    def test_en_passant_capture_is_generated_and_applied():
+
+        # Arrange
+        board = BitBoard.empty()
+        board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+        board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+        board.current_player = Player.BLACK
+        board.move_piece(Square.at(6, 3), Square.at(4, 3))
+
+        # Act
+        moves = board.get_available_moves(Square.at(4, 4))
+        board.move_piece(Square.at(4, 4), Square.at(5, 3))
+
+        # Assert
+        assert Square.at(5, 3) in moves
+        assert board.pieces_of(Player.BLACK, Pawn) == 0
+        assert board.pieces_of(Player.WHITE, Pawn) == 1 << Square.at(5, 3).index
+
+    @staticmethod
+    def test_promotion_updates_bitboards():
+
+        # Arrange
+        board = BitBoard.empty()
+        board.set_piece(Square.at(6, 0), Pawn(Player.WHITE))
+
+        # Act
+        board.move_piece(Square.at(6, 0), Square.at(7, 0))
+
+        # Assert
+        assert board.pieces_of(Player.WHITE, Pawn) == 0
+        assert board.pieces_of(Player.WHITE, Queen) == 1 << 56
+
+    @staticmethod
+    def test_move_generation_matches_pieces_during_random_games():
+
+        # Arrange
+        rng = random.Random(1234)
+
+        for _ in range(10):
+            board = BitBoard.at_starting_position()
+            for _ in range(60):
+
+                # Act
+                moves = board.pseudo_legal_moves()
+
+                # Assert
+                assert set(moves) == all_piece_moves(board)
+                assert len(moves) == len(set(moves))
+
+                if not moves:
+                    break
+                from_index, to_index = rng.choice(moves)
+                board.move_piece(Square.from_index(from_index), Square.from_index(to_index))
+
+    @staticmethod
+    def test_make_and_unmake_restore_bitboards_during_random_games():
+
+        # Arrange
+        rng = random.Random(99)
+        board = BitBoard.at_starting_position()
+        undos = []
+
+        # Act
+        for _ in range(80):
+            moves = board.pseudo_legal_moves()
+            if not moves:
+                break
+            from_index, to_index = rng.choice(moves)
+            bitboards = list(board.bitboards)
+            undos.append((bitboards, board.make_move(Square.from_index(from_index), Square.from_index(to_index))))
+
+        # Assert
+        for bitboards, undo in reversed(undos):
+            board.unmake_move(undo)
+            assert board.bitboards == bitboards
+        assert board.bitboards == BitBoard.at_starting_position().bitboards
+
+
+class TestBitBoardCopy:
+
+    @staticmethod
+    def test_copies_keep_their_own_bitboards():
+
+        # Arrange
+        board = BitBoard.at_starting_position()
+
+        # Act
+        copy = board.copy()
+        copy.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+        # Assert
+        assert board.occupied != copy.occupied
+        assert sorted(board.pseudo_legal_moves()) != sorted(copy.pseudo_legal_moves())
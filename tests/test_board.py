@@ -1,5 +1,13 @@
-from chessington.engine.board import Board
+import random
+
+import pytest
+
+from chessington.engine.board import Board, ENCODED_SIZE, STARTING_FEN
 from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Rook, Queen
+from chessington.engine.evaluation import score_board, square_score
+from chessington.engine.search import generate_moves
+from chessington.engine.zobrist import hash_board
 
 def test_new_board_has_white_pieces_at_bottom():
 
@@ -35,4 +43,503 @@ def test_pieces_can_be_moved_on_the_board():
     board.move_piece(from_square, to_square)
 
     assert board.get_piece(from_square) is None
-    assert board.get_piece(to_square) is piece
\ No newline at end of file
+    assert board.get_piece(to_square) is piece
+
+def test_moved_piece_can_be_found_at_its_new_square():
+
+    # Arrange
+    board = Board.at_starting_position()
+    from_square = Square.at(0, 1)
+    piece = board.get_piece(from_square)
+
+    # Act
+    to_square = Square.at(2, 2)
+    board.move_piece(from_square, to_square)
+
+    # Assert
+    assert board.find_piece(piece) == to_square
+    assert from_square not in board.get_piece_squares(Player.WHITE)
+    assert to_square in board.get_piece_squares(Player.WHITE)
+
+def test_captured_piece_is_removed_from_the_piece_index():
+
+    # Arrange
+    board = Board.empty()
+    rook = Rook(Player.WHITE)
+    victim = Pawn(Player.BLACK)
+    board.set_piece(Square.at(0, 0), rook)
+    board.set_piece(Square.at(5, 0), victim)
+
+    # Act
+    board.move_piece(Square.at(0, 0), Square.at(5, 0))
+
+    # Assert
+    assert board.get_piece_squares(Player.BLACK) == []
+    with pytest.raises(Exception):
+        board.find_piece(victim)
+
+def test_en_passant_and_promotion_keep_the_piece_index_up_to_date():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+    board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+    board.set_piece(Square.at(6, 0), Pawn(Player.WHITE))
+    board.current_player = Player.BLACK
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+
+    # Act
+    board.move_piece(Square.at(4, 4), Square.at(5, 3))
+    board.current_player = Player.WHITE
+    board.move_piece(Square.at(6, 0), Square.at(7, 0))
+
+    # Assert
+    assert board.get_piece_squares(Player.BLACK) == []
+    assert sorted(board.get_piece_squares(Player.WHITE)) == [Square.at(5, 3), Square.at(7, 0)]
+    assert isinstance(board.get_piece(Square.at(7, 0)), Queen)
+    assert board.find_piece(board.get_piece(Square.at(7, 0))) == Square.at(7, 0)
+
+def test_starting_position_lists_sixteen_pieces_for_each_player():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_squares = board.get_piece_squares(Player.WHITE)
+    black_squares = board.get_piece_squares(Player.BLACK)
+
+    # Assert
+    assert len(white_squares) == 16
+    assert len(black_squares) == 16
+    assert all(square.row in (0, 1) for square in white_squares)
+
+def snapshot(board):
+    grid = [[board.get_piece(Square.at(row, col)) for col in range(8)] for row in range(8)]
+    index = {player: dict(squares) for player, squares in board.piece_squares.items()}
+    return grid, index, board.current_player, board.last_move_pawn
+
+def test_unmake_move_restores_a_capture():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+    board.set_piece(Square.at(5, 0), Pawn(Player.BLACK))
+    before = snapshot(board)
+
+    # Act
+    undo = board.make_move(Square.at(0, 0), Square.at(5, 0))
+    board.unmake_move(undo)
+
+    # Assert
+    assert snapshot(board) == before
+
+def test_unmake_move_restores_a_promotion():
+
+    # Arrange
+    board = Board.empty()
+    pawn = Pawn(Player.WHITE)
+    board.set_piece(Square.at(6, 4), pawn)
+    before = snapshot(board)
+
+    # Act
+    undo = board.make_move(Square.at(6, 4), Square.at(7, 4))
+    promoted = board.get_piece(Square.at(7, 4))
+    board.unmake_move(undo)
+
+    # Assert
+    assert isinstance(promoted, Queen)
+    assert board.get_piece(Square.at(6, 4)) is pawn
+    assert snapshot(board) == before
+
+def test_unmake_move_restores_an_en_passant_capture():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+    board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+    board.current_player = Player.BLACK
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+    before = snapshot(board)
+
+    # Act
+    undo = board.make_move(Square.at(4, 4), Square.at(5, 3))
+    captured = board.get_piece(Square.at(4, 3))
+    board.unmake_move(undo)
+
+    # Assert
+    assert captured is None
+    assert snapshot(board) == before
+    assert board.last_move_pawn == Square.at(4, 3)
+    assert board.current_player == Player.WHITE
+
+def test_zobrist_key_matches_a_fresh_calculation_during_a_game():
+
+    # Arrange
+    rng = random.Random(5)
+    board = Board.at_starting_position()
+
+    for _ in range(60):
+        # Act
+        moves = generate_moves(board)
+        if not moves:
+            break
+        board.move_piece(*rng.choice(moves))
+
+        # Assert
+        assert board.zobrist_key == hash_board(board)
+
+def test_zobrist_key_is_the_same_for_transposed_move_orders():
+
+    # Arrange
+    first = Board.at_starting_position()
+    second = Board.at_starting_position()
+
+    # Act
+    for board, moves in ((first, [(0, 1, 2, 2), (7, 1, 5, 2), (0, 6, 2, 5)]),
+                         (second, [(0, 6, 2, 5), (7, 1, 5, 2), (0, 1, 2, 2)])):
+        for from_row, from_col, to_row, to_col in moves:
+            board.move_piece(Square.at(from_row, from_col), Square.at(to_row, to_col))
+
+    # Assert
+    assert first.zobrist_key == second.zobrist_key
+
+def test_zobrist_key_covers_side_to_move_and_en_passant_state():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(1, 4), Pawn(Player.WHITE))
+    key = board.zobrist_key
+
+    # Act
+    board.current_player = Player.BLACK
+    black_to_move_key = board.zobrist_key
+    board.current_player = Player.WHITE
+    board.last_move_pawn = Square.at(1, 4)
+
+    # Assert
+    assert black_to_move_key != key
+    assert board.zobrist_key != key
+    board.last_move_pawn = None
+    assert board.zobrist_key == key
+
+def test_unmake_move_restores_the_zobrist_key():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(4, 4), Pawn(Player.WHITE))
+    board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+    board.current_player = Player.BLACK
+    board.move_piece(Square.at(6, 3), Square.at(4, 3))
+    key = board.zobrist_key
+
+    # Act
+    undo = board.make_move(Square.at(4, 4), Square.at(5, 3))
+    board.unmake_move(undo)
+
+    # Assert
+    assert board.zobrist_key == key
+
+def test_starting_position_is_evaluated_as_level():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_score = board.static_evaluation(Player.WHITE)
+    black_score = board.static_evaluation(Player.BLACK)
+
+    # Assert
+    assert white_score == 0
+    assert black_score == 0
+
+def test_static_evaluation_is_kept_up_to_date_by_make_and_unmake():
+
+    # Arrange
+    rng = random.Random(11)
+    board = Board.at_starting_position()
+    undos = []
+
+    for _ in range(60):
+        # Act
+        moves = generate_moves(board)
+        if not moves:
+            break
+        undos.append(board.make_move(*rng.choice(moves)))
+
+        # Assert
+        assert board.static_evaluation(Player.WHITE) == score_board(board, Player.WHITE)
+
+    for undo in reversed(undos):
+        board.unmake_move(undo)
+    assert board.static_evaluation(Player.WHITE) == 0
+
+def test_capturing_a_piece_gains_its_value():
+
+    # Arrange
+    board = Board.empty()
+    queen = Queen(Player.BLACK)
+    board.set_piece(Square.at(3, 1), Rook(Player.WHITE))
+    board.set_piece(Square.at(3, 5), queen)
+    before = board.static_evaluation(Player.WHITE)
+
+    # Act
+    board.move_piece(Square.at(3, 1), Square.at(3, 5))
+
+    # Assert
+    assert board.static_evaluation(Player.WHITE) - before == square_score(queen, Square.at(3, 5))
+
+def test_board_survives_a_round_trip_through_bytes():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    data = board.to_bytes()
+    copy = Board.from_bytes(data)
+
+    # Assert
+    assert len(data) == 34
+    assert copy.zobrist_key == board.zobrist_key
+    assert copy.current_player == Player.BLACK
+    assert copy.last_move_pawn == Square.at(3, 4)
+    assert copy.to_bytes() == data
+
+def test_boards_can_be_decoded_in_place_from_a_buffer_of_positions():
+
+    # Arrange
+    first = Board.at_starting_position()
+    second = Board.at_starting_position()
+    second.move_piece(Square.at(1, 3), Square.at(3, 3))
+    buffer = memoryview(first.to_bytes() + second.to_bytes())
+
+    # Act
+    decoded = Board.from_bytes(buffer, ENCODED_SIZE)
+
+    # Assert
+    assert decoded.zobrist_key == second.zobrist_key
+
+def test_starting_position_is_written_as_fen():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    fen = board.to_fen()
+
+    # Assert
+    assert fen == STARTING_FEN
+
+def test_fen_gives_the_en_passant_target_behind_the_pawn():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    fen = board.to_fen()
+
+    # Assert
+    assert fen == 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - e3 0 1'
+
+def test_board_survives_a_round_trip_through_fen():
+
+    # Arrange
+    fen = 'r3k2r/p1ppqpb1/bn2pnp1/2pPN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - c6 0 1'
+
+    # Act
+    board = Board.from_fen(fen)
+
+    # Assert
+    assert board.last_move_pawn == Square.at(4, 2)
+    assert board.zobrist_key == hash_board(board)
+    assert board.to_fen() == fen
+
+def legal_perft(board, depth):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in list(board.legal_moves()):
+        undo = board.make_move(*move)
+        nodes += legal_perft(board, depth - 1)
+        board.unmake_move(undo)
+    return nodes
+
+def test_legal_move_counts_match_the_standard_perft_results():
+
+    # Arrange
+    board = Board.from_fen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1')
+
+    # Act
+    counts = [legal_perft(board, depth) for depth in (1, 2, 3)]
+
+    # Assert
+    assert counts == [14, 191, 2812]
+
+def test_pinned_pieces_can_only_move_along_the_pin():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/4r3/8/8/4R3/3N4/4K3 w - - 0 1')
+
+    # Act
+    moves = set(board.legal_moves())
+
+    # Assert
+    rook_moves = {to_square for from_square, to_square in moves if from_square == Square.from_name('e3')}
+    assert rook_moves == {Square.from_name(name) for name in ('e2', 'e4', 'e5', 'e6')}
+
+def test_a_check_must_be_answered():
+
+    # Arrange
+    board = Board.from_fen('3k4/8/8/8/4r3/8/8/R3K3 w - - 0 1')
+
+    # Act
+    moves = set(board.legal_moves())
+
+    # Assert
+    assert (Square.from_name('a1'), Square.from_name('a2')) not in moves
+    assert (Square.from_name('e1'), Square.from_name('e2')) not in moves
+    assert (Square.from_name('e1'), Square.from_name('d2')) in moves
+
+def test_the_king_cannot_step_along_the_line_of_a_check():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/8/r3K3 w - - 0 1')
+
+    # Act
+    moves = set(board.legal_moves())
+
+    # Assert
+    assert (Square.from_name('e1'), Square.from_name('f1')) not in moves
+    assert (Square.from_name('e1'), Square.from_name('e2')) in moves
+
+def test_en_passant_cannot_expose_the_king():
+
+    # Arrange
+    board = Board.from_fen('8/8/8/KPp4r/8/8/8/7k w - c6 0 1')
+
+    # Act
+    moves = set(board.legal_moves())
+
+    # Assert
+    assert (Square.from_name('b5'), Square.from_name('c6')) not in moves
+
+def test_copied_boards_are_independent():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    copy = board.copy()
+    copy.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Assert
+    assert board.get_piece(Square.at(3, 4)) is None
+    assert board.current_player == Player.WHITE
+    assert board.zobrist_key == hash_board(board)
+    assert copy.zobrist_key == hash_board(copy)
+    assert copy.find_piece(copy.get_piece(Square.at(3, 4))) == Square.at(3, 4)
+
+def test_copied_boards_share_their_pieces():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    copy = board.copy()
+
+    # Assert
+    assert copy.get_piece(Square.at(0, 4)) is board.get_piece(Square.at(0, 4))
+    assert not hasattr(board.get_piece(Square.at(0, 4)), '__dict__')
+
+def test_static_exchange_of_an_undefended_piece_wins_it():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/3p4/8/8/8/3RK3 w - - 0 1')
+
+    # Act
+    result = board.see(Square.from_name('d5'), Square.from_name('d1'))
+
+    # Assert
+    assert result == 10
+
+def test_static_exchange_recaptures_with_the_least_valuable_piece():
+
+    # Arrange
+    board = Board.from_fen('3qk3/8/4p3/3p4/8/4N3/8/4K3 w - - 0 1')
+    fen = board.to_fen()
+
+    # Act
+    result = board.see(Square.from_name('d5'), Square.from_name('e3'))
+
+    # Assert
+    assert result == 10 - 30
+    assert board.to_fen() == fen
+
+def test_static_exchange_counts_pieces_behind_a_sliding_piece():
+
+    # Arrange
+    board = Board.from_fen('3r3k/8/8/3p4/3R4/8/8/3R3K w - - 0 1')
+
+    # Act
+    result = board.see(Square.from_name('d5'), Square.from_name('d4'))
+
+    # Assert
+    assert result == 10
+
+def test_static_exchange_lets_a_side_stop_capturing():
+
+    # Arrange
+    board = Board.from_fen('3q3k/8/8/3p4/3R4/8/8/3R3K w - - 0 1')
+
+    # Act
+    result = board.see(Square.from_name('d5'), Square.from_name('d4'))
+
+    # Assert
+    assert result == 10
+
+def test_is_attacked_follows_piece_geometry():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/3p4/8/1N6/R3K3 w - - 0 1')
+
+    # Act
+    attacked = {name: board.is_attacked(Square.from_name(name), Player.WHITE)
+                for name in ('a8', 'd3', 'c4', 'b3', 'e4')}
+    defended = board.is_attacked(Square.from_name('e3'), Player.BLACK)
+
+    # Assert
+    assert attacked == {'a8': True, 'd3': True, 'c4': True, 'b3': False, 'e4': False}
+    assert defended
+
+def test_attack_counts_count_every_attacker_and_stop_at_blockers():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/P7/R3K3 w - - 0 1')
+
+    # Act
+    counts = board.attack_counts(Player.WHITE)
+
+    # Assert
+    assert counts[Square.from_name('b1').index] == 1
+    assert counts[Square.from_name('a2').index] == 1
+    assert counts[Square.from_name('a3').index] == 0
+    assert counts[Square.from_name('b3').index] == 1
+    assert counts[Square.from_name('d2').index] == 1
+    assert counts[Square.from_name('d1').index] == 2
+
+def test_attack_counts_are_recalculated_after_a_move():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+    copy = board.copy()
+    before = board.attack_counts(Player.WHITE)
+
+    # Act
+    board.move_piece(Square.from_name('a1'), Square.from_name('a5'))
+
+    # Assert
+    assert before[Square.from_name('b1').index] == 1
+    assert board.attack_counts(Player.WHITE)[Square.from_name('b1').index] == 0
+    assert not board.is_attacked(Square.from_name('b1'), Player.WHITE)
+    assert copy.is_attacked(Square.from_name('b1'), Player.WHITE)
@@ -0,0 +1,122 @@
+from chessington.engine.board import Board
+from chessington.engine.book import OpeningBook, build_book
+from chessington.engine.chess_bot import ChessBotStronk, NuChessBotStronk
+from chessington.engine.data import Player, Square
+
+GAMES = [
+    ['e4', 'e5', 'Nf3'],
+    ['e4', 'c5'],
+    ['e4', 'e5', 'Nc3'],
+    ['d4', 'd5'],
+]
+
+
+class TestOpeningBook:
+
+    @staticmethod
+    def test_moves_are_weighted_by_how_often_they_were_played(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book(GAMES, path)
+
+        # Act
+        with OpeningBook(path) as book:
+            moves = book.moves(Board.at_starting_position().zobrist_key)
+
+        # Assert
+        assert {(move.from_square.name(), move.to_square.name(), move.weight) for move in moves} == \
+            {('e2', 'e4', 3), ('d2', 'd4', 1)}
+
+    @staticmethod
+    def test_positions_not_in_the_book_have_no_moves(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book(GAMES, path)
+        board = Board.at_starting_position()
+        board.move_piece(Square.from_name('a2'), Square.from_name('a3'))
+
+        # Act
+        with OpeningBook(path) as book:
+            move = book.choose(board, 0.5)
+
+        # Assert
+        assert move is None
+
+    @staticmethod
+    def test_moves_are_chosen_in_proportion_to_their_weight(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book(GAMES, path)
+        board = Board.at_starting_position()
+
+        # Act
+        with OpeningBook(path) as book:
+            choices = {book.choose(board, fraction / 8) for fraction in range(8)}
+
+        # Assert
+        assert choices == {(Square.from_name('d2'), Square.from_name('d4')),
+                           (Square.from_name('e2'), Square.from_name('e4'))}
+
+    @staticmethod
+    def test_games_only_count_up_to_the_ply_limit(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+
+        # Act
+        entries = build_book(GAMES, path, max_ply=1)
+
+        # Assert
+        assert entries == 2
+
+    @staticmethod
+    def test_an_empty_book_can_be_opened(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book([], path)
+
+        # Act
+        with OpeningBook(path) as book:
+            moves = book.moves(Board.at_starting_position().zobrist_key)
+
+        # Assert
+        assert moves == []
+
+
+class TestBotsWithOpeningBooks:
+
+    @staticmethod
+    def test_bots_play_book_moves(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book([['e4', 'c5', 'Nf3']], path)
+        board = Board.at_starting_position()
+        board.move_piece(Square.from_name('e2'), Square.from_name('e4'))
+
+        # Act
+        move = ChessBotStronk(Player.BLACK, Player.WHITE, opening_book=str(path)).get_move(board)
+
+        # Assert
+        assert move == (Square.from_name('c7'), Square.from_name('c5'))
+
+    @staticmethod
+    def test_bots_search_once_out_of_the_book(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        build_book([['d4']], path)
+        board = Board.at_starting_position()
+        board.move_piece(Square.from_name('e2'), Square.from_name('e4'))
+        bot = NuChessBotStronk(Player.BLACK, Player.WHITE, seed=1, opening_book=str(path))
+
+        # Act
+        move = bot.get_move(board)
+
+        # Assert
+        assert move is not None
+        assert bot.search.nodes > 0
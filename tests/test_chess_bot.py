@@ -0,0 +1,227 @@
+import random
+import time
+from functools import partial
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.chess_bot import ChessBotRandom, ChessBotDefense, ChessBotStronk, NuChessBotStronk
+from chessington.engine.data import Player, Square
+from chessington.engine.evaluation import EvaluationConfig
+from chessington.engine.pieces import Pawn, Rook, Queen, King
+from chessington.engine.search import generate_moves, _start_worker, _score_root_move
+
+
+def board_with_defended_pawn():
+    board = Board.empty()
+    board.set_piece(Square.at(0, 0), King(Player.WHITE))
+    board.set_piece(Square.at(7, 5), King(Player.BLACK))
+    board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+    board.set_piece(Square.at(5, 3), Pawn(Player.BLACK))
+    board.set_piece(Square.at(6, 4), Pawn(Player.BLACK))
+    return board
+
+
+def board_with_hanging_rook():
+    board = Board.empty()
+    board.set_piece(Square.at(0, 0), King(Player.WHITE))
+    board.set_piece(Square.at(7, 6), King(Player.BLACK))
+    board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+    board.set_piece(Square.at(3, 1), Rook(Player.BLACK))
+    return board
+
+
+class TestChessBotStronk:
+
+    @staticmethod
+    def test_bot_takes_a_hanging_rook():
+
+        # Arrange
+        board = board_with_hanging_rook()
+
+        # Act
+        move = NuChessBotStronk(Player.WHITE, Player.BLACK, depth=2).get_move(board)
+
+        # Assert
+        assert move == (Square.at(3, 3), Square.at(3, 1))
+
+    @staticmethod
+    def test_deeper_bot_does_not_take_a_defended_pawn_with_its_queen():
+
+        # Arrange
+        board = board_with_defended_pawn()
+
+        # Act
+        move = NuChessBotStronk(Player.WHITE, Player.BLACK, depth=2).get_move(board)
+
+        # Assert
+        assert move[1] != Square.at(5, 3)
+
+    @staticmethod
+    def test_bot_with_quiescence_does_not_take_a_defended_pawn_at_depth_one():
+
+        # Arrange
+        board = board_with_defended_pawn()
+
+        # Act
+        move = NuChessBotStronk(Player.WHITE, Player.BLACK, depth=1, quiescence=True).get_move(board)
+
+        # Assert
+        assert move[1] != Square.at(5, 3)
+
+    @staticmethod
+    def test_bots_with_the_same_evaluation_seed_score_positions_alike():
+
+        # Arrange
+        board = board_with_defended_pawn()
+        first = ChessBotStronk(Player.WHITE, Player.BLACK, evaluation=EvaluationConfig(seed=3))
+        second = ChessBotStronk(Player.WHITE, Player.BLACK, evaluation=EvaluationConfig(seed=3))
+
+        # Act
+        first_scores = [first.evaluate(board) for _ in range(3)]
+        second_scores = [second.evaluate(board) for _ in range(3)]
+
+        # Assert
+        assert first_scores == second_scores
+
+    @staticmethod
+    def test_bot_statistics_can_be_read_after_each_move():
+
+        # Arrange
+        board = board_with_defended_pawn()
+        bot = NuChessBotStronk(Player.WHITE, Player.BLACK, depth=2, stats=True)
+
+        # Act
+        bot.get_move(board)
+
+        # Assert
+        assert bot.search.stats.depth == 2
+        assert bot.search.stats.nodes == bot.search.nodes > 0
+        assert bot.search.stats.evaluation_seconds > 0
+
+    @staticmethod
+    def test_bot_does_not_change_the_board():
+
+        # Arrange
+        board = board_with_defended_pawn()
+
+        # Act
+        move = ChessBotStronk(Player.WHITE, Player.BLACK, depth=2).get_move(board)
+
+        # Assert
+        assert board.get_piece(move[0]).player == Player.WHITE
+        assert board.current_player == Player.WHITE
+
+    @staticmethod
+    def test_bot_with_incremental_evaluation_takes_a_hanging_rook():
+
+        # Arrange
+        board = board_with_hanging_rook()
+
+        # Act
+        move = ChessBotStronk(Player.WHITE, Player.BLACK, depth=2, incremental_evaluation=True).get_move(board)
+
+        # Assert
+        assert move == (Square.at(3, 3), Square.at(3, 1))
+
+    @staticmethod
+    def test_bot_with_batch_evaluation_takes_a_hanging_rook():
+
+        # Arrange
+        pytest.importorskip('numpy')
+        board = board_with_hanging_rook()
+        bot = NuChessBotStronk(Player.WHITE, Player.BLACK, depth=2, batch_evaluation=True, seed=1)
+
+        # Act
+        move = bot.get_move(board)
+
+        # Assert
+        assert move == (Square.at(3, 3), Square.at(3, 1))
+
+
+class TestParallelNuChessBotStronk:
+
+    @staticmethod
+    def test_parallel_search_finds_the_same_move_as_serial_search():
+
+        # Arrange
+        rng = random.Random(4)
+        board = Board.at_starting_position()
+        for _ in range(10):
+            board.move_piece(*rng.choice(generate_moves(board)))
+        serial_bot = NuChessBotStronk(board.current_player, board.current_player.opponent(), depth=2, seed=7)
+        parallel_bot = NuChessBotStronk(board.current_player, board.current_player.opponent(), depth=2, seed=7,
+                                        workers=2)
+
+        # Act
+        serial_move = serial_bot.get_move(board)
+        try:
+            parallel_move = parallel_bot.get_move(board)
+        finally:
+            parallel_bot.close()
+
+        # Assert
+        assert parallel_move == serial_move
+        assert parallel_bot.search.nodes > 0
+        assert parallel_bot.search.executor is None
+
+    @staticmethod
+    def test_workers_do_not_start_tasks_whose_deadline_has_passed():
+
+        # Arrange
+        board = Board.at_starting_position()
+        _start_worker(partial(NuChessBotStronk, Player.WHITE, Player.BLACK, depth=3))
+        task = (board.to_bytes(), generate_moves(board)[0], 3, time.monotonic() - 1)
+
+        # Act
+        score, nodes = _score_root_move(task)
+
+        # Assert
+        assert score is None
+        assert nodes == 0
+
+
+class TestChessBotRandom:
+
+    @staticmethod
+    def test_bot_only_plays_legal_moves():
+
+        # Arrange
+        board = Board.from_fen('3k4/8/8/8/4r3/8/8/R3K3 w - - 0 1')
+        bot = ChessBotRandom(Player.WHITE, Player.BLACK)
+
+        # Act
+        moves = {bot.get_move(board) for _ in range(50)}
+
+        # Assert
+        assert moves <= set(board.legal_moves())
+
+    @staticmethod
+    def test_bot_still_moves_when_every_move_is_illegal():
+
+        # Arrange
+        board = Board.from_fen('k7/8/1Q6/8/8/8/8/7K b - - 0 1')
+        bot = ChessBotRandom(Player.BLACK, Player.WHITE)
+
+        # Act
+        move = bot.get_move(board)
+
+        # Assert
+        assert list(board.legal_moves()) == []
+        assert move in generate_moves(board)
+
+
+class TestChessBotDefense:
+
+    @staticmethod
+    def test_bot_moves_to_a_safe_square_when_there_is_one():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/1r2K2R w - - 0 1')
+        bot = ChessBotDefense(Player.WHITE, Player.BLACK)
+
+        # Act
+        moves = {bot.get_move(board) for _ in range(50)}
+
+        # Assert
+        assert all(to_square.row != 0 for _, to_square in moves)
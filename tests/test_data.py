@@ -0,0 +1,42 @@
+from chessington.engine.data import Square, SQUARES
+
+
+class TestSquare:
+
+    @staticmethod
+    def test_squares_on_the_board_are_shared():
+
+        # Act
+        square = Square.at(3, 4)
+
+        # Assert
+        assert square is Square.at(3, 4)
+        assert square is Square.from_name('e4')
+        assert square is Square.from_index(28)
+
+    @staticmethod
+    def test_squares_know_their_index():
+
+        # Assert
+        assert [square.index for square in SQUARES] == list(range(64))
+        assert Square.at(7, 0).index == 56
+
+    @staticmethod
+    def test_squares_off_the_board_can_still_be_made():
+
+        # Act
+        square = Square.at(8, -1)
+
+        # Assert
+        assert square == (8, -1)
+
+    @staticmethod
+    def test_squares_made_through_the_namedtuple_api_know_their_index():
+
+        # Act
+        made = Square._make((1, 2))
+        replaced = Square.at(1, 2)._replace(col=3)
+
+        # Assert
+        assert made.index == 10
+        assert replaced.index == 11
@@ -0,0 +1,98 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.evaluation import EvaluationConfig, PIECE_VALUES, score_board
+from chessington.engine.pieces import Pawn, Queen
+
+
+class TestEvaluationConfig:
+
+    @staticmethod
+    def test_default_tables_score_boards_as_the_board_does():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/2n5/3p4/4P3/8/8/Q3K3 w - - 0 1')
+
+        # Act
+        score = EvaluationConfig().score_board(board, Player.WHITE)
+
+        # Assert
+        assert score == score_board(board, Player.WHITE) == board.static_evaluation(Player.WHITE)
+
+    @staticmethod
+    def test_tables_are_built_from_the_given_piece_values():
+
+        # Arrange
+        piece_values = dict(PIECE_VALUES)
+        piece_values[Queen] = 100
+        board = Board.empty()
+        board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+
+        # Act
+        config = EvaluationConfig(piece_values)
+
+        # Assert
+        assert config.piece_values[Queen] == 100
+        assert config.score_board(board, Player.WHITE) == score_board(board, Player.WHITE) + 10
+
+    @staticmethod
+    def test_static_scores_use_the_configured_piece_values():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/3Q4/8/8/4K3 w - - 0 1')
+        piece_values = dict(PIECE_VALUES)
+        piece_values[Queen] = 100
+
+        # Act
+        default_score = EvaluationConfig().static_score(board, Player.WHITE)
+        custom_score = EvaluationConfig(piece_values).static_score(board, Player.WHITE)
+
+        # Assert
+        assert default_score == board.static_evaluation(Player.WHITE)
+        assert custom_score == default_score + 10
+
+    @staticmethod
+    def test_batch_scores_use_the_configured_piece_values():
+
+        # Arrange
+        pytest.importorskip('numpy')
+        from chessington.engine.batch_evaluation import encode_board, evaluate_positions
+        board = Board.from_fen('4k3/8/8/8/3Q4/8/8/4K3 w - - 0 1')
+        piece_values = dict(PIECE_VALUES)
+        piece_values[Queen] = 100
+
+        # Act
+        default_score = evaluate_positions([encode_board(board)], EvaluationConfig().batch_square_table())[0]
+        custom_score = evaluate_positions([encode_board(board)],
+                                          EvaluationConfig(piece_values).batch_square_table())[0]
+
+        # Assert
+        assert custom_score == default_score + 10
+
+    @staticmethod
+    def test_seeded_noise_can_be_replayed():
+
+        # Arrange
+        first, second = EvaluationConfig(seed=42), EvaluationConfig(seed=42)
+
+        # Act
+        first_draws = [first.next_noise() for _ in range(5)]
+        second_draws = [second.next_noise() for _ in range(5)]
+
+        # Assert
+        assert first_draws == second_draws
+        assert all(0 <= draw < 0.5 for draw in first_draws)
+
+    @staticmethod
+    def test_no_noise_gives_the_same_score_every_time():
+
+        # Arrange
+        config = EvaluationConfig(noise=0)
+
+        # Act
+        draws = {config.next_noise() for _ in range(5)}
+
+        # Assert
+        assert draws == {0}
+        assert config.piece_values[Pawn] == PIECE_VALUES[Pawn]
@@ -0,0 +1,93 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.ordering import MoveOrdering
+from chessington.engine.search import Search, generate_moves
+
+from tests.test_search import material
+
+
+def move(from_name, to_name):
+    return Square.from_name(from_name), Square.from_name(to_name)
+
+
+class TestMoveOrdering:
+
+    @staticmethod
+    def test_captures_come_first_most_valuable_victim_then_least_valuable_attacker():
+
+        # Arrange
+        board = Board.from_fen('7k/8/8/3q1r2/2P1Q3/8/8/4K3 w - - 0 1')
+        moves = generate_moves(board)
+
+        # Act
+        ordered = MoveOrdering().order(board, moves, 0)
+
+        # Assert
+        assert ordered[:3] == [move('c4', 'd5'), move('e4', 'd5'), move('e4', 'f5')]
+
+    @staticmethod
+    def test_the_table_move_comes_before_captures():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3q4/2P5/8/8/4K3 w - - 0 1')
+        moves = generate_moves(board)
+
+        # Act
+        ordered = MoveOrdering().order(board, moves, 0, table_move=move('e1', 'd1'))
+
+        # Assert
+        assert ordered[:2] == [move('e1', 'd1'), move('c4', 'd5')]
+
+    @staticmethod
+    def test_killer_moves_come_before_other_quiet_moves():
+
+        # Arrange
+        board = Board.at_starting_position()
+        ordering = MoveOrdering()
+        ordering.record_cutoff(board, move('g1', 'f3'), 2, 3)
+
+        # Act
+        at_same_ply = ordering.order(board, generate_moves(board), 2)
+        at_other_ply = ordering.order(board, generate_moves(board), 1)
+
+        # Assert
+        assert at_same_ply[0] == move('g1', 'f3')
+        assert at_other_ply[0] == move('g1', 'f3')
+        assert ordering.killers[1] == []
+
+    @staticmethod
+    def test_captures_are_not_remembered_as_killers():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3q4/2P5/8/8/4K3 w - - 0 1')
+        ordering = MoveOrdering()
+
+        # Act
+        ordering.record_cutoff(board, move('c4', 'd5'), 0, 1)
+
+        # Assert
+        assert ordering.killers == []
+
+
+class TestSearchWithMoveOrdering:
+
+    @staticmethod
+    def test_ordering_finds_the_same_score_with_fewer_nodes():
+
+        # Arrange
+        rng = random.Random(3)
+        board = Board.at_starting_position()
+        for _ in range(10):
+            board.move_piece(*rng.choice(generate_moves(board)))
+        plain_search = Search(material, depth=3, move_ordering=False)
+        ordered_search = Search(material, depth=3)
+
+        # Act
+        _, plain_score = plain_search.search(board)
+        _, ordered_score = ordered_search.search(board)
+
+        # Assert
+        assert ordered_score == plain_score
+        assert ordered_search.nodes < plain_search.nodes
@@ -0,0 +1,75 @@
+import pytest
+
+from chessington.engine.bitboard import BitBoard
+from chessington.engine.board import Board
+from chessington.engine.perft import PERFT_POSITIONS, perft, divide, main
+
+
+class TestPerft:
+
+    @staticmethod
+    @pytest.mark.parametrize('name', sorted(PERFT_POSITIONS))
+    @pytest.mark.parametrize('board_type', [Board, BitBoard])
+    def test_node_counts_match_the_expected_values(name, board_type):
+
+        # Arrange
+        position = PERFT_POSITIONS[name]
+
+        for depth, expected in enumerate(position.expected_nodes[:2], start=1):
+            board = board_type.from_fen(position.fen)
+
+            # Act
+            nodes = perft(board, depth)
+
+            # Assert
+            assert nodes == expected
+
+    @staticmethod
+    def test_starting_position_to_depth_three():
+
+        # Arrange
+        board = BitBoard.at_starting_position()
+
+        # Act
+        nodes = perft(board, 3)
+
+        # Assert
+        assert nodes == 8902
+
+    @staticmethod
+    def test_divide_sums_to_the_perft_count():
+
+        # Arrange
+        position = PERFT_POSITIONS['endgame']
+        board = Board.from_fen(position.fen)
+
+        # Act
+        counts = divide(board, 2)
+
+        # Assert
+        assert len(counts) == position.expected_nodes[0]
+        assert sum(nodes for _, _, nodes in counts) == position.expected_nodes[1]
+
+    @staticmethod
+    def test_perft_leaves_the_board_unchanged():
+
+        # Arrange
+        position = PERFT_POSITIONS['promotions']
+        board = Board.from_fen(position.fen)
+        key = board.zobrist_key
+
+        # Act
+        perft(board, 2)
+
+        # Assert
+        assert board.zobrist_key == key
+
+    @staticmethod
+    def test_command_line_suite_passes(capsys):
+
+        # Act
+        exit_code = main(['--suite', '--depth', '2', '--bitboard'])
+
+        # Assert
+        assert exit_code == 0
+        assert 'FAILED' not in capsys.readouterr().out
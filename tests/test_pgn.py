@@ -0,0 +1,200 @@
+import io
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pgn import PgnWriter, SanError, read_games, parse_san, play_moves, move_to_san
+from chessington.engine.pieces import Knight, Rook, King
+
+ARCHIVE = '''[Event "First"]
+[White "Alice"]
+[Black "Bob \\"the bot\\""]
+
+1. e4 e5 2. Nf3 {a long comment
+that runs over two lines} Nc6 3. Bb5 (3. Bc4 Bc5) a6 $1 4. Bxc6 dxc6 5. Nxe5 Qd4 ; line comment
+6. Nf3 Qxe4+ 7. Qe2 Qxe2+ 8. Kxe2 Bg4 1-0
+
+[Event "Second"]
+
+1.d4 d5 *
+'''
+
+
+class TestPgnReader:
+
+    @staticmethod
+    def test_games_are_read_one_at_a_time():
+
+        # Arrange
+        stream = io.StringIO(ARCHIVE)
+
+        # Act
+        games = list(read_games(stream))
+
+        # Assert
+        assert [game.tags['Event'] for game in games] == ['First', 'Second']
+        assert games[0].tags['Black'] == 'Bob "the bot"'
+        assert games[0].result == '1-0'
+        assert games[1].moves == ['d4', 'd5']
+
+    @staticmethod
+    def test_comments_variations_and_glyphs_are_skipped():
+
+        # Arrange
+        stream = io.StringIO(ARCHIVE)
+
+        # Act
+        game = next(read_games(stream))
+
+        # Assert
+        assert game.moves[:8] == ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6', 'Bxc6', 'dxc6']
+        assert len(game.moves) == 16
+
+    @staticmethod
+    def test_games_can_be_replayed_onto_a_board():
+
+        # Arrange
+        game = next(read_games(io.StringIO(ARCHIVE)))
+
+        # Act
+        board = game.replay()
+
+        # Assert
+        assert isinstance(board.get_piece(Square.at(1, 4)), King)
+        assert board.get_piece(Square.at(3, 6)).player == Player.BLACK
+        assert board.current_player == Player.WHITE
+
+    @staticmethod
+    def test_games_start_from_their_fen_tag():
+
+        # Arrange
+        stream = io.StringIO('[FEN "4k3/8/8/8/8/8/8/R3K3 w - - 0 1"]\n\n1. Ra8+ *\n')
+        game = next(read_games(stream))
+
+        # Act
+        board = game.replay()
+
+        # Assert
+        assert isinstance(board.get_piece(Square.at(7, 0)), Rook)
+
+
+class TestSan:
+
+    @staticmethod
+    def test_moves_are_disambiguated_by_file():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 1), Knight(Player.WHITE))
+        board.set_piece(Square.at(0, 5), Knight(Player.WHITE))
+
+        # Act
+        san = move_to_san(board, Square.at(0, 1), Square.at(1, 3))
+
+        # Assert
+        assert san == 'Nbd2'
+        assert parse_san(board, san) == (Square.at(0, 1), Square.at(1, 3))
+
+    @staticmethod
+    def test_ambiguous_moves_are_rejected():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 1), Knight(Player.WHITE))
+        board.set_piece(Square.at(0, 5), Knight(Player.WHITE))
+
+        # Act / Assert
+        with pytest.raises(SanError):
+            parse_san(board, 'Nd2')
+
+    @staticmethod
+    def test_pinned_pieces_do_not_make_a_move_ambiguous():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/1b6/2N5/8/4K1N1 w - - 0 1')
+
+        # Act
+        from_square, to_square = parse_san(board, 'Ne2')
+        san = move_to_san(board, from_square, to_square)
+
+        # Assert
+        assert (from_square, to_square) == (Square.from_name('g1'), Square.from_name('e2'))
+        assert san == 'Ne2'
+
+    @staticmethod
+    def test_en_passant_captures_are_written_as_pawn_captures():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1')
+
+        # Act
+        san = move_to_san(board, Square.at(4, 4), Square.at(5, 3))
+
+        # Assert
+        assert san == 'exd6'
+
+    @staticmethod
+    def test_promotions_are_written_with_a_queen():
+
+        # Arrange
+        board = Board.from_fen('8/P7/8/8/8/8/8/k3K3 w - - 0 1')
+
+        # Act
+        san = move_to_san(board, Square.at(6, 0), Square.at(7, 0))
+
+        # Assert
+        assert san == 'a8=Q+'
+
+    @staticmethod
+    def test_castling_is_not_supported():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act / Assert
+        with pytest.raises(SanError):
+            parse_san(board, 'O-O')
+
+
+class TestPgnWriter:
+
+    @staticmethod
+    def test_written_games_can_be_read_back():
+
+        # Arrange
+        original = next(read_games(io.StringIO(ARCHIVE)))
+        board = Board.at_starting_position()
+        stream = io.StringIO()
+        writer = PgnWriter(stream)
+        moves = list(play_moves(original.starting_board(), original.moves))
+
+        # Act
+        writer.begin_game(board, {'Event': 'Replayed'})
+        for from_square, to_square in moves:
+            writer.play_move(board, from_square, to_square)
+        writer.end_game('1-0')
+        game = next(read_games(io.StringIO(stream.getvalue())))
+
+        # Assert
+        assert game.tags == {'Event': 'Replayed'}
+        assert game.moves == original.moves
+        assert game.result == '1-0'
+
+    @staticmethod
+    def test_positions_other_than_the_start_get_a_fen_tag():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 b - - 0 1')
+        stream = io.StringIO()
+        writer = PgnWriter(stream)
+
+        # Act
+        writer.begin_game(board)
+        writer.play_move(board, Square.at(7, 4), Square.at(7, 3))
+        writer.end_game()
+
+        # Assert
+        assert '[FEN "4k3/8/8/8/8/8/8/R3K3 b - - 0 1"]' in stream.getvalue()
+        assert '1... Kd8 *' in stream.getvalue()
+
@@ -614,3 +614,50 @@ class TestRooks:
 
         # Assert
         assert len(moves) == 2
+
+
+class TestMoveTables:
+
+    @staticmethod
+    def test_knight_in_corner_has_two_targets():
+
+        # Arrange
+        board = Board.empty()
+        knight = Knight(Player.WHITE)
+        board.set_piece(Square.at(0, 0), knight)
+
+        # Act
+        moves = knight.get_available_moves(board)
+
+        # Assert
+        assert sorted(moves) == [Square.at(1, 2), Square.at(2, 1)]
+
+    @staticmethod
+    def test_queen_in_centre_of_empty_board_has_twenty_seven_moves():
+
+        # Arrange
+        board = Board.empty()
+        queen = Queen(Player.BLACK)
+        board.set_piece(Square.at(3, 3), queen)
+
+        # Act
+        moves = queen.get_available_moves(board)
+
+        # Assert
+        assert len(moves) == 27
+
+    @staticmethod
+    def test_move_single_and_move_continuous_still_check_the_board_edge():
+
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 7), king)
+
+        # Act
+        off_board = king.move_single(board, 0, 1)
+        along_edge = king.move_continuous(board, 0, -1)
+
+        # Assert
+        assert off_board == []
+        assert len(along_edge) == 7
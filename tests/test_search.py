@@ -0,0 +1,237 @@
+import io
+import json
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.search import Search, generate_moves, generate_captures, KING_CAPTURE_SCORE
+from chessington.engine.transposition import TranspositionTable
+
+PIECE_VALUES = {Pawn: 1, Knight: 3, Bishop: 3, Rook: 5, Queen: 9, King: 100}
+
+
+def material(board):
+    score = 0
+    for player in (Player.WHITE, Player.BLACK):
+        sign = 1 if player == board.current_player else -1
+        for square in board.get_piece_squares(player):
+            score += sign * PIECE_VALUES[type(board.get_piece(square))]
+    return score
+
+
+def minimax(board, depth, ply=0):
+    if depth == 0:
+        return material(board)
+    moves = generate_moves(board)
+    if not moves:
+        return material(board)
+    best = None
+    for from_square, to_square in moves:
+        if isinstance(board.get_piece(to_square), King):
+            score = KING_CAPTURE_SCORE - ply
+        else:
+            undo = board.make_move(from_square, to_square)
+            score = -minimax(board, depth - 1, ply + 1)
+            board.unmake_move(undo)
+        best = score if best is None else max(best, score)
+    return best
+
+
+class TestSearch:
+
+    @staticmethod
+    def test_search_takes_a_hanging_queen():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(7, 4), King(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Rook(Player.WHITE))
+        board.set_piece(Square.at(3, 6), Queen(Player.BLACK))
+
+        # Act
+        move, score = Search(material, depth=1).search(board)
+
+        # Assert
+        assert move == (Square.at(3, 3), Square.at(3, 6))
+
+    @staticmethod
+    def test_deeper_search_sees_a_defended_piece():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(7, 5), King(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+        board.set_piece(Square.at(5, 3), Pawn(Player.BLACK))
+        board.set_piece(Square.at(6, 4), Pawn(Player.BLACK))
+
+        # Act
+        greedy_move, _ = Search(material, depth=1).search(board)
+        careful_move, _ = Search(material, depth=2).search(board)
+
+        # Assert
+        assert greedy_move[1] == Square.at(5, 3)
+        assert careful_move[1] != Square.at(5, 3)
+
+    @staticmethod
+    def test_search_captures_the_king_when_it_can():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(7, 7), King(Player.BLACK))
+        board.set_piece(Square.at(7, 0), Rook(Player.WHITE))
+
+        # Act
+        move, score = Search(material, depth=3).search(board)
+
+        # Assert
+        assert move == (Square.at(7, 0), Square.at(7, 7))
+        assert score == KING_CAPTURE_SCORE
+
+    @staticmethod
+    def test_alpha_beta_scores_match_minimax():
+
+        # Arrange
+        rng = random.Random(7)
+        board = Board.at_starting_position()
+        for _ in range(12):
+            board.move_piece(*rng.choice(generate_moves(board)))
+
+        # Act
+        _, score = Search(material, depth=3).search(board)
+
+        # Assert
+        assert score == minimax(board, 3)
+
+    @staticmethod
+    def test_search_with_time_limit_still_returns_a_move():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        move, _ = Search(material, depth=20, time_limit=0.05).search(board)
+
+        # Assert
+        assert move in generate_moves(board)
+
+    @staticmethod
+    def test_search_leaves_the_board_unchanged():
+
+        # Arrange
+        board = Board.at_starting_position()
+        before = [[board.get_piece(Square.at(row, col)) for col in range(8)] for row in range(8)]
+
+        # Act
+        Search(material, depth=2).search(board)
+
+        # Assert
+        assert [[board.get_piece(Square.at(row, col)) for col in range(8)] for row in range(8)] == before
+        assert board.current_player == Player.WHITE
+
+    @staticmethod
+    def test_quiescence_search_sees_a_defended_piece_at_depth_one():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(7, 5), King(Player.BLACK))
+        board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+        board.set_piece(Square.at(5, 3), Pawn(Player.BLACK))
+        board.set_piece(Square.at(6, 4), Pawn(Player.BLACK))
+
+        # Act
+        move, score = Search(material, depth=1, quiescence=True).search(board)
+
+        # Assert
+        assert move[1] != Square.at(5, 3)
+        assert score == material(board)
+
+    @staticmethod
+    def test_quiescence_search_plays_out_an_exchange():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/1n6/3p4/8/4N3/8/4K3 w - - 0 1')
+
+        # Act
+        _, horizon_score = Search(material, depth=1).search(board)
+        _, quiet_score = Search(material, depth=1, quiescence=True).search(board)
+
+        # Assert
+        assert horizon_score == material(board) + 1
+        assert quiet_score == material(board)
+
+    @staticmethod
+    def test_captures_include_promotions_and_en_passant_but_not_quiet_moves():
+
+        # Arrange
+        board = Board.from_fen('4k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1')
+
+        # Act
+        captures = generate_captures(board)
+
+        # Assert
+        assert sorted(captures) == sorted([
+            (Square.from_name('b7'), Square.from_name('b8')),
+            (Square.from_name('e5'), Square.from_name('d6')),
+        ])
+
+    @staticmethod
+    def test_search_statistics_describe_the_last_search():
+
+        # Arrange
+        board = Board.at_starting_position()
+        search = Search(material, depth=3, transposition_table=TranspositionTable(), stats=True)
+
+        # Act
+        search.search(board)
+        stats = search.stats
+
+        # Assert
+        assert stats.depth == 3
+        assert stats.nodes == search.nodes
+        assert stats.leaf_evaluations > 0
+        assert stats.table_hits > 0
+        assert stats.cutoffs > 0
+        assert len(stats.branching_factors) == 3
+        assert stats.branching_factors[0] == 20
+        assert 0 < stats.movegen_seconds + stats.make_unmake_seconds + stats.evaluation_seconds < stats.seconds
+
+    @staticmethod
+    def test_search_statistics_are_written_as_json_lines():
+
+        # Arrange
+        search = Search(material, depth=2, stats=True)
+        search.search(Board.at_starting_position())
+        stream = io.StringIO()
+
+        # Act
+        search.stats.write_json_line(stream, move=1)
+        search.stats.write_json_line(stream, move=2)
+
+        # Assert
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line['move'] for line in lines] == [1, 2]
+        assert lines[0]['nodes'] == search.nodes
+        assert lines[0]['branching_factors'] == search.stats.branching_factors
+
+    @staticmethod
+    def test_search_statistics_do_not_change_the_result():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/1n6/3p4/8/4N3/8/4K3 w - - 0 1')
+
+        plain = Search(material, depth=3, quiescence=True)
+        counted = Search(material, depth=3, quiescence=True, stats=True)
+
+        # Act
+        plain_result = plain.search(board)
+        counted_result = counted.search(board)
+
+        # Assert
+        assert plain_result == counted_result
+        assert plain.nodes == counted.nodes
+        assert plain.stats is None
@@ -0,0 +1,154 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.chess_bot import NuChessBotStronk
+from chessington.engine.data import Player
+from chessington.engine.tablebase import Tablebase, TablebaseGenerator
+
+
+@pytest.fixture(scope='module')
+def tables(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('tables')
+    generator = TablebaseGenerator()
+    generator.solve('KQK')
+    generator.save(directory)
+    return directory
+
+
+class TestTablebaseGenerator:
+
+    @staticmethod
+    def test_kings_next_to_each_other_are_won_by_the_player_to_move():
+
+        # Arrange
+        generator = TablebaseGenerator()
+
+        # Act
+        table = generator.solve('KK')
+
+        # Assert
+        # 420 pairs of neighbouring squares come to 56 once turns and reflections are left out
+        assert sum(1 for distance in table if distance == 1) == 2 * 56
+        assert all(distance in (0, 1) for distance in table)
+
+    @staticmethod
+    def test_tables_leave_out_taken_squares_and_turned_positions(tables):
+
+        # Assert
+        assert (tables / 'KQK.tb').stat().st_size == 2 * 10 * 63 * 62
+
+    @staticmethod
+    def test_smaller_tables_are_solved_along_the_way(tables):
+
+        # Assert
+        assert (tables / 'KK.tb').exists()
+        assert (tables / 'KQK.tb').exists()
+
+
+class TestTablebase:
+
+    @staticmethod
+    def test_king_and_queen_against_king_is_won(tables):
+
+        # Arrange
+        board = Board.from_fen('8/8/8/4k3/8/8/8/3QK3 w - - 0 1')
+
+        # Act
+        result = Tablebase(tables).probe(board)
+
+        # Assert
+        assert result.wins
+        assert result.distance % 2 == 1
+
+    @staticmethod
+    def test_a_hanging_queen_is_a_draw(tables):
+
+        # Arrange
+        board = Board.from_fen('k7/8/8/8/8/8/6q1/7K w - - 0 1')
+
+        # Act
+        result = Tablebase(tables).probe(board)
+
+        # Assert
+        assert result.wins is False
+        assert result.loses is False
+
+    @staticmethod
+    def test_colours_are_swapped_by_mirroring_the_board(tables):
+
+        # Arrange
+        white_queen = Board.from_fen('8/8/8/4k3/8/8/8/3QK3 w - - 0 1')
+        black_queen = Board.from_fen('3qk3/8/8/8/4K3/8/8/8 b - - 0 1')
+
+        # Act
+        results = [Tablebase(tables).probe(board) for board in (white_queen, black_queen)]
+
+        # Assert
+        assert results[0] == results[1]
+
+    @staticmethod
+    def test_turned_and_reflected_positions_have_the_same_result(tables):
+
+        # Arrange
+        boards = [Board.from_fen(fen) for fen in ('8/8/8/4k3/8/8/8/3QK3 w - - 0 1',
+                                                  '3KQ3/8/8/8/3k4/8/8/8 w - - 0 1',
+                                                  '8/8/8/3k3K/7Q/8/8/8 w - - 0 1')]
+
+        # Act
+        results = [Tablebase(tables).probe(board) for board in boards]
+
+        # Assert
+        assert results[0].wins
+        assert results[1] == results[0]
+        assert results[2] == results[0]
+
+    @staticmethod
+    def test_positions_with_other_material_are_not_covered(tables):
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        result = Tablebase(tables).probe(board)
+
+        # Assert
+        assert result is None
+
+    @staticmethod
+    def test_best_move_shortens_the_win(tables):
+
+        # Arrange
+        board = Board.from_fen('8/8/8/4k3/8/8/8/3QK3 w - - 0 1')
+        tablebase = Tablebase(tables)
+        distance = tablebase.probe(board).distance
+
+        # Act
+        board.move_piece(*tablebase.best_move(board))
+
+        # Assert
+        result = tablebase.probe(board)
+        assert result.loses
+        assert result.distance == distance - 1
+
+
+class TestBotsWithTablebases:
+
+    @staticmethod
+    def test_bot_captures_the_king_by_force(tables):
+
+        # Arrange
+        board = Board.from_fen('8/8/8/4k3/8/8/8/3QK3 w - - 0 1')
+        bots = {
+            Player.WHITE: NuChessBotStronk(Player.WHITE, Player.BLACK, seed=1, tablebase=str(tables)),
+            Player.BLACK: NuChessBotStronk(Player.BLACK, Player.WHITE, seed=1, tablebase=str(tables)),
+        }
+
+        # Act
+        for _ in range(Tablebase(tables).probe(board).distance - 1):
+            board.move_piece(*bots[board.current_player].get_move(board))
+
+        # Assert
+        from_square, to_square = bots[Player.WHITE].get_move(board)
+        assert board.get_piece(to_square) is not None
+        assert board.get_piece(to_square).player == Player.BLACK
+        assert board.current_player == Player.WHITE
@@ -0,0 +1,83 @@
+from chessington.engine.chess_bot import ChessBotRandom, NuChessBotStronk
+from chessington.engine.data import Player
+from chessington.engine.tournament import play_game, run_tournament, summarise, GameResult
+from chessington.engine.tournament import KING_CAPTURED, NO_MOVES, MOVE_LIMIT
+
+
+class TestTournament:
+
+    @staticmethod
+    def test_games_with_the_same_seed_are_identical():
+
+        # Act
+        first = play_game(ChessBotRandom, ChessBotRandom, max_moves=80, seed=42)
+        second = play_game(ChessBotRandom, ChessBotRandom, max_moves=80, seed=42)
+
+        # Assert
+        assert (first.winner, first.reason, first.moves) == (second.winner, second.reason, second.moves)
+
+    @staticmethod
+    def test_game_stops_at_the_move_limit():
+
+        # Act
+        result = play_game(ChessBotRandom, ChessBotRandom, max_moves=4, seed=1)
+
+        # Assert
+        assert result.winner is None
+        assert result.reason == MOVE_LIMIT
+        assert result.move_counts == {Player.WHITE: 2, Player.BLACK: 2}
+
+    @staticmethod
+    def test_game_results_are_consistent_and_report_nodes():
+
+        # Act
+        result = play_game(NuChessBotStronk, ChessBotRandom, max_moves=60, seed=3)
+
+        # Assert
+        if result.winner is None:
+            assert result.reason in (NO_MOVES, MOVE_LIMIT)
+        else:
+            assert result.reason == KING_CAPTURED
+        assert result.moves <= sum(result.move_counts.values()) <= result.moves + 1
+        assert result.move_counts[Player.WHITE] - result.move_counts[Player.BLACK] in (0, 1)
+        assert result.nodes[Player.WHITE] > 0
+        assert result.nodes[Player.BLACK] == 0
+
+    @staticmethod
+    def test_tournament_totals_add_up_and_keep_each_bots_figures_apart():
+
+        # Act
+        result = run_tournament(NuChessBotStronk, ChessBotRandom, games=4, max_moves=40, seed=13, workers=1)
+
+        # Assert
+        assert result.games == 4
+        assert result.wins + result.draws + result.losses == 4
+        assert result.average_move_seconds[0] > 0
+        assert result.nodes[0] > 0
+        assert result.nodes[1] == 0
+
+    @staticmethod
+    def test_totals_are_from_the_first_bots_point_of_view_whichever_colour_it_played():
+
+        # Arrange
+        per_player = {Player.WHITE: 0, Player.BLACK: 0}
+        white_win = GameResult(Player.WHITE, KING_CAPTURED, 9, per_player, per_player, per_player)
+        black_win = GameResult(Player.BLACK, KING_CAPTURED, 10, per_player, per_player, per_player)
+        draw = GameResult(None, MOVE_LIMIT, 40, per_player, per_player, per_player)
+
+        # Act
+        result = summarise([(white_win, Player.WHITE), (white_win, Player.BLACK), (black_win, Player.BLACK),
+                            (draw, Player.WHITE)])
+
+        # Assert
+        assert (result.games, result.wins, result.draws, result.losses) == (4, 2, 1, 1)
+
+    @staticmethod
+    def test_process_pool_gives_the_same_results_as_a_single_process():
+
+        # Act
+        serial = run_tournament(ChessBotRandom, ChessBotRandom, games=2, max_moves=60, seed=9, workers=1)
+        parallel = run_tournament(ChessBotRandom, ChessBotRandom, games=2, max_moves=60, seed=9, workers=2)
+
+        # Assert
+        assert (serial.wins, serial.draws, serial.losses) == (parallel.wins, parallel.draws, parallel.losses)
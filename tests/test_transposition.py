@@ -0,0 +1,130 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.chess_bot import ChessBotStronk, NuChessBotStronk
+from chessington.engine.data import Player, Square
+from chessington.engine.evaluation import EvaluationConfig
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.search import Search, generate_moves
+from chessington.engine.transposition import TranspositionTable, Bound, BUCKET_SLOTS, ENTRY_SIZE
+
+PIECE_VALUES = {Pawn: 1, Knight: 3, Bishop: 3, Rook: 5, Queen: 9, King: 100}
+
+
+def material(board):
+    score = 0
+    for player in (Player.WHITE, Player.BLACK):
+        sign = 1 if player == board.current_player else -1
+        for square in board.get_piece_squares(player):
+            score += sign * PIECE_VALUES[type(board.get_piece(square))]
+    return score
+
+
+def bot_move(bot_type, fen, table):
+    board = Board.from_fen(fen)
+    bot = bot_type(board.current_player, board.current_player.opponent(), depth=3, transposition_table=table,
+                   evaluation=EvaluationConfig(noise=0))
+    return bot.get_move(board)
+
+
+class TestTranspositionTable:
+
+    @staticmethod
+    def test_size_is_set_in_megabytes():
+
+        # Act
+        table = TranspositionTable(size_mb=1)
+
+        # Assert
+        assert table.bucket_count == 1024 * 1024 // (BUCKET_SLOTS * ENTRY_SIZE)
+
+    @staticmethod
+    def test_stored_entries_can_be_probed():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+        move = (Square.at(1, 4), Square.at(3, 4))
+
+        # Act
+        table.store(12345, 3, 42, Bound.EXACT, move)
+        entry = table.probe(12345)
+        missing = table.probe(54321)
+
+        # Assert
+        assert entry.depth == 3
+        assert entry.score == 42
+        assert entry.bound == Bound.EXACT
+        assert entry.best_move == move
+        assert missing is None
+        assert (table.hits, table.misses) == (1, 1)
+
+    @staticmethod
+    def test_shallow_results_do_not_replace_deep_ones():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+        deep_key = 7
+        shallow_key = deep_key + table.bucket_count
+
+        # Act
+        table.store(deep_key, 5, 1, Bound.EXACT, None)
+        table.store(shallow_key, 1, 2, Bound.LOWER, None)
+
+        # Assert
+        assert table.probe(deep_key).depth == 5
+        assert table.probe(shallow_key).depth == 1
+
+    @staticmethod
+    def test_always_replace_slot_takes_the_newest_result():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+        keys = [7 + n * table.bucket_count for n in range(3)]
+
+        # Act
+        table.store(keys[0], 5, 1, Bound.EXACT, None)
+        table.store(keys[1], 1, 2, Bound.EXACT, None)
+        table.store(keys[2], 2, 3, Bound.EXACT, None)
+
+        # Assert
+        assert table.probe(keys[0]) is not None
+        assert table.probe(keys[1]) is None
+        assert table.probe(keys[2]).score == 3
+        assert table.collisions == 1
+
+    @staticmethod
+    def test_search_with_table_finds_the_same_score_with_fewer_nodes():
+
+        # Arrange
+        rng = random.Random(3)
+        board = Board.at_starting_position()
+        for _ in range(10):
+            board.move_piece(*rng.choice(generate_moves(board)))
+        plain_search = Search(material, depth=4)
+        table_search = Search(material, depth=4, transposition_table=TranspositionTable(size_mb=4))
+
+        # Act
+        _, plain_score = plain_search.search(board)
+        _, table_score = table_search.search(board)
+
+        # Assert
+        assert table_score == plain_score
+        assert table_search.nodes < plain_search.nodes
+        assert table_search.transposition_table.hits > 0
+
+    @staticmethod
+    def test_bots_with_different_evaluations_can_share_a_table():
+
+        # Arrange
+        fen = 'rnbq1bnr/2ppkppp/pp6/4p3/5P2/N6P/PPPPPKP1/R1BQ1BNR w - - 0 1'
+        moves = {bot_type: bot_move(bot_type, fen, TranspositionTable(size_mb=1))
+                 for bot_type in (ChessBotStronk, NuChessBotStronk)}
+
+        # Act
+        shared_moves = []
+        for bot_types in ((ChessBotStronk, NuChessBotStronk), (NuChessBotStronk, ChessBotStronk)):
+            table = TranspositionTable(size_mb=1)
+            shared_moves.append({bot_type: bot_move(bot_type, fen, table) for bot_type in bot_types})
+
+        # Assert
+        assert shared_moves == [moves, moves]